@@ -0,0 +1,229 @@
+"""
+Answer cache module.
+Semantic cache of chat answers keyed by question embedding, filters and data version.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import numpy as np
+
+from config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_TTL_SECONDS
+)
+from lazy import cache_resource
+from session_registry import filter_key
+
+if TYPE_CHECKING:
+    from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+    from llama_index.core.vector_stores import MetadataFilters
+
+logger = logging.getLogger(__name__)
+
+# Words that point back at earlier turns ("what about them in Pune?")
+_REFERENCE_WORDS = {
+    "above", "again", "also", "another", "else", "he", "her", "hers", "him", "his", "it", "its", "more",
+    "one", "ones", "other", "others", "previous", "same", "she", "that", "them", "these", "they", "their",
+    "theirs", "this", "those"
+}
+
+
+def is_self_contained(query: str) -> bool:
+    """
+    Check whether a follow-up question can be answered without the chat history.
+    
+    Args:
+        query: User query
+        
+    Returns:
+        False if the query refers back to earlier turns
+    """
+    return not any(word in _REFERENCE_WORDS for word in re.findall(r"[a-z']+", query.lower()))
+
+
+class SemanticAnswerCache:
+    """
+    In-process cache of answers to previously asked questions.
+    
+    A question hits when an earlier one, asked under the same filters and the
+    same profiles version, has a query embedding with cosine similarity of at
+    least threshold ("who knows k8s" vs "Kubernetes experts?"). Entries expire
+    after ttl_seconds (purged from every bucket whenever an answer is
+    stored), the least recently used ones are evicted beyond
+    max_entries, and everything is dropped as soon as a different data
+    version is seen.
+    
+    Args:
+        embed_model: Model used to embed questions; Settings.embed_model by default
+        threshold: Minimum cosine similarity for a hit
+        max_entries: Maximum number of cached answers
+        ttl_seconds: Lifetime of an answer
+    """
+    
+    def __init__(
+        self,
+        embed_model: Optional[BaseEmbedding] = None,
+        threshold: float = ANSWER_CACHE_THRESHOLD,
+        max_entries: int = ANSWER_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS
+    ):
+        self._embed_model = embed_model
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.data_version: Optional[str] = None
+        self.entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self.buckets: Dict[tuple, List[int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        
+    @property
+    def embed_model(self) -> BaseEmbedding:
+        from llama_index.core import Settings
+        
+        return self._embed_model or Settings.embed_model
+        
+    def _check_version(self, data_version: Optional[str]):
+        """Drop every entry when the index was rebuilt from different data."""
+        if data_version != self.data_version:
+            if self.entries:
+                self.invalidations += 1
+                logger.info("Answer cache invalidated: data version %s -> %s", self.data_version, data_version)
+            self.entries.clear()
+            self.buckets.clear()
+            self.data_version = data_version
+            
+    def _remove(self, entry_id: int):
+        entry = self.entries.pop(entry_id)
+        self.buckets[entry["bucket"]].remove(entry_id)
+        
+    def _purge_expired(self, entry_ids, now: float):
+        """Remove the given entries that outlived ttl_seconds."""
+        for entry_id in [i for i in entry_ids if now - self.entries[i]["created"] > self.ttl_seconds]:
+            self._remove(entry_id)
+            
+    def lookup(
+        self,
+        query: str,
+        filters: Optional[MetadataFilters],
+        data_version: Optional[str]
+    ) -> tuple[Optional[Dict[str, Any]], Embedding]:
+        """
+        Find a cached answer for a question.
+        
+        Args:
+            query: User question
+            filters: Metadata filters of the current turn
+            data_version: Current data version (see indexing.current_data_version)
+            
+        Returns:
+            tuple: (entry, query_embedding) - The cached entry with "response",
+                "sources" and "similarity", or None on a miss; the embedding can
+                be passed to store() after answering
+        """
+        embedding = self.embed_model.get_query_embedding(query)
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        bucket = filter_key(filters)
+        now = time.monotonic()
+        
+        with self._lock:
+            self._check_version(data_version)
+            self._purge_expired(self.buckets.get(bucket, []), now)
+                
+            ids = self.buckets.get(bucket, [])
+            if ids:
+                similarities = np.stack([self.entries[i]["vector"] for i in ids]) @ vector
+                position = int(np.argmax(similarities))
+                if similarities[position] >= self.threshold:
+                    entry = self.entries[ids[position]]
+                    self.entries.move_to_end(ids[position])
+                    self.hits += 1
+                    return {
+                        "response": entry["response"],
+                        "sources": entry["sources"],
+                        "similarity": round(float(similarities[position]), 4)
+                    }, embedding
+                    
+            self.misses += 1
+            return None, embedding
+            
+    def store(
+        self,
+        query_embedding: Embedding,
+        filters: Optional[MetadataFilters],
+        data_version: Optional[str],
+        response: str,
+        sources: Optional[List[str]] = None
+    ):
+        """
+        Cache the answer to a question.
+        
+        Args:
+            query_embedding: Embedding returned by lookup()
+            filters: Metadata filters the answer was produced under
+            data_version: Data version the answer was produced from
+            response: Answer text
+            sources: Names of the profiles the answer was based on
+        """
+        vector = np.asarray(query_embedding, dtype=np.float32)
+        vector /= np.linalg.norm(vector) or 1.0
+        bucket = filter_key(filters)
+        
+        now = time.monotonic()
+        
+        with self._lock:
+            self._check_version(data_version)
+            # Lookups only purge their own bucket; expired answers under other filters go here
+            self._purge_expired(self.entries, now)
+            entry_id = next(self._ids)
+            self.entries[entry_id] = {
+                "bucket": bucket,
+                "vector": vector,
+                "response": response,
+                "sources": sources or [],
+                "created": now
+            }
+            self.buckets.setdefault(bucket, []).append(entry_id)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+                
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters.
+        
+        Returns:
+            Dict with entries, hits, misses, hit_rate and invalidations
+        """
+        total = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations
+        }
+
+
+@cache_resource
+def get_answer_cache() -> SemanticAnswerCache | None:
+    """
+    Create the process-wide answer cache.
+    
+    Returns:
+        SemanticAnswerCache, or None if ANSWER_CACHE_ENABLED is off
+    """
+    return SemanticAnswerCache() if ANSWER_CACHE_ENABLED else None
@@ -0,0 +1,443 @@
+"""
+API module.
+Headless async HTTP API over the same index, retrieval and chat engine as the Streamlit app.
+
+Run with:
+    python api.py
+or:
+    uvicorn api:app --host 127.0.0.1 --port 8000
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from llama_index.core import Settings, VectorStoreIndex
+from llama_index.core.vector_stores import MetadataFilters
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from answer_cache import is_self_contained
+from chat_engine import context_packing_stats, create_chat_engine, record_exchange, source_names
+from chat_memory import foreground_generation
+from config import (
+    API_HOST,
+    API_PORT,
+    OLLAMA_BASE_URL,
+    SIMILARITY_TOP_K,
+    MAX_TOP_K,
+    HYBRID_SEARCH_ENABLED,
+    QUERY_ROUTER_ENABLED,
+    ROUTER_MAX_RESULTS,
+    COALESCE_QUERIES,
+    WARMUP_ENABLED
+)
+from embedding_cache import CachedEmbedding
+from facets import FacetCatalog, compute_facets, load_facets
+from filters import build_metadata_filters
+from indexing import current_data_version, sync_vector_index
+from lexical_index import LexicalIndex
+from metrics import registry as metrics_registry
+from models import build_models, create_async_client, share_async_client
+from profile_store import ProfileStore
+from query_router import ProfileDirectory, QueryRouter
+from retrieval import HybridRetriever, VectorRetriever
+from session_registry import ChatEngineRegistry
+from singleflight import SingleFlight, query_key
+from warmup import Warmup
+
+logger = logging.getLogger(__name__)
+
+
+class BadRequest(ValueError):
+    """Raised for malformed request bodies; answered with HTTP 400."""
+
+
+class NotReady(RuntimeError):
+    """Raised while the index and models are still warming up; answered with HTTP 503."""
+
+
+class ExpertiseService:
+    """
+    Process-wide state behind the API: index, lexical index, facets, router and chat sessions.
+    
+    Chat turns of one session are serialized, since they share one chat
+    memory; different sessions run concurrently. Identical concurrent
+    searches, and identical first or self-contained chat turns, share one
+    computation (see SingleFlight).
+    
+    Args:
+        index: VectorStoreIndex instance
+        lexical_index: Optional BM25 index for hybrid retrieval
+        facets: Facet catalog served by /facets
+        router: Optional QueryRouter for LLM-free lookups
+        coalescer: Optional SingleFlight for identical in-flight requests
+    """
+    
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        lexical_index: LexicalIndex | None = None,
+        facets: FacetCatalog | None = None,
+        router: QueryRouter | None = None,
+        coalescer: SingleFlight | None = None
+    ):
+        self.index = index
+        self.lexical_index = lexical_index
+        self.facets = facets or {}
+        self.router = router
+        self.coalescer = coalescer
+        self.registry = ChatEngineRegistry(
+            lambda filters, memory: create_chat_engine(index, filters=filters, lexical_index=lexical_index, memory=memory)
+        )
+        # Locks disappear with the last request holding them, so idle sessions cost nothing
+        self._session_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        
+    @classmethod
+    def load(cls) -> "ExpertiseService":
+        """
+        Load or build the index snapshot and everything persisted with it.
+        
+        Returns:
+            ExpertiseService over the current profiles
+        """
+        index, report = sync_vector_index()
+        logger.info("API index ready: %s", report.get("mode"))
+        store = ProfileStore.from_file()
+        router = None
+        if QUERY_ROUTER_ENABLED:
+            router = QueryRouter(ProfileDirectory(store), max_results=ROUTER_MAX_RESULTS)
+        facets = load_facets() or compute_facets(store)
+        return cls(index, LexicalIndex.load(), facets, router, SingleFlight() if COALESCE_QUERIES else None)
+        
+    def session_lock(self, session_id: str) -> asyncio.Lock:
+        lock = self._session_locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._session_locks[session_id] = lock
+        return lock
+        
+    async def search(self, query: str, filters: Optional[MetadataFilters], top_k: int) -> List[Dict[str, Any]]:
+        """
+        Retrieve matching profiles without calling the LLM.
+        
+        Args:
+            query: Search query
+            filters: Optional metadata filters
+            top_k: Number of profiles to return
+            
+        Returns:
+            List of {"id", "name", "team", "location", "score"} dicts, best first
+        """
+        if self.coalescer is None:
+            return await self._search(query, filters, top_k)
+        key = query_key(query, filters, current_data_version(), "search", top_k)
+        results, _ = await self.coalescer.ado(key, lambda: self._search(query, filters, top_k))
+        return results
+        
+    async def _search(self, query: str, filters: Optional[MetadataFilters], top_k: int) -> List[Dict[str, Any]]:
+        if HYBRID_SEARCH_ENABLED and self.lexical_index is not None:
+            retriever = HybridRetriever(self.index, self.lexical_index, filters=filters, similarity_top_k=top_k)
+        else:
+            retriever = VectorRetriever(self.index, filters=filters, similarity_top_k=top_k)
+            
+        results = await retriever.aretrieve(query)
+        return [
+            {
+                "id": result.node.ref_doc_id or result.node.node_id,
+                "name": result.node.metadata.get("name"),
+                "team": result.node.metadata.get("team"),
+                "location": result.node.metadata.get("location"),
+                "score": result.score
+            }
+            for result in results
+        ]
+        
+    def _chat_key(self, chat_engine, message: str, filters: Optional[MetadataFilters]) -> Optional[tuple]:
+        """Coalescing key of a chat turn, or None if its answer depends on this session's history."""
+        if self.coalescer is None or (chat_engine.chat_history and not is_self_contained(message)):
+            return None
+        return query_key(message, filters, current_data_version(), "chat")
+        
+    def _shared_engine(self, chat_engine, filters: Optional[MetadataFilters]):
+        """Engine for an answer other sessions may receive: this session's only while its history is empty."""
+        # A self-contained follow-up may be shared, but must not be shaped by this session's history
+        return self.registry.engine_without_history(filters) if chat_engine.chat_history else chat_engine
+        
+    async def chat(self, session_id: str, message: str, filters: Optional[MetadataFilters]) -> Dict[str, Any]:
+        """
+        Answer one chat turn.
+        
+        Args:
+            session_id: Id of the conversation
+            message: User message
+            filters: Optional metadata filters
+            
+        Returns:
+            Dict with session_id, response, sources, routed and shared
+        """
+        async with self.session_lock(session_id):
+            chat_engine = self.registry.get(session_id, filters)
+            memory = self.registry.memory(session_id)
+            routed = self.router.route(message, filters) if self.router is not None else None
+            if routed is not None:
+                record_exchange(memory, message, routed["response"])
+                return {
+                    "session_id": session_id, "response": routed["response"], "sources": routed["profiles"],
+                    "routed": True, "shared": False
+                }
+                
+            async def answer(engine) -> tuple[str, List[str]]:
+                with foreground_generation():
+                    response = await engine.achat(message)
+                return response.response, source_names(response)
+                
+            key = self._chat_key(chat_engine, message, filters)
+            if key is None:
+                (text, sources), shared = await answer(chat_engine), False
+            else:
+                own_engine = not chat_engine.chat_history
+                (text, sources), shared = await self.coalescer.ado(
+                    key, lambda: answer(self._shared_engine(chat_engine, filters))
+                )
+                if shared or not own_engine:
+                    # Only the engine that generated the answer has it in its memory
+                    record_exchange(memory, message, text)
+            return {"session_id": session_id, "response": text, "sources": sources, "routed": False, "shared": shared}
+            
+    async def stream_chat(self, session_id: str, message: str, filters: Optional[MetadataFilters]) -> AsyncIterator[str]:
+        """
+        Answer one chat turn as NDJSON events.
+        
+        The first event carries the session id and sources, then one event per
+        token delta, then {"done": true} with the context packing stats.
+        
+        Args:
+            session_id: Id of the conversation
+            message: User message
+            filters: Optional metadata filters
+            
+        Yields:
+            JSON lines
+        """
+        async with self.session_lock(session_id):
+            chat_engine = self.registry.get(session_id, filters)
+            memory = self.registry.memory(session_id)
+            routed = self.router.route(message, filters) if self.router is not None else None
+            if routed is not None:
+                record_exchange(memory, message, routed["response"])
+                yield _event(session_id=session_id, sources=routed["profiles"], routed=True)
+                yield _event(delta=routed["response"])
+                yield _event(done=True)
+                return
+                
+            async def generate(engine) -> AsyncIterator[tuple]:
+                with foreground_generation():
+                    response = await engine.astream_chat(message)
+                    yield "sources", source_names(response)
+                    async for token in response.async_response_gen():
+                        yield "delta", token
+                yield "context", context_packing_stats(engine)
+                
+            key = self._chat_key(chat_engine, message, filters)
+            own_engine = key is None or not chat_engine.chat_history
+            if key is None:
+                events, shared = generate(chat_engine), False
+            else:
+                events, shared = self.coalescer.stream(key, lambda: generate(self._shared_engine(chat_engine, filters)))
+                
+            tokens = []
+            async for kind, value in events:
+                if kind == "sources":
+                    yield _event(session_id=session_id, sources=value, routed=False, shared=shared)
+                elif kind == "delta":
+                    tokens.append(value)
+                    yield _event(delta=value)
+                else:
+                    yield _event(done=True, context=value)
+            if shared or not own_engine:
+                record_exchange(memory, message, "".join(tokens))
+                
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get service counters.
+        
+        Returns:
+            Dict with chat session, request coalescing and embedding cache stats
+        """
+        embed_model = Settings.embed_model
+        return {
+            "sessions": self.registry.stats(),
+            "coalescing": self.coalescer.stats() if self.coalescer is not None else None,
+            "embedding_cache": embed_model.cache.stats() if isinstance(embed_model, CachedEmbedding) else None
+        }
+
+
+def _event(**fields: Any) -> str:
+    return json.dumps(fields) + "\n"
+
+
+async def _read_json(request: Request) -> Dict[str, Any]:
+    try:
+        payload = await request.json()
+    except json.JSONDecodeError as e:
+        raise BadRequest(f"Invalid JSON: {e}")
+    if not isinstance(payload, dict):
+        raise BadRequest("Request body must be a JSON object")
+    return payload
+
+
+def _text_field(payload: Dict[str, Any], key: str) -> str:
+    value = payload.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise BadRequest(f'"{key}" must be a non-empty string')
+    return value
+
+
+def _service(request: Request) -> ExpertiseService:
+    service = request.app.state.service
+    if service is None:
+        raise NotReady("Warming up: the index and models are still loading")
+    return service
+
+
+def _filters(payload: Dict[str, Any]) -> Optional[MetadataFilters]:
+    """MetadataFilters from {"filters": {"location": [...], "team": [...]}}; empty lists mean all."""
+    fields = payload.get("filters") or {}
+    if not isinstance(fields, dict):
+        raise BadRequest('"filters" must be an object')
+    unknown = set(fields) - {"location", "team"}
+    if unknown:
+        raise BadRequest(f"Unknown filter fields: {sorted(unknown)}")
+    return build_metadata_filters(fields.get("location") or [], fields.get("team") or [])
+
+
+async def health_endpoint(request: Request) -> JSONResponse:
+    """Readiness for load balancers: 200 once the index and models are loaded, 503 before."""
+    warmup: Warmup | None = request.app.state.warmup
+    status = warmup.stats() if warmup is not None else {"state": "ready"}
+    status["ready"] = request.app.state.service is not None and (warmup is None or warmup.ready)
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+async def facets_endpoint(request: Request) -> JSONResponse:
+    return JSONResponse(_service(request).facets)
+
+
+async def search_endpoint(request: Request) -> JSONResponse:
+    payload = await _read_json(request)
+    top_k = payload.get("top_k", SIMILARITY_TOP_K)
+    if not isinstance(top_k, int) or not 1 <= top_k <= MAX_TOP_K:
+        raise BadRequest(f'"top_k" must be an integer between 1 and {MAX_TOP_K}')
+    results = await _service(request).search(_text_field(payload, "query"), _filters(payload), top_k)
+    return JSONResponse({"results": results})
+
+
+async def chat_endpoint(request: Request):
+    payload = await _read_json(request)
+    service = _service(request)
+    message = _text_field(payload, "message")
+    filters = _filters(payload)
+    session_id = _text_field(payload, "session_id") if payload.get("session_id") is not None else uuid.uuid4().hex
+    
+    if payload.get("stream"):
+        return StreamingResponse(service.stream_chat(session_id, message, filters), media_type="application/x-ndjson")
+    return JSONResponse(await service.chat(session_id, message, filters))
+
+
+async def stats_endpoint(request: Request) -> JSONResponse:
+    return JSONResponse(_service(request).stats())
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(
+        metrics_registry.render_prometheus(_service(request).stats()),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+async def bad_request_handler(request: Request, exc: BadRequest) -> JSONResponse:
+    return JSONResponse({"error": str(exc)}, status_code=400)
+
+
+async def not_ready_handler(request: Request, exc: NotReady) -> JSONResponse:
+    return JSONResponse({"error": str(exc)}, status_code=503, headers={"Retry-After": "5"})
+
+
+def create_app(service: ExpertiseService | None = None, base_url: str = OLLAMA_BASE_URL) -> Starlette:
+    """
+    Create the API application.
+    
+    Without a service, models and the index are loaded once at startup and
+    every async Ollama call goes through one pooled client. With
+    WARMUP_ENABLED the server starts accepting connections right away: the
+    index is loaded and the models are made resident in a background
+    thread, /health reports readiness, and other endpoints answer 503
+    until then.
+    
+    Args:
+        service: Optional preloaded service (tests)
+        base_url: URL of the Ollama server
+        
+    Returns:
+        Starlette application
+    """
+    @asynccontextmanager
+    async def lifespan(app: Starlette):
+        client = None
+        if getattr(app.state, "service", None) is None:
+            llm, embed_model = build_models(base_url)
+            Settings.llm = llm
+            Settings.embed_model = embed_model
+            client = create_async_client(base_url)
+            
+            def attach(service: ExpertiseService):
+                # Ingestion runs its own event loop, so the shared client is only attached afterwards
+                share_async_client(llm, embed_model, client)
+                app.state.service = service
+                
+            if WARMUP_ENABLED:
+                loop = asyncio.get_running_loop()
+                app.state.warmup = Warmup(
+                    llm, embed_model, load=ExpertiseService.load,
+                    on_ready=lambda warmup: loop.call_soon_threadsafe(attach, warmup.result)
+                ).start()
+            else:
+                attach(await asyncio.to_thread(ExpertiseService.load))
+        yield
+        if app.state.warmup is not None:
+            await asyncio.to_thread(app.state.warmup.stop)
+        if client is not None:
+            await client.close()
+            
+    app = Starlette(
+        routes=[
+            Route("/health", health_endpoint, methods=["GET"]),
+            Route("/facets", facets_endpoint, methods=["GET"]),
+            Route("/search", search_endpoint, methods=["POST"]),
+            Route("/chat", chat_endpoint, methods=["POST"]),
+            Route("/stats", stats_endpoint, methods=["GET"]),
+            Route("/metrics", metrics_endpoint, methods=["GET"])
+        ],
+        exception_handlers={BadRequest: bad_request_handler, NotReady: not_ready_handler},
+        lifespan=lifespan
+    )
+    app.state.service = service
+    app.state.warmup = None
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(app, host=API_HOST, port=API_PORT)
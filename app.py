@@ -3,15 +3,27 @@ Internal Expertise Finder - Main Application
 A RAG-based chatbot for finding internal expertise and project information.
 """
 
+import streamlit as st
+
+from answer_cache import get_answer_cache
 from models import setup_global_settings
-from indexing import create_vector_index
+from indexing import create_vector_index, load_facet_catalog, load_lexical_index
 from filters import create_sidebar_filters, build_metadata_filters
-from chat_engine import create_chat_engine
+from query_router import create_query_router
+from session_registry import get_chat_engine_registry, get_session_id
+from singleflight import get_query_coalescer
+from warmup import start_app_warmup
 from ui import (
     setup_page_config,
     display_header,
     initialize_chat_session,
+    sync_chat_history,
     display_chat_history,
+    display_router_stats,
+    display_answer_cache_stats,
+    display_coalescing_stats,
+    display_warmup_status,
+    display_metrics_panel,
     handle_chat_interaction
 )
 
@@ -27,27 +39,45 @@ def main():
     # Initialize models and configure global settings
     llm, embed_model = setup_global_settings()
     
-    # Create vector index
+    # Build the index and load the models in the background once per process
+    warmup = start_app_warmup()
+    
+    # Create vector index (waits for the warm-up's build if it is still running)
     index = create_vector_index()
     
     if not index:
         st.stop()
     
     # Create sidebar filters
-    selected_location, selected_team = create_sidebar_filters(index)
+    selected_locations, selected_teams = create_sidebar_filters(load_facet_catalog())
     
     # Build metadata filters
-    query_filters = build_metadata_filters(selected_location, selected_team)
+    query_filters = build_metadata_filters(selected_locations, selected_teams)
     
-    # Create chat engine with filters
-    chat_engine = create_chat_engine(index, filters=query_filters)
+    # Reuse this session's chat engine (and memory) for the current filters
+    registry = get_chat_engine_registry(index, load_lexical_index())
+    session_id = get_session_id()
+    chat_engine = registry.get(session_id, query_filters)
     
-    # Initialize and display chat
+    # Initialize and display chat; a memory replaced by narrowed filters or eviction clears it too
+    sync_chat_history(registry.memory_id(session_id))
     messages = initialize_chat_session()
     display_chat_history(messages)
     
-    # Handle chat interaction
-    handle_chat_interaction(chat_engine)
+    # Handle chat interaction; plain lookups and repeated questions skip the LLM
+    router = create_query_router()
+    answer_cache = get_answer_cache()
+    coalescer = get_query_coalescer()
+    handle_chat_interaction(
+        chat_engine, registry.memory(session_id),
+        router=router, filters=query_filters, answer_cache=answer_cache, coalescer=coalescer,
+        new_engine=lambda: registry.engine_without_history(query_filters)
+    )
+    display_router_stats(router)
+    display_answer_cache_stats(answer_cache)
+    display_coalescing_stats(coalescer)
+    display_warmup_status(warmup)
+    display_metrics_panel(router, answer_cache, coalescer, embed_model)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+"""
+End-to-End Latency Benchmark
+Replays a query corpus through indexing, retrieval and chat against a local fake Ollama.
+
+Reports p50/p95/p99 per stage and chat throughput per concurrency level as
+JSON, so runs can be compared against a previous baseline. The index
+snapshot is written to a temporary directory, never to ./storage.
+
+Usage:
+    python benchmarks/bench_end_to_end.py --concurrency 1,4,8 --output bench.json
+    python benchmarks/bench_end_to_end.py --baseline bench.json
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "tests"))
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+from llama_index.core import Settings
+
+from chat_engine import create_chat_engine, timed_token_stream
+from config import DATA_PATH, INDEX_PERSIST_DIR, LLM_CONTEXT_WINDOW
+from data_processing import load_profiles_from_json
+from fake_ollama import FakeOllamaServer, fake_models
+from indexing import sync_vector_index
+from lexical_index import LexicalIndex
+
+DEFAULT_QUERIES = [
+    "Find a Python expert",
+    "Who worked on the Payment Gateway project?",
+    "Find React developers in Bangalore",
+    "Who knows Kubernetes and Docker?",
+    "Who has built data pipelines?",
+    "Who knows Kafka?",
+    "Which engineers have worked with EventBridge?",
+    "Who can help with machine learning model deployment?",
+    "Find someone with mobile app experience",
+    "Who has security and compliance experience?",
+    "Who worked on Expertise Finder?",
+    "Find a frontend engineer who knows TypeScript"
+]
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """Count, mean and percentiles (ms) of latencies given in seconds"""
+    ms = np.asarray(latencies) * 1000
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": len(ms),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(ms.max()), 3)
+    }
+
+
+def timed(fn: Callable[[], object]) -> float:
+    """Seconds fn() takes"""
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def load_queries(path: str | None) -> List[str]:
+    """Queries from a JSON list or a text file with one query per line"""
+    if path is None:
+        return DEFAULT_QUERIES
+    with open(path) as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        return [line.strip() for line in f if line.strip()]
+
+
+def use_fake_models(server: FakeOllamaServer):
+    """Point the global models at the fake server, bypassing the embedding cache"""
+    Settings.llm, Settings.embed_model = fake_models(server.url, request_timeout=60, context_window=LLM_CONTEXT_WINDOW)
+
+
+def bench_indexing(data_path: str, runs: int) -> Dict[str, list]:
+    """Cold builds (no snapshot) followed by warm starts from the snapshot, as create_vector_index does them"""
+    cold, warm = [], []
+    for _ in range(runs):
+        shutil.rmtree(INDEX_PERSIST_DIR, ignore_errors=True)
+        cold.append(timed(lambda: sync_vector_index(data_path)))
+    for _ in range(runs):
+        warm.append(timed(lambda: sync_vector_index(data_path)))
+    return {"index_cold": cold, "index_warm": warm}
+
+
+def bench_query_path(index, lexical_index: LexicalIndex, queries: List[str]) -> Dict[str, list]:
+    """Per-query retrieval, time to first token and full chat turns, each on a fresh engine"""
+    stages = {"retrieve": [], "ttft": [], "chat": []}
+    for query in queries:
+        engine = create_chat_engine(index, lexical_index=lexical_index)
+        
+        def retrieve():
+            nodes = engine._retriever.retrieve(query)
+            for postprocessor in engine._node_postprocessors:
+                nodes = postprocessor.postprocess_nodes(nodes, query_str=query)
+                
+        stages["retrieve"].append(timed(retrieve))
+        
+        engine = create_chat_engine(index, lexical_index=lexical_index)
+        timings = {}
+        for _ in timed_token_stream(engine.stream_chat(query), time.perf_counter(), timings):
+            pass
+        stages["ttft"].append(timings["ttft"])
+        
+        engine = create_chat_engine(index, lexical_index=lexical_index)
+        stages["chat"].append(timed(lambda: engine.chat(query)))
+    return stages
+
+
+def bench_concurrency(index, lexical_index: LexicalIndex, queries: List[str], level: int) -> Dict[str, float]:
+    """Chat turns from level concurrent users, each replaying the corpus"""
+    def user(offset: int) -> List[float]:
+        latencies = []
+        for query in queries[offset:] + queries[:offset]:
+            engine = create_chat_engine(index, lexical_index=lexical_index)
+            latencies.append(timed(lambda: engine.chat(query)))
+        return latencies
+        
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=level) as pool:
+        per_user = list(pool.map(user, [i % len(queries) for i in range(level)]))
+    wall = time.perf_counter() - start
+    
+    latencies = [latency for user_latencies in per_user for latency in user_latencies]
+    return {**summarize(latencies), "wall_seconds": round(wall, 3), "throughput_qps": round(len(latencies) / wall, 3)}
+
+
+def git_commit() -> str | None:
+    """Current commit of the repository, if available"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict):
+    """Print p95 changes against a previous run"""
+    print("\nChange in p95 against baseline:")
+    rows = [(name, results["stages"][name], baseline.get("stages", {}).get(name)) for name in results["stages"]]
+    rows += [
+        (f"chat @ {level}", entry, baseline.get("concurrency", {}).get(level))
+        for level, entry in results["concurrency"].items()
+    ]
+    for name, entry, before in rows:
+        if not before:
+            print(f"{name:>14}: {entry['p95_ms']:9.2f} ms (new)")
+            continue
+        change = (entry["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0.0
+        print(f"{name:>14}: {before['p95_ms']:9.2f} -> {entry['p95_ms']:9.2f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=os.path.join(ROOT, DATA_PATH), help="Profiles JSON file")
+    parser.add_argument("--queries", help="Query corpus (.json list or one query per line)")
+    parser.add_argument("--repeat", type=int, default=1, help="Times the corpus is replayed per stage")
+    parser.add_argument("--index-runs", type=int, default=3)
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated concurrent user counts")
+    parser.add_argument("--embed-latency", type=float, default=0.005, help="Seconds per embedding request")
+    parser.add_argument("--first-token-latency", type=float, default=0.05, help="Seconds of prompt processing")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="Seconds per generated token")
+    parser.add_argument("--answer-tokens", type=int, default=32)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+    
+    data_path = os.path.abspath(args.data)
+    queries = load_queries(args.queries) * args.repeat
+    levels = [int(level) for level in args.concurrency.split(",")]
+    
+    server = FakeOllamaServer(
+        embed_latency=args.embed_latency,
+        first_token_latency=args.first_token_latency,
+        token_latency=args.token_latency,
+        answer_tokens=args.answer_tokens
+    )
+    workdir = tempfile.mkdtemp(prefix="bench_e2e_")
+    cwd = os.getcwd()
+    try:
+        server.start()
+        os.chdir(workdir)  # snapshot goes to <workdir>/storage
+        use_fake_models(server)
+        
+        print(f"Indexing {data_path} ({args.index_runs} cold + {args.index_runs} warm runs)...")
+        stage_latencies = bench_indexing(data_path, args.index_runs)
+        index, _ = sync_vector_index(data_path)
+        lexical_index = LexicalIndex.from_profiles(load_profiles_from_json(data_path))
+        
+        print(f"Replaying {len(queries)} queries...")
+        stage_latencies.update(bench_query_path(index, lexical_index, queries))
+        
+        concurrency = {}
+        for level in levels:
+            print(f"Concurrency {level}...")
+            concurrency[str(level)] = bench_concurrency(index, lexical_index, queries, level)
+    finally:
+        os.chdir(cwd)
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+        
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "baseline")},
+        "stages": {name: summarize(latencies) for name, latencies in stage_latencies.items()},
+        "concurrency": concurrency,
+        "ollama_requests": {"embed": server.embed_requests, "generate": server.generation_requests}
+    }
+    
+    print()
+    for name, entry in results["stages"].items():
+        print(f"{name:>14}: p50 {entry['p50_ms']:9.2f} | p95 {entry['p95_ms']:9.2f} | p99 {entry['p99_ms']:9.2f} ms")
+    for level, entry in concurrency.items():
+        print(
+            f"{'chat @ ' + level:>14}: p50 {entry['p50_ms']:9.2f} | p95 {entry['p95_ms']:9.2f} | "
+            f"p99 {entry['p99_ms']:9.2f} ms | {entry['throughput_qps']:7.2f} q/s"
+        )
+        
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+            
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
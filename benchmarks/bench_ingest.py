@@ -0,0 +1,137 @@
+"""
+Ingest Throughput Benchmark
+Profiles/sec per ingestion stage, building documents serially and in a process pool.
+
+For every worker count, documents are first built from profiles held in
+memory (conversion alone), then a cold sync_vector_index run streams the
+data file through reading, document building, embedding against a local
+fake Ollama and index insertion. The snapshot is written to a temporary
+directory, never to ./storage.
+
+Usage:
+    python benchmarks/bench_ingest.py --count 100000 --workers 1,2,4 --output ingest.json
+    python benchmarks/bench_ingest.py --data data/export/ --workers 1,8 --chunk-size 2000
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, "tests"))
+
+import argparse
+import json
+import platform
+import shutil
+import tempfile
+import time
+from typing import Dict
+
+import metrics
+from bench_end_to_end import git_commit, use_fake_models
+from config import DATA_PATH, DOCUMENT_CHUNK_SIZE
+from data_processing import iter_documents, load_profiles_from_json
+from fake_ollama import FakeOllamaServer
+from indexing import sync_vector_index
+from synthetic_profiles import ProfileDistribution, generate_profiles, write_profiles
+
+INGEST_STAGES = ("load_profiles", "build_documents", "embed", "index_build")
+
+
+def rate(profiles: int, seconds: float) -> Dict[str, float]:
+    """Seconds and profiles/sec of a stage"""
+    return {"seconds": round(seconds, 4), "profiles_per_sec": round(profiles / seconds, 1) if seconds else 0.0}
+
+
+def bench_documents(profiles: list, workers: int, chunk_size: int) -> float:
+    """Seconds to build documents for profiles already in memory"""
+    start = time.perf_counter()
+    for _ in iter_documents(profiles, workers, chunk_size):
+        pass
+    return time.perf_counter() - start
+
+
+def bench_sync(data_path: str, workers: int, profiles: int) -> Dict[str, Dict[str, float]]:
+    """Cold streamed sync, with time per stage taken from the metrics registry"""
+    persist_dir = tempfile.mkdtemp(prefix="bench_ingest_")
+    try:
+        metrics.registry.reset()
+        start = time.perf_counter()
+        sync_vector_index(data_path, persist_dir, document_workers=workers)
+        wall = time.perf_counter() - start
+    finally:
+        shutil.rmtree(persist_dir, ignore_errors=True)
+        
+    stages = metrics.registry.snapshot()["stages"]
+    result = {
+        f"sync_{stage}": rate(profiles, stages[stage]["count"] * stages[stage]["mean_ms"] / 1000)
+        for stage in INGEST_STAGES if stage in stages
+    }
+    result["sync_total"] = rate(profiles, wall)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="Profiles file or shard directory; synthetic profiles are generated otherwise")
+    parser.add_argument("--count", type=int, default=20_000, help="Synthetic profiles to generate")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated document worker counts (1 is serial)")
+    parser.add_argument("--chunk-size", type=int, default=DOCUMENT_CHUNK_SIZE, help="Profiles per worker task")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="Seconds per embedding request")
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+    
+    worker_counts = [int(workers) for workers in args.workers.split(",")]
+    workdir = tempfile.mkdtemp(prefix="bench_ingest_data_")
+    server = FakeOllamaServer(embed_latency=args.embed_latency, dim=64)
+    try:
+        data_path = os.path.abspath(args.data) if args.data else os.path.join(workdir, "profiles.jsonl")
+        if not args.data:
+            print(f"Generating {args.count} synthetic profiles...")
+            distribution = ProfileDistribution.from_file(os.path.join(ROOT, DATA_PATH))
+            write_profiles(data_path, generate_profiles(args.count, seed=0, distribution=distribution))
+            
+        start = time.perf_counter()
+        profiles = load_profiles_from_json(data_path)
+        load_seconds = time.perf_counter() - start
+        count = len(profiles)
+        
+        server.start()
+        use_fake_models(server)
+        modes = {}
+        for workers in worker_counts:
+            name = "serial" if workers == 1 else f"workers={workers}"
+            print(f"{name}: building documents and syncing {count} profiles...")
+            modes[name] = {
+                "read": rate(count, load_seconds),
+                "build_documents": rate(count, bench_documents(profiles, workers, args.chunk_size)),
+                **bench_sync(data_path, workers, count)
+            }
+    finally:
+        server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+        
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "profiles": count,
+        "modes": modes
+    }
+    
+    print(f"\nProfiles/sec ({count} profiles, {os.cpu_count()} CPUs):")
+    stages = list(next(iter(modes.values())))
+    width = max(len(stage) for stage in stages) + 2
+    print(" " * width + "".join(f"{name:>14}" for name in modes))
+    for stage in stages:
+        print(f"{stage:>{width}}" + "".join(f"{modes[name][stage]['profiles_per_sec']:>14,.0f}" for name in modes))
+        
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Profile Memory Report
+Bytes per profile held as lists of dicts plus documents (today) versus the columnar ProfileStore.
+
+Memory is measured with tracemalloc as the live allocations each
+representation adds; the store's own breakdown comes from
+ProfileStore.memory_usage(). Also reports how long the store takes to
+build and to render a profile or a document on demand.
+
+Usage:
+    python benchmarks/bench_profile_memory.py --count 100000 --output memory.json
+    python benchmarks/bench_profile_memory.py --data data/export/
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import argparse
+import gc
+import json
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+from config import DATA_PATH
+from data_processing import convert_profiles_to_documents, load_profiles_from_json
+from profile_store import ProfileStore
+from synthetic_profiles import ProfileDistribution, generate_profiles, write_profiles
+
+
+def traced(build: Callable[[], Any]) -> Tuple[Any, int, float]:
+    """Result, bytes still allocated afterwards and seconds taken by build()"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size, seconds
+
+
+def access_micros(fn: Callable[[int], Any], rows: list) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for row in rows:
+        fn(row)
+    return round((time.perf_counter() - start) / len(rows) * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="Profiles file or shard directory; synthetic profiles are generated otherwise")
+    parser.add_argument("--count", type=int, default=50_000, help="Synthetic profiles to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+    
+    workdir = tempfile.mkdtemp(prefix="bench_memory_")
+    try:
+        data_path = os.path.abspath(args.data) if args.data else os.path.join(workdir, "profiles.jsonl")
+        if not args.data:
+            print(f"Generating {args.count} synthetic profiles...")
+            distribution = ProfileDistribution.from_file(os.path.join(ROOT, DATA_PATH))
+            write_profiles(data_path, generate_profiles(args.count, args.seed, distribution))
+            
+        print("Measuring lists of dicts and documents...")
+        profiles, dict_bytes, dict_seconds = traced(lambda: load_profiles_from_json(data_path))
+        documents, document_bytes, document_seconds = traced(lambda: convert_profiles_to_documents(profiles))
+        count = len(profiles)
+        del documents, profiles
+        
+        print("Measuring the profile store...")
+        store, store_bytes, store_seconds = traced(lambda: ProfileStore.from_file(data_path))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        
+    sample = random.Random(args.seed).sample(range(count), min(count, 1000))
+    results = {
+        "profiles": count,
+        "bytes_per_profile": {
+            "dicts": round(dict_bytes / count, 1),
+            "documents": round(document_bytes / count, 1),
+            "dicts_and_documents": round((dict_bytes + document_bytes) / count, 1),
+            "store": round(store_bytes / count, 1)
+        },
+        "store_breakdown_bytes_per_profile": {
+            part: round(size / count, 1) for part, size in store.memory_usage().items()
+        },
+        "build_seconds": {
+            "dicts": round(dict_seconds, 3),
+            "documents": round(document_seconds, 3),
+            "store": round(store_seconds, 3)
+        },
+        "store_access_us": {
+            "get_team": access_micros(lambda row: store.get(row, "team"), sample),
+            "profile": access_micros(store.profile, sample),
+            "document": access_micros(store.document, sample)
+        }
+    }
+    
+    print(f"\nBytes per profile ({count} profiles):")
+    for name, value in results["bytes_per_profile"].items():
+        print(f"{name:>20}: {value:10,.0f}")
+    print("\nStore breakdown (bytes per profile):")
+    for name, value in results["store_breakdown_bytes_per_profile"].items():
+        print(f"{name:>20}: {value:10,.1f}")
+    saving = 1 - results["bytes_per_profile"]["store"] / results["bytes_per_profile"]["dicts_and_documents"]
+    print(f"\nStore saves {saving:.0%} against dicts + documents")
+    print(f"On-demand access (us): {results['store_access_us']}")
+    
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""
+Startup Import Benchmark
+Cold import time of every module, with the packages that time goes to.
+
+Each module is imported in a fresh interpreter under python -X importtime,
+repeated, and the median cumulative time is reported together with the
+self time of the packages it pulled in (llama_index, streamlit, numpy, ...).
+Interpreter startup itself (site, encodings) is not counted. Pure-data
+modules should load none of FRAMEWORK_PACKAGES.
+
+Usage:
+    python benchmarks/bench_startup.py --repeat 5 --output startup.json
+    python benchmarks/bench_startup.py --modules metrics,models --baseline startup.json
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import argparse
+import glob
+import json
+import platform
+import statistics
+import subprocess
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from bench_end_to_end import git_commit
+
+# Entry points that run the app when imported
+SCRIPTS = ("app", "reproduce_issue")
+
+FRAMEWORK_PACKAGES = ("llama_index", "streamlit", "ollama", "httpx", "starlette")
+
+
+def repo_modules() -> List[str]:
+    """Top-level modules of the repository, without the entry point scripts"""
+    names = (os.path.splitext(os.path.basename(path))[0] for path in glob.glob(os.path.join(ROOT, "*.py")))
+    return sorted(name for name in names if name not in SCRIPTS)
+
+
+def parse_importtime(stderr: str, module: str) -> Tuple[float, Counter]:
+    """
+    Cumulative milliseconds of a module and self milliseconds per top-level package it imported.
+    
+    -X importtime prints every import after its own imports, indented by
+    depth, so the module's subtree is everything since the previous
+    top-level entry.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), depth, name.strip()))
+        
+    end = max(i for i, (_, _, depth, name) in enumerate(rows) if depth == 0 and name == module)
+    start = max((i + 1 for i, row in enumerate(rows[:end]) if row[2] == 0), default=0)
+    packages = Counter()
+    for self_us, _, _, name in rows[start:end + 1]:
+        packages[name.split(".")[0]] += self_us / 1000
+    return rows[end][1] / 1000, packages
+
+
+def measure(module: str, repeat: int) -> Dict[str, object]:
+    """Median cold import of a module over fresh interpreters"""
+    runs = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{result.stderr.splitlines()[-1]}")
+        runs.append(parse_importtime(result.stderr, module))
+        
+    runs.sort(key=lambda run: run[0])
+    cumulative_ms, packages = runs[len(runs) // 2]
+    return {
+        "import_ms": round(cumulative_ms, 1),
+        "min_ms": round(runs[0][0], 1),
+        "stdev_ms": round(statistics.pstdev(run[0] for run in runs), 1),
+        "frameworks": sorted(package for package in FRAMEWORK_PACKAGES if package in packages),
+        "top_packages_ms": {package: round(ms, 1) for package, ms in packages.most_common(5)}
+    }
+
+
+def compare(results: dict, baseline: dict):
+    """Print import time changes against a previous run"""
+    print("\nChange in import time against baseline:")
+    for module, entry in results["modules"].items():
+        before = baseline.get("modules", {}).get(module)
+        if not before:
+            print(f"{module:>20}: {entry['import_ms']:9.1f} ms (new)")
+            continue
+        change = (entry["import_ms"] - before["import_ms"]) / before["import_ms"] * 100 if before["import_ms"] else 0.0
+        print(f"{module:>20}: {before['import_ms']:9.1f} -> {entry['import_ms']:9.1f} ms ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", help="Comma-separated modules (default: every module of the repository)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per module")
+    parser.add_argument("--output", help="Optional path for JSON results")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    args = parser.parse_args()
+    
+    modules = args.modules.split(",") if args.modules else repo_modules()
+    measured = {}
+    for module in modules:
+        measured[module] = measure(module, args.repeat)
+        entry = measured[module]
+        packages = ", ".join(f"{package} {ms:.0f}" for package, ms in entry["top_packages_ms"].items())
+        print(f"{module:>20}: {entry['import_ms']:9.1f} ms  [{packages}]")
+        
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "config": {"repeat": args.repeat},
+        "modules": measured
+    }
+    
+    light = [module for module, entry in measured.items() if not entry["frameworks"]]
+    print(f"\n{len(light)} of {len(measured)} modules import without {', '.join(FRAMEWORK_PACKAGES)}")
+    
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Vector Store Benchmark
+Compares query latency of NumpyVectorStore against LlamaIndex's SimpleVectorStore.
+
+Usage:
+    python benchmarks/bench_vector_store.py --profiles 100000 --dim 768
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import statistics
+import time
+
+import numpy as np
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores import SimpleVectorStore
+from llama_index.core.vector_stores.types import FilterOperator, MetadataFilter, MetadataFilters, VectorStoreQuery
+
+from vector_store import NumpyVectorStore
+
+LOCATIONS = ["Bangalore", "Chennai", "Delhi", "Hyderabad", "Mumbai", "Pune", "Remote"]
+TEAMS = ["Platform", "ML", "Security", "Data", "Mobile", "Payments", "Search", "Infra"]
+
+
+def make_nodes(count: int, dim: int, seed: int) -> list[TextNode]:
+    """Random unit embeddings with location/team metadata"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    return [
+        TextNode(
+            id_=f"n{i}",
+            text="",
+            embedding=vectors[i].tolist(),
+            metadata={"location": LOCATIONS[i % len(LOCATIONS)], "team": TEAMS[i % len(TEAMS)]}
+        )
+        for i in range(count)
+    ]
+
+
+def time_queries(store, queries: list[VectorStoreQuery]) -> tuple[list[float], list[list[str]]]:
+    """Run queries and return per-query latencies (ms) and result ids"""
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        result = store.query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(result.ids)
+    return latencies, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=15)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Optional path for JSON results")
+    args = parser.parse_args()
+    
+    print(f"Building {args.profiles} nodes (dim={args.dim})...")
+    nodes = make_nodes(args.profiles, args.dim, args.seed)
+    
+    stores = {"simple": SimpleVectorStore(), "numpy": NumpyVectorStore(indexed_keys=["location", "team"])}
+    build_seconds = {}
+    for name, store in stores.items():
+        start = time.perf_counter()
+        store.add(nodes)
+        build_seconds[name] = time.perf_counter() - start
+        
+    rng = np.random.default_rng(args.seed + 1)
+    scenarios = {
+        "unfiltered": None,
+        "2 locations": MetadataFilters(filters=[
+            MetadataFilter(key="location", value=["Chennai", "Pune"], operator=FilterOperator.IN)
+        ]),
+        "location": MetadataFilters(filters=[MetadataFilter(key="location", value="Chennai")]),
+        "location+team": MetadataFilters(filters=[
+            MetadataFilter(key="location", value="Chennai"),
+            MetadataFilter(key="team", value="Platform")
+        ])
+    }
+    
+    results = {"profiles": args.profiles, "dim": args.dim, "top_k": args.top_k, "build_seconds": build_seconds}
+    for scenario, filters in scenarios.items():
+        queries = [
+            VectorStoreQuery(
+                query_embedding=rng.standard_normal(args.dim).tolist(),
+                similarity_top_k=args.top_k,
+                filters=filters
+            )
+            for _ in range(args.queries)
+        ]
+        simple_ms, simple_ids = time_queries(stores["simple"], queries)
+        numpy_ms, numpy_ids = time_queries(stores["numpy"], queries)
+        
+        entry = {
+            "simple_ms": round(statistics.median(simple_ms), 3),
+            "numpy_ms": round(statistics.median(numpy_ms), 3),
+            "speedup": round(statistics.median(simple_ms) / statistics.median(numpy_ms), 1),
+            "same_results": simple_ids == numpy_ids
+        }
+        results[scenario] = entry
+        print(
+            f"{scenario:>14}: simple {entry['simple_ms']:9.2f} ms | numpy {entry['numpy_ms']:8.2f} ms | "
+            f"{entry['speedup']:6.1f}x | same top-k: {entry['same_results']}"
+        )
+        
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
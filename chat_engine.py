@@ -3,30 +3,157 @@ Chat engine module.
 Handles creation and configuration of the chat engine.
 """
 
-from llama_index.core import VectorStoreIndex
-from llama_index.core.memory import ChatMemoryBuffer
-from llama_index.core.vector_stores import MetadataFilters
+from __future__ import annotations
 
-from config import SYSTEM_PROMPT, CHAT_MEMORY_TOKEN_LIMIT, SIMILARITY_TOP_K
+import time
+from typing import TYPE_CHECKING, Dict, Iterator, List
 
+from config import (
+    SYSTEM_PROMPT,
+    SIMILARITY_TOP_K,
+    HYBRID_SEARCH_ENABLED,
+    ADAPTIVE_TOP_K_ENABLED,
+    MAX_TOP_K
+)
+from lexical_index import LexicalIndex
 
-def create_chat_engine(index: VectorStoreIndex, filters: MetadataFilters | None = None):
+if TYPE_CHECKING:
+    from llama_index.core import VectorStoreIndex
+    from llama_index.core.memory import BaseMemory
+    from llama_index.core.vector_stores import MetadataFilters
+
+
+def create_chat_engine(
+    index: VectorStoreIndex,
+    filters: MetadataFilters | None = None,
+    lexical_index: LexicalIndex | None = None,
+    memory: BaseMemory | None = None
+):
     """
     Create a chat engine with context mode and memory.
     
+    With ADAPTIVE_TOP_K_ENABLED the number of profiles is chosen per query
+    (see AdaptiveRetriever). Retrieved profiles pass through a ContextPacker,
+    so the prompt holds each profile once and stays within the token budget.
+    
     Args:
         index: VectorStoreIndex instance
         filters: Optional metadata filters for search
+        lexical_index: Optional BM25 index; when given, retrieval is hybrid
+        memory: Optional existing chat memory to continue; a new one otherwise (see create_chat_memory)
         
     Returns:
         Chat engine instance configured for context-based chat
     """
-    chat_engine = index.as_chat_engine(
-        chat_mode="context",
+    from llama_index.core.chat_engine import ContextChatEngine
+    
+    from chat_memory import create_chat_memory
+    from context_packer import ContextPacker
+    from retrieval import AdaptiveRetriever, HybridRetriever, VectorRetriever
+    
+    if memory is None:
+        memory = create_chat_memory()
+        
+    packer = ContextPacker()
+    top_k = MAX_TOP_K if ADAPTIVE_TOP_K_ENABLED else SIMILARITY_TOP_K
+    
+    if HYBRID_SEARCH_ENABLED and lexical_index is not None:
+        retriever = HybridRetriever(index, lexical_index, filters=filters, similarity_top_k=top_k)
+    else:
+        retriever = VectorRetriever(index, filters=filters, similarity_top_k=top_k)
+        
+    if ADAPTIVE_TOP_K_ENABLED:
+        retriever = AdaptiveRetriever(retriever, token_counter=packer.count_tokens, token_budget=packer.token_budget)
+        
+    return ContextChatEngine.from_defaults(
+        retriever=retriever,
         system_prompt=SYSTEM_PROMPT,
-        memory=ChatMemoryBuffer.from_defaults(token_limit=CHAT_MEMORY_TOKEN_LIMIT),
-        filters=filters,
-        similarity_top_k=SIMILARITY_TOP_K  # Retrieve more results for better coverage
+        memory=memory,
+        node_postprocessors=[packer]
     )
+
+
+def timed_token_stream(response, start: float, timings: Dict[str, float]) -> Iterator[str]:
+    """
+    Yield tokens from a streaming chat response while timing the turn.
+    
+    Args:
+        response: StreamingAgentChatResponse from chat_engine.stream_chat
+        start: time.perf_counter() value taken when the turn started
+        timings: Dict updated in place with "ttft" (time to first token)
+            and "total", both in seconds since start
+            
+    Yields:
+        Response text deltas as the LLM produces them
+    """
+    for token in response.response_gen:
+        if "ttft" not in timings:
+            timings["ttft"] = round(time.perf_counter() - start, 4)
+        yield token
+    timings.setdefault("ttft", round(time.perf_counter() - start, 4))
+    timings["total"] = round(time.perf_counter() - start, 4)
+
+
+def source_names(response) -> List[str]:
+    """
+    Get the distinct profile names a response was based on.
+    
+    Args:
+        response: Chat engine response object
+        
+    Returns:
+        Names in retrieval order
+    """
+    return list(dict.fromkeys(node.metadata.get("name", "Unknown") for node in response.source_nodes))
+
+
+def context_packing_stats(chat_engine) -> Dict[str, int]:
+    """
+    Get how the context of the chat engine's last turn was packed.
+    
+    Args:
+        chat_engine: Chat engine created by create_chat_engine
+        
+    Returns:
+        ContextPacker.last_stats, or an empty dict if the engine has no packer
+    """
+    from context_packer import ContextPacker
+    
+    for postprocessor in getattr(chat_engine, "_node_postprocessors", []):
+        if isinstance(postprocessor, ContextPacker):
+            return postprocessor.last_stats
+    return {}
+
+
+def pending_results(chat_engine) -> int:
+    """
+    Get how many candidates of the last query can still be paged with "show more".
+    
+    Args:
+        chat_engine: Chat engine created by create_chat_engine
+        
+    Returns:
+        Number of pending candidates, 0 without adaptive retrieval
+    """
+    from retrieval import AdaptiveRetriever
+    
+    retriever = getattr(chat_engine, "_retriever", None)
+    return retriever.pending if isinstance(retriever, AdaptiveRetriever) else 0
+
+
+def record_exchange(memory: BaseMemory, user_message: str, answer: str):
+    """
+    Add a turn answered without the chat engine to the session's chat memory.
+    
+    Routed and cached answers never reach the LLM, but follow-up questions
+    ("which of them know Kafka?") still need them in the history.
+    
+    Args:
+        memory: Chat memory of the session (see ChatEngineRegistry.memory)
+        user_message: User query
+        answer: Answer shown to the user
+    """
+    from llama_index.core.llms import ChatMessage, MessageRole
     
-    return chat_engine
+    memory.put(ChatMessage(role=MessageRole.USER, content=user_message))
+    memory.put(ChatMessage(role=MessageRole.ASSISTANT, content=answer))
@@ -0,0 +1,305 @@
+"""
+Chat memory module.
+Rolling summarized chat memory: recent turns verbatim, older turns folded into a summary in the background.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from llama_index.core import Settings
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import LLM, ChatMessage, MessageRole
+from llama_index.core.memory import BaseMemory, ChatMemoryBuffer
+
+from config import (
+    CHAT_MEMORY_TOKEN_LIMIT,
+    CHAT_MEMORY_RECENT_TURNS,
+    CHAT_SUMMARY_ENABLED,
+    CHAT_SUMMARY_TOKEN_LIMIT,
+    CHAT_SUMMARY_MIN_PENDING_TOKENS,
+    CHAT_SUMMARY_MAX_DEFER
+)
+from metrics import span
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an internal expertise "
+    "assistant. Merge the new turns into the summary. Keep the people, teams, skills, projects and "
+    "locations asked about or recommended, and what the user is looking for; drop pleasantries. "
+    "Answer with the updated summary only, in at most {words} words."
+)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _summary_executor() -> ThreadPoolExecutor:
+    """Process-wide worker pool for summary updates, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="chat-summary")
+        return _executor
+
+
+_foreground = threading.Condition()
+_foreground_generations = 0
+
+
+@contextmanager
+def foreground_generation() -> Iterator[None]:
+    """Mark a user-facing LLM generation; summary updates wait while any is running."""
+    global _foreground_generations
+    with _foreground:
+        _foreground_generations += 1
+    try:
+        yield
+    finally:
+        with _foreground:
+            _foreground_generations -= 1
+            if not _foreground_generations:
+                _foreground.notify_all()
+
+
+def _wait_for_foreground(timeout: float) -> bool:
+    """Wait until no user generation is running; returns whether it had to wait."""
+    with _foreground:
+        if not _foreground_generations:
+            return False
+        _foreground.wait_for(lambda: not _foreground_generations, timeout)
+        return True
+
+
+class SummaryMemory(BaseMemory):
+    """
+    Chat memory keeping the last recent_turns exchanges verbatim and older ones as a rolling summary.
+    
+    When an answer is stored and more than recent_turns exchanges are held,
+    the oldest exchanges move to a pending list. Once summary_min_tokens
+    are pending, a background worker folds them into the summary with one
+    LLM call, so the user never waits for it; the worker runs at low
+    priority, waiting up to summary_max_defer seconds while user answers
+    are generated (see foreground_generation). Until the summary catches
+    up, pending turns are still sent verbatim. get() returns the summary as a system message followed by the
+    newest messages that fit into token_limit, so the history sent per turn
+    stays about the same size however long the chat runs.
+    
+    Each message is tokenized once when it is stored and the summary once
+    per update; get() only adds up cached counts.
+    
+    Args:
+        token_limit: Maximum history tokens returned by get()
+        recent_turns: Exchanges (user message and reply) kept verbatim
+        summary_token_limit: Target length of the summary
+        summary_min_tokens: Pending tokens that trigger a summary update
+        summary_max_defer: Seconds an update waits for user generations
+        llm: LLM writing the summary; Settings.llm by default
+        tokenizer: Callable text -> tokens; Settings.tokenizer by default
+    """
+    
+    token_limit: int = Field(default=CHAT_MEMORY_TOKEN_LIMIT)
+    recent_turns: int = Field(default=CHAT_MEMORY_RECENT_TURNS)
+    summary_token_limit: int = Field(default=CHAT_SUMMARY_TOKEN_LIMIT)
+    summary_min_tokens: int = Field(default=CHAT_SUMMARY_MIN_PENDING_TOKENS)
+    summary_max_defer: float = Field(default=CHAT_SUMMARY_MAX_DEFER)
+    
+    _llm: Optional[LLM] = PrivateAttr(default=None)
+    _tokenizer: Optional[Callable[[str], List]] = PrivateAttr(default=None)
+    _summary: Optional[Tuple[ChatMessage, int]] = PrivateAttr(default=None)
+    _pending: List[Tuple[ChatMessage, int]] = PrivateAttr(default_factory=list)  # oldest first
+    _recent: List[Tuple[ChatMessage, int]] = PrivateAttr(default_factory=list)
+    _lock: Any = PrivateAttr(default_factory=threading.RLock)
+    _future: Optional[Future] = PrivateAttr(default=None)
+    _summarizing: bool = PrivateAttr(default=False)
+    _generation: int = PrivateAttr(default=0)  # bumped by reset(), so late summaries are discarded
+    _summaries: int = PrivateAttr(default=0)
+    _summarized_messages: int = PrivateAttr(default=0)
+    _summary_failures: int = PrivateAttr(default=0)
+    _summary_deferrals: int = PrivateAttr(default=0)
+    
+    def __init__(self, llm: Optional[LLM] = None, tokenizer: Optional[Callable[[str], List]] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._llm = llm
+        self._tokenizer = tokenizer
+        
+    @classmethod
+    def class_name(cls) -> str:
+        return "SummaryMemory"
+        
+    @classmethod
+    def from_defaults(cls, **kwargs: Any) -> "SummaryMemory":
+        return cls(**kwargs)
+        
+    def _count(self, text: str) -> int:
+        tokenizer = self._tokenizer or Settings.tokenizer
+        return len(tokenizer(text))
+        
+    def _entry(self, message: ChatMessage) -> Tuple[ChatMessage, int]:
+        return message, self._count(str(message.content or ""))
+        
+    def get(self, input: Optional[str] = None, **kwargs: Any) -> List[ChatMessage]:
+        """
+        History for the next LLM call.
+        
+        Args:
+            input: Current user message (unused; the history does not depend on it)
+            
+        Returns:
+            Summary system message, if any, then the newest pending and recent
+            messages within token_limit, starting at a user message
+        """
+        with self._lock:
+            summary = self._summary
+            entries = self._pending + self._recent
+            
+        budget = self.token_limit - (summary[1] if summary is not None else 0)
+        start = len(entries)
+        while start > 0 and entries[start - 1][1] <= budget:
+            start -= 1
+            budget -= entries[start][1]
+        # Never open the history with a reply whose question was cut
+        while start < len(entries) and entries[start][0].role != MessageRole.USER:
+            start += 1
+            
+        messages = [message for message, _ in entries[start:]]
+        return ([summary[0]] if summary is not None else []) + messages
+        
+    def get_all(self) -> List[ChatMessage]:
+        """Summary system message, if any, followed by every message not yet folded into it."""
+        with self._lock:
+            summary = [self._summary[0]] if self._summary is not None else []
+            return summary + [message for message, _ in self._pending + self._recent]
+            
+    def put(self, message: ChatMessage) -> None:
+        """Store a message; storing a reply may queue a summary update in the background."""
+        entry = self._entry(message)
+        with self._lock:
+            self._recent.append(entry)
+            if message.role == MessageRole.ASSISTANT:
+                self._roll()
+                
+    def set(self, messages: List[ChatMessage]) -> None:
+        """Replace the history; older exchanges are summarized in the background."""
+        entries = [self._entry(message) for message in messages]
+        with self._lock:
+            self.reset()
+            self._recent = entries
+            self._roll()
+            
+    def reset(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._summary = None
+            self._pending = []
+            self._recent = []
+            
+    def _roll(self):
+        """Move exchanges beyond recent_turns to pending and queue a summary update once enough are pending."""
+        user_positions = [i for i, (message, _) in enumerate(self._recent) if message.role == MessageRole.USER]
+        if len(user_positions) > self.recent_turns:
+            cut = user_positions[-self.recent_turns] if self.recent_turns else len(self._recent)
+            self._pending += self._recent[:cut]
+            self._recent = self._recent[cut:]
+            
+        # Pending turns are sent verbatim until summarized; beyond the limit they could never be
+        while sum(tokens for _, tokens in self._pending) > self.token_limit:
+            self._pending.pop(0)
+            
+        # Capped at token_limit, which pending turns never exceed
+        threshold = max(1, min(self.summary_min_tokens, self.token_limit))
+        if not self._summarizing and sum(tokens for _, tokens in self._pending) >= threshold:
+            self._summarizing = True
+            self._future = _summary_executor().submit(self._summarize)
+            
+    def _summarize(self):
+        """Fold pending messages into the summary until none are left (runs on the summary workers)."""
+        while True:
+            if _wait_for_foreground(self.summary_max_defer):
+                with self._lock:
+                    self._summary_deferrals += 1
+            with self._lock:
+                batch = list(self._pending)
+                summary = self._summary[0].content if self._summary is not None else "(none)"
+                generation = self._generation
+                if not batch:
+                    self._summarizing = False
+                    return
+                    
+            transcript = "\n".join(f"{message.role.value}: {message.content}" for message, _ in batch)
+            prompt = [
+                ChatMessage(role=MessageRole.SYSTEM, content=SUMMARY_PROMPT.format(words=self.summary_token_limit * 3 // 4)),
+                ChatMessage(role=MessageRole.USER, content=f"Summary so far:\n{summary}\n\nNew turns:\n{transcript}")
+            ]
+            try:
+                with span("chat_summary"):
+                    text = str((self._llm or Settings.llm).chat(prompt).message.content or "").strip()
+            except Exception as e:
+                # Pending turns stay verbatim; the next reply retries
+                with self._lock:
+                    self._summary_failures += 1
+                    self._summarizing = False
+                logger.warning("Chat summary update failed: %s", e)
+                return
+                
+            entry = self._entry(ChatMessage(role=MessageRole.SYSTEM, content=f"Summary of the earlier conversation:\n{text}"))
+            with self._lock:
+                if generation != self._generation:
+                    continue  # reset meanwhile; summarize whatever is pending now
+                # Only drop what was summarized; turns may have been added or trimmed meanwhile
+                summarized = {id(e) for e in batch}
+                self._pending = [e for e in self._pending if id(e) not in summarized]
+                self._summary = entry
+                self._summaries += 1
+                self._summarized_messages += len(batch)
+                
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for queued summary updates.
+        
+        Args:
+            timeout: Seconds to wait at most; None waits indefinitely
+            
+        Returns:
+            True if no update is running anymore
+        """
+        future = self._future
+        if future is None:
+            return True
+        wait([future], timeout)
+        return future.done()
+        
+    def stats(self) -> Dict[str, int]:
+        """
+        Get memory counters.
+        
+        Returns:
+            Dict with summaries written, messages summarized, failed and
+            deferred updates, and the summary, pending and recent sizes in tokens
+        """
+        with self._lock:
+            return {
+                "summaries": self._summaries,
+                "summarized_messages": self._summarized_messages,
+                "summary_failures": self._summary_failures,
+                "summary_deferrals": self._summary_deferrals,
+                "summary_tokens": self._summary[1] if self._summary is not None else 0,
+                "pending_tokens": sum(tokens for _, tokens in self._pending),
+                "recent_tokens": sum(tokens for _, tokens in self._recent)
+            }
+
+
+def create_chat_memory() -> BaseMemory:
+    """
+    Create the chat memory of a new conversation.
+    
+    Returns:
+        SummaryMemory with CHAT_SUMMARY_ENABLED, otherwise a ChatMemoryBuffer
+        holding the last CHAT_MEMORY_TOKEN_LIMIT tokens verbatim
+    """
+    if CHAT_SUMMARY_ENABLED:
+        return SummaryMemory()
+    return ChatMemoryBuffer.from_defaults(token_limit=CHAT_MEMORY_TOKEN_LIMIT)
@@ -6,17 +6,90 @@ Contains all configuration constants and settings.
 # Model Configuration
 MODEL_NAME = "llama3.2:3b"  # Ollama LLM model
 EMBED_MODEL_NAME = "nomic-embed-text"  # Ollama embedding model
+OLLAMA_BASE_URL = "http://localhost:11434"
 
 # Data Configuration
-DATA_PATH = "data/profiles.json"
+DATA_PATH = "data/profiles.json"  # JSON array or JSONL file (optionally .gz), or a directory of shards
+DOCUMENT_WORKERS = 1  # Processes building documents from profiles; 1 builds them inline, None uses every CPU
+DOCUMENT_CHUNK_SIZE = 1000  # Profiles sent to a document worker per task
+PROFILE_MAX_RECORD_CHARS = 8 << 20  # Longer JSON values count as malformed, so a broken export fails without being read whole
+
+# Index Persistence
+INDEX_PERSIST_DIR = "storage"  # Snapshot of vectors, docstore and index metadata
+INDEX_SCHEMA_VERSION = 5  # Bump when document text/metadata layout changes to force a rebuild
+VECTOR_STORE_MMAP = True  # Memory-map the persisted embedding matrix instead of reading it into RAM
+FILTER_INDEX_KEYS = ["location", "team"]  # Metadata keys with an inverted index for pre-filtering
+
+# Embedding Pipeline Settings
+EMBED_BATCH_SIZE = 32  # Texts per embedding request
+EMBED_MAX_CONCURRENCY = 4  # Concurrent embedding requests in flight
+EMBED_MAX_RETRIES = 3  # Retries per batch before ingestion fails
+EMBED_RETRY_BACKOFF = 0.5  # Base delay in seconds, doubled on every retry
+
+# Embedding Cache Settings
+EMBED_CACHE_ENABLED = True
+EMBED_CACHE_PATH = "cache/embeddings.sqlite"  # Shared by all processes on this host
+EMBED_CACHE_MAX_ENTRIES = 200_000  # LRU-evicted beyond this many vectors
+EMBED_CACHE_TOUCH_INTERVAL = 600  # Seconds before a hit refreshes its LRU timestamp, so most reads never write
+EMBED_CACHE_EVICT_SLACK = 0.05  # Share of max entries freed per eviction, so evictions stay occasional
 
 # LLM Settings
 LLM_TEMPERATURE = 0.6
 LLM_REQUEST_TIMEOUT = 300.0
+LLM_CONTEXT_WINDOW = 8192  # num_ctx requested from Ollama; bounds the retrieved context
+LLM_OUTPUT_RESERVE = 1024  # Context tokens kept free for the answer
 
 # Chat Engine Settings
-CHAT_MEMORY_TOKEN_LIMIT = 4000
-SIMILARITY_TOP_K = 15  # Reduced from 100 to prevent context window overload and timeouts
+CHAT_MEMORY_TOKEN_LIMIT = 4000  # Upper bound on chat history tokens sent per turn
+CHAT_SUMMARY_ENABLED = True  # Keep recent turns verbatim and fold older ones into a rolling summary off the critical path
+CHAT_MEMORY_RECENT_TURNS = 3  # Exchanges kept verbatim next to the summary
+CHAT_SUMMARY_TOKEN_LIMIT = 300  # Target length of the rolling summary
+CHAT_SUMMARY_MIN_PENDING_TOKENS = 500  # Summarize older turns once this many tokens are pending; fewer stay verbatim
+CHAT_SUMMARY_MAX_DEFER = 30  # Seconds a summary update waits for user generations to finish before running anyway
+STREAMING_ENABLED = True  # Render LLM tokens as they arrive instead of waiting for the full answer
+MAX_CHAT_SESSIONS = 500  # Sessions kept in the chat engine registry, least recently used evicted first
+SESSION_TTL_SECONDS = 1800  # Idle sessions are evicted after this long
+MAX_ENGINES_PER_SESSION = 4  # Filter combinations cached per session
+SIMILARITY_TOP_K = 15  # Fixed number of results when ADAPTIVE_TOP_K_ENABLED is off
+CONTEXT_TOKEN_BUDGET = None  # Profile tokens sent to the LLM per turn; None derives it from LLM_CONTEXT_WINDOW
+
+# Adaptive Retrieval Settings
+ADAPTIVE_TOP_K_ENABLED = True  # Choose the number of profiles per query from the score distribution
+MIN_TOP_K = 3  # Profiles always kept when available
+MAX_TOP_K = 60  # Candidates retrieved before cutting; the rest of them can be paged with "show more"
+SCORE_GAP_RATIO = 0.25  # Cut at the largest vector similarity drop if it spans at least this share of the similarity range
+
+# Hybrid Retrieval Settings
+HYBRID_SEARCH_ENABLED = True  # Fuse vector results with BM25 over skills, domains, projects and stacks
+BM25_K1 = 1.2
+BM25_B = 0.75
+RRF_K = 60  # Reciprocal rank fusion damping constant
+
+# Query Router Settings
+QUERY_ROUTER_ENABLED = True  # Answer plain lookups ("who knows Python") without the LLM
+ROUTER_MAX_RESULTS = 25  # People listed in one routed answer
+
+# Answer Cache Settings
+ANSWER_CACHE_ENABLED = True  # Reuse answers to semantically equivalent questions
+ANSWER_CACHE_THRESHOLD = 0.92  # Minimum cosine similarity between question embeddings
+ANSWER_CACHE_MAX_ENTRIES = 1000  # Cached answers kept, least recently used evicted
+ANSWER_CACHE_TTL_SECONDS = 3600  # Lifetime of a cached answer
+
+# Request Coalescing Settings
+COALESCE_QUERIES = True  # Concurrent identical questions share one retrieval + generation
+
+# Metrics Settings
+METRICS_ENABLED = True  # Per-stage latency histograms and LLM token counters (/metrics, sidebar panel)
+
+# HTTP API Settings
+API_HOST = "127.0.0.1"
+API_PORT = 8000
+OLLAMA_MAX_CONNECTIONS = 32  # Pooled connections to Ollama shared by all API requests
+
+# Warm-up Settings
+WARMUP_ENABLED = True  # Load the index and make both models resident in Ollama in a background thread at startup
+WARMUP_KEEP_ALIVE_INTERVAL = 240  # Seconds between pings keeping the models loaded (Ollama unloads after 5 idle minutes)
+WARMUP_RETRY_INTERVAL = 10  # Seconds between pings while Ollama is not reachable yet
 
 # System Prompt for Chat Engine
 SYSTEM_PROMPT = """
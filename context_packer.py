@@ -0,0 +1,152 @@
+"""
+Context packer module.
+Fits retrieved profiles into the LLM's context token budget.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from llama_index.core import Settings
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+
+from config import (
+    CONTEXT_TOKEN_BUDGET,
+    LLM_CONTEXT_WINDOW,
+    LLM_OUTPUT_RESERVE,
+    CHAT_MEMORY_TOKEN_LIMIT,
+    SYSTEM_PROMPT
+)
+from metrics import span
+
+logger = logging.getLogger(__name__)
+
+
+def context_token_budget() -> int:
+    """
+    Get the number of context tokens available for retrieved profiles.
+    
+    Returns:
+        CONTEXT_TOKEN_BUDGET if set, otherwise what is left of
+        LLM_CONTEXT_WINDOW after the answer, the chat memory and the system prompt
+    """
+    if CONTEXT_TOKEN_BUDGET is not None:
+        return CONTEXT_TOKEN_BUDGET
+    return (
+        LLM_CONTEXT_WINDOW - LLM_OUTPUT_RESERVE - CHAT_MEMORY_TOKEN_LIMIT
+        - len(Settings.tokenizer(SYSTEM_PROMPT))
+    )
+
+
+class ContextPacker(BaseNodePostprocessor):
+    """
+    Node postprocessor run between retrieval and the LLM.
+    
+    Keeps one node per profile and adds profiles in retrieval order while
+    they fit into token_budget; a profile that does not fit is skipped so a
+    shorter one further down can still be used. The best profile is always
+    kept, even if it alone exceeds the budget. Token counts are cached per
+    node content hash, so packing a query costs no tokenizer calls once the
+    profiles have been seen.
+    
+    Args:
+        token_budget: Maximum number of context tokens sent to the LLM
+        tokenizer: Callable text -> tokens; Settings.tokenizer by default
+    """
+    
+    token_budget: int = Field(default_factory=context_token_budget)
+    
+    _tokenizer: Optional[Callable[[str], List]] = PrivateAttr(default=None)
+    _token_counts: Dict[str, int] = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+    _queries: int = PrivateAttr(default=0)
+    _tokens_retrieved: int = PrivateAttr(default=0)
+    _tokens_packed: int = PrivateAttr(default=0)
+    _last: Dict[str, int] = PrivateAttr(default_factory=dict)
+    
+    def __init__(self, tokenizer: Optional[Callable[[str], List]] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._tokenizer = tokenizer
+        
+    @classmethod
+    def class_name(cls) -> str:
+        return "ContextPacker"
+        
+    def count_tokens(self, node_with_score: NodeWithScore) -> int:
+        """
+        Count the tokens a node contributes to the LLM context.
+        
+        Args:
+            node_with_score: Retrieved node
+            
+        Returns:
+            Number of tokens of the node's LLM-facing content
+        """
+        node = node_with_score.node
+        count = self._token_counts.get(node.hash)
+        if count is None:
+            tokenizer = self._tokenizer or Settings.tokenizer
+            count = len(tokenizer(node.get_content(metadata_mode=MetadataMode.LLM)))
+            self._token_counts[node.hash] = count
+        return count
+        
+    def _postprocess_nodes(
+        self,
+        nodes: List[NodeWithScore],
+        query_bundle: Optional[QueryBundle] = None
+    ) -> List[NodeWithScore]:
+        seen = set()
+        packed = []
+        retrieved_tokens = 0
+        packed_tokens = 0
+        
+        with span("context_pack"):
+            for node_with_score in nodes:
+                tokens = self.count_tokens(node_with_score)
+                retrieved_tokens += tokens
+                profile_id = node_with_score.node.ref_doc_id or node_with_score.node.node_id
+                if profile_id in seen:
+                    continue
+                if packed and packed_tokens + tokens > self.token_budget:
+                    continue
+                seen.add(profile_id)
+                packed.append(node_with_score)
+                packed_tokens += tokens
+            
+        last = {
+            "nodes_retrieved": len(nodes),
+            "nodes_packed": len(packed),
+            "tokens_retrieved": retrieved_tokens,
+            "tokens_packed": packed_tokens,
+            "tokens_saved": retrieved_tokens - packed_tokens
+        }
+        with self._lock:
+            self._queries += 1
+            self._tokens_retrieved += retrieved_tokens
+            self._tokens_packed += packed_tokens
+            self._last = last
+        logger.info("Context packed: %s", last)
+        return packed
+        
+    @property
+    def last_stats(self) -> Dict[str, int]:
+        """Packing result of the most recent query."""
+        return dict(self._last)
+        
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get packing counters.
+        
+        Returns:
+            Dict with queries, tokens retrieved/packed/saved and the saved share
+        """
+        saved = self._tokens_retrieved - self._tokens_packed
+        return {
+            "queries": self._queries,
+            "tokens_retrieved": self._tokens_retrieved,
+            "tokens_packed": self._tokens_packed,
+            "tokens_saved": saved,
+            "saved_share": round(saved / self._tokens_retrieved, 4) if self._tokens_retrieved else 0.0
+        }
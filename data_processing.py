@@ -3,40 +3,220 @@ Data processing module.
 Handles loading profiles from JSON and converting them to LlamaIndex documents.
 """
 
+from __future__ import annotations
+
+import gzip
 import json
 import os
-from typing import List, Dict, Any
-from llama_index.core import Document
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from config import DATA_PATH, DOCUMENT_CHUNK_SIZE, DOCUMENT_WORKERS, PROFILE_MAX_RECORD_CHARS
+
+if TYPE_CHECKING:
+    from llama_index.core import Document
+
+# Profile exports: JSON arrays, JSONL/NDJSON, each optionally gzip'd
+PROFILE_FILE_SUFFIXES = (".json", ".jsonl", ".ndjson")
+_READ_CHUNK_CHARS = 1 << 20
+_SEPARATORS = " \t\r\n,"
+
+
+def profile_files(path: str = DATA_PATH) -> List[str]:
+    """
+    List the files holding the profiles of a path.
+    
+    Args:
+        path: Profiles file, or a directory of shard files
+        
+    Returns:
+        [path] for a file; the directory's profile files sorted by name otherwise
+    """
+    if not os.path.isdir(path):
+        return [path]
+    return [
+        os.path.join(path, name) for name in sorted(os.listdir(path))
+        if name.removesuffix(".gz").endswith(PROFILE_FILE_SUFFIXES) and os.path.isfile(os.path.join(path, name))
+    ]
 
-from config import DATA_PATH
+
+def _iter_json_values(f: TextIO, max_record_chars: int = PROFILE_MAX_RECORD_CHARS) -> Iterator[Any]:
+    """
+    Decode the elements of a JSON array, or whitespace-separated JSON values (JSONL), one at a time.
+    
+    Only a chunk of the file plus the value being decoded are held in memory.
+    A value that still does not decode once max_record_chars of it are
+    buffered raises ValueError, so a malformed record does not pull the rest
+    of the file into memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, pos = "", 0
+    offset = 0  # file position of buffer[0]
+    eof = False
+    in_array = None
+    
+    while True:
+        while pos < len(buffer) and buffer[pos] in _SEPARATORS:
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                return
+            chunk = f.read(_READ_CHUNK_CHARS)
+            eof = not chunk
+            offset += len(buffer)
+            buffer, pos = chunk, 0
+            continue
+            
+        if in_array is None:
+            in_array = buffer[pos] == "["
+            if in_array:
+                pos += 1
+                continue
+        if in_array and buffer[pos] == "]":
+            return
+            
+        try:
+            value, pos = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise
+            if len(buffer) - pos >= max_record_chars:
+                raise ValueError(
+                    f"Malformed JSON value at character {offset + pos} "
+                    f"(or longer than {max_record_chars} characters): {e.msg}"
+                ) from None
+            # The value continues in the next chunk
+            chunk = f.read(_READ_CHUNK_CHARS)
+            eof = not chunk
+            offset += pos
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield value
+
+
+def _iter_profile_files(files: List[str]) -> Iterator[Dict[str, Any]]:
+    for file_path in files:
+        opener = gzip.open if file_path.endswith(".gz") else open
+        with opener(file_path, "rt", encoding="utf-8") as f:
+            for profile in _iter_json_values(f):
+                if not isinstance(profile, dict):
+                    raise ValueError(f"{file_path}: expected profile objects, got {type(profile).__name__}")
+                yield profile
+
+
+def iter_profiles(path: str = DATA_PATH) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily read employee profiles, one at a time.
+    
+    Reads JSON arrays and JSONL files, gzip'd or not, or every such file in
+    a directory of shards (in name order). Memory use does not grow with
+    the size of the export.
+    
+    Args:
+        path: Profiles file or directory of shard files
+        
+    Returns:
+        Iterator over profile dictionaries
+        
+    Raises:
+        FileNotFoundError: If the path doesn't exist
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+    return _iter_profile_files(profile_files(path))
 
 
 def load_profiles_from_json(file_path: str = DATA_PATH) -> List[Dict[str, Any]]:
     """
-    Load employee profiles from JSON file.
+    Load all employee profiles into a list.
+    
+    Accepts everything iter_profiles reads; prefer iter_profiles when the
+    profiles are only passed through once.
     
     Args:
-        file_path: Path to the profiles JSON file
+        file_path: Profiles file or directory of shard files
         
     Returns:
         List of profile dictionaries
         
     Raises:
-        FileNotFoundError: If the JSON file doesn't exist
+        FileNotFoundError: If the path doesn't exist
+    """
+    return list(iter_profiles(file_path))
+
+
+_SENTENCE_SPLIT = re.compile(r"(?<=\.)\s+")
+_LABELLED_SENTENCE = re.compile(r"^([A-Z][\w ]{0,30}):\s*(.+?)\.?$")
+
+
+def merge_descriptions(descriptions: List[str]) -> str:
     """
-    if not os.path.exists(file_path):
-        raise FileNotFoundError(f"File not found: {file_path}")
+    Merge descriptions of the same project into one.
     
-    with open(file_path, "r") as f:
-        profiles = json.load(f)
+    Repeated sentences are kept once and labelled sentences are combined,
+    so "Built X. Focus: Redis." + "Built X. Focus: Kafka." becomes
+    "Built X. Focus: Redis, Kafka."
     
-    return profiles
+    Args:
+        descriptions: Project descriptions in profile order
+        
+    Returns:
+        Merged description
+    """
+    sentences: Dict[str, List[str]] = {}  # plain sentence -> [] or label -> values
+    for desc in descriptions:
+        for sentence in _SENTENCE_SPLIT.split(desc.strip()):
+            if not sentence:
+                continue
+            labelled = _LABELLED_SENTENCE.match(sentence)
+            if labelled:
+                values = sentences.setdefault(labelled.group(1) + ":", [])
+                if labelled.group(2) not in values:
+                    values.append(labelled.group(2))
+            else:
+                sentences.setdefault(sentence, [])
+                
+    return " ".join(
+        f"{key} {', '.join(values)}." if values else key
+        for key, values in sentences.items()
+    )
+
+
+def merge_duplicate_projects(projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Merge projects that appear several times in one profile under the same name.
+    
+    Args:
+        projects: List of project dictionaries
+        
+    Returns:
+        One project per name, in order of first appearance, with merged
+        descriptions and the union of the tech stacks
+    """
+    merged: Dict[str, Dict[str, Any]] = {}
+    for proj in projects:
+        p_name = proj.get("name", "Unnamed Project")
+        entry = merged.setdefault(p_name, {"name": p_name, "descs": [], "stack": []})
+        if proj.get("desc"):
+            entry["descs"].append(proj["desc"])
+        entry["stack"].extend(t for t in proj.get("stack", []) if t not in entry["stack"])
+        
+    return [
+        {"name": entry["name"], "desc": merge_descriptions(entry["descs"]), "stack": entry["stack"]}
+        for entry in merged.values()
+    ]
 
 
 def extract_project_information(projects: List[Dict[str, Any]]) -> tuple[List[str], List[str], List[str]]:
     """
     Extract structured information from project data.
     
+    Duplicate entries of the same project are merged first (see
+    merge_duplicate_projects) so the LLM context does not repeat them.
+    
     Args:
         projects: List of project dictionaries
         
@@ -53,7 +233,7 @@ def extract_project_information(projects: List[Dict[str, Any]]) -> tuple[List[st
     if not projects:
         return project_details, project_names, project_stacks
     
-    for proj in projects:
+    for proj in merge_duplicate_projects(projects):
         p_name = proj.get("name", "Unnamed Project")
         p_desc = proj.get("desc", "")
         p_stack = ", ".join(proj.get("stack", []))
@@ -100,11 +280,8 @@ def create_document_content(profile: Dict[str, Any]) -> tuple[str, Dict[str, Any
     
     projects_text = "\n".join(project_details) if project_details else "No projects listed."
     
-    # 4. Keyword Stuffing for better vector retrieval
-    # Explicitly list keywords to boost retrieval matching
-    all_keywords = f"{name}, {team}, {skills}, {domains}, {', '.join(project_names)}, {', '.join(project_stacks)}"
-    
-    # 5. Final Text Blob for embedding
+    # 4. Final Text Blob for embedding
+    # Exact skill/stack matches are handled by the lexical index (see lexical_index.py)
     # We use delimiters to help the LLM strictly separate this profile from others in the context window
     text_content = (
         f"<<< PROFILE START >>>\n"
@@ -116,11 +293,10 @@ def create_document_content(profile: Dict[str, Any]) -> tuple[str, Dict[str, Any
         f"Skills: {skills}\n"
         f"Domains: {domains}\n"
         f"Projects:\n{projects_text}\n"
-        f"--- Search Keywords ---\n{all_keywords}\n"
         f"<<< PROFILE END >>>"
     )
     
-    # 6. Metadata for filtering and debugging
+    # 5. Metadata for filtering and debugging
     metadata = {
         "name": name,
         "team": team,
@@ -131,25 +307,129 @@ def create_document_content(profile: Dict[str, Any]) -> tuple[str, Dict[str, Any
     return text_content, metadata
 
 
-def convert_profiles_to_documents(profiles: List[Dict[str, Any]]) -> List[Document]:
+def get_profile_id(profile: Dict[str, Any]) -> str | None:
     """
-    Convert employee profiles to LlamaIndex Document objects.
+    Get the stable identifier of a profile.
     
     Args:
-        profiles: List of employee profile dictionaries
+        profile: Employee profile dictionary
         
     Returns:
-        List of LlamaIndex Document objects
+        The profile "id", falling back to the email address; None if neither is set
+    """
+    return profile.get("id") or profile.get("email")
+
+
+DocumentFields = Tuple[str, Dict[str, Any], str | None]
+
+
+def _document_fields(profile: Dict[str, Any]) -> DocumentFields:
+    """Text, metadata and id of a profile's document."""
+    text_content, metadata = create_document_content(profile)
+    return text_content, metadata, get_profile_id(profile)
+
+
+def _document_fields_chunk(profiles: List[Dict[str, Any]]) -> List[DocumentFields]:
+    """Document fields of a chunk of profiles; runs in the document worker processes."""
+    return [_document_fields(profile) for profile in profiles]
+
+
+def make_document(text_content: str, metadata: Dict[str, Any], profile_id: str | None) -> Document:
     """
-    documents = []
+    Build the document for a profile's content (see create_document_content).
     
-    for profile in profiles:
-        text_content, metadata = create_document_content(profile)
+    Args:
+        text_content: Document text
+        metadata: Document metadata
+        profile_id: Document id (see get_profile_id); None keeps the random default
         
-        doc = Document(
-            text=text_content,
-            metadata=metadata
-        )
-        documents.append(doc)
+    Returns:
+        LlamaIndex Document object
+    """
+    from llama_index.core import Document
     
-    return documents
+    doc = Document(
+        text=text_content,
+        metadata=metadata
+    )
+    if profile_id:
+        doc.id_ = profile_id
+    return doc
+
+
+def _iter_document_fields_parallel(
+    profiles: Iterable[Dict[str, Any]],
+    workers: int,
+    chunk_size: int
+) -> Iterator[DocumentFields]:
+    """
+    Build document fields for chunks of profiles in a process pool, in input order.
+    
+    At most two chunks per worker are in flight, so a streamed input stays
+    bounded in memory. Waiting on the oldest chunk blocks the consumer, which
+    is why the embedding pipeline pulls its input on a side thread.
+    """
+    iterator = iter(profiles)
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            while chunk := list(islice(iterator, chunk_size)):
+                pending.append(pool.submit(_document_fields_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # Stopped early (or failed): do not wait for chunks nobody will read
+            for future in pending:
+                future.cancel()
+
+
+def iter_documents(
+    profiles: Iterable[Dict[str, Any]],
+    workers: int | None = DOCUMENT_WORKERS,
+    chunk_size: int = DOCUMENT_CHUNK_SIZE
+) -> Iterator[Document]:
+    """
+    Lazily convert employee profiles to LlamaIndex Document objects.
+    
+    Documents are keyed by the profile id so the index can be updated
+    incrementally when individual profiles change. With more than one
+    worker, the text of chunks of profiles is built in a process pool;
+    documents still come out in input order with the same text.
+    
+    Args:
+        profiles: Employee profile dictionaries, consumed one at a time
+        workers: Worker processes; 1 builds documents inline, None uses every CPU
+        chunk_size: Profiles per worker task
+        
+    Yields:
+        LlamaIndex Document objects
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        fields = map(_document_fields, profiles)
+    else:
+        fields = _iter_document_fields_parallel(profiles, workers, chunk_size)
+        
+    for text_content, metadata, profile_id in fields:
+        yield make_document(text_content, metadata, profile_id)
+    
+
+def convert_profiles_to_documents(
+    profiles: Iterable[Dict[str, Any]],
+    workers: int | None = DOCUMENT_WORKERS,
+    chunk_size: int = DOCUMENT_CHUNK_SIZE
+) -> List[Document]:
+    """
+    Convert employee profiles to LlamaIndex Document objects.
+    
+    Args:
+        profiles: Employee profile dictionaries
+        workers: Worker processes (see iter_documents)
+        chunk_size: Profiles per worker task
+        
+    Returns:
+        List of LlamaIndex Document objects (see iter_documents)
+    """
+    return list(iter_documents(profiles, workers, chunk_size))
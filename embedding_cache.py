@@ -0,0 +1,297 @@
+"""
+Embedding cache module.
+Persistent, content-addressed embedding cache shared across processes.
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from llama_index.core.bridge.pydantic import PrivateAttr
+
+from config import EMBED_CACHE_PATH, EMBED_CACHE_MAX_ENTRIES, EMBED_CACHE_TOUCH_INTERVAL, EMBED_CACHE_EVICT_SLACK
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings (last_access);
+CREATE TABLE IF NOT EXISTS cache_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def hash_text(text: str) -> str:
+    """Return the sha256 hex digest used as the content address of a text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache keyed by (model, sha256 of text).
+    
+    The database runs in WAL mode, so any number of processes can read while
+    one writes. Lookups only write when a hit's access time is older than
+    touch_interval, so readers rarely take the write lock. Entries are
+    evicted least-recently-used once the cache grows beyond max_entries.
+    The row count lives in the database and is updated in the same
+    transaction as every write, so it stays exact with several writer
+    processes, and each eviction frees evict_slack of the limit so the
+    next one is a while off. Hit/miss counters are kept per process.
+    
+    Args:
+        path: SQLite database file
+        max_entries: Maximum number of cached vectors across all models
+        touch_interval: Seconds before a hit refreshes its access time
+        evict_slack: Share of max_entries freed below the limit per eviction
+    """
+    
+    def __init__(
+        self,
+        path: str = EMBED_CACHE_PATH,
+        max_entries: int = EMBED_CACHE_MAX_ENTRIES,
+        touch_interval: float = EMBED_CACHE_TOUCH_INTERVAL,
+        evict_slack: float = EMBED_CACHE_EVICT_SLACK
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_interval = touch_interval
+        self.evict_slack = evict_slack
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+        
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread; sqlite3 connections are not thread-safe."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+        
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[Embedding]]:
+        """
+        Look up embeddings for a list of texts.
+        
+        Args:
+            model: Embedding model namespace
+            texts: Texts to look up
+            
+        Returns:
+            List aligned with texts, holding the embedding or None on a miss
+        """
+        hashes = [hash_text(t) for t in texts]
+        conn = self._connection()
+        found: Dict[str, Embedding] = {}
+        stale: List[str] = []
+        now = time.time()
+        
+        # Stay well below SQLite's bound-parameter limit
+        for start in range(0, len(hashes), 500):
+            chunk = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                "SELECT text_hash, vector, last_access FROM embeddings "
+                f"WHERE model = ? AND text_hash IN ({placeholders})",
+                [model, *chunk]
+            ).fetchall()
+            for text_hash, blob, last_access in rows:
+                vector = array("f")
+                vector.frombytes(blob)
+                found[text_hash] = vector.tolist()
+                if now - last_access >= self.touch_interval:
+                    stale.append(text_hash)
+                
+        # LRU order only needs minute precision; fresh hits skip the write lock entirely
+        if stale:
+            conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE model = ? AND text_hash = ?",
+                [(now, model, h) for h in stale]
+            )
+            
+        with self._stats_lock:
+            self.hits += sum(1 for h in hashes if h in found)
+            self.misses += sum(1 for h in hashes if h not in found)
+            
+        return [found.get(h) for h in hashes]
+        
+    def put_many(self, model: str, texts: List[str], embeddings: List[Embedding]):
+        """
+        Store embeddings and evict the least recently used entries if needed.
+        
+        Args:
+            model: Embedding model namespace
+            texts: Texts that were embedded
+            embeddings: Embeddings aligned with texts
+        """
+        if not texts:
+            return
+            
+        now = time.time()
+        vectors = {hash_text(t): array("f", e).tobytes() for t, e in zip(texts, embeddings)}
+        hashes = list(vectors)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            entries = self._row_count(conn)
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                entries -= len(conn.execute(
+                    f"SELECT text_hash FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall())
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_access) VALUES (?, ?, ?, ?)",
+                [(model, h, vector, now) for h, vector in vectors.items()]
+            )
+            entries += len(vectors)
+            if entries > self.max_entries:
+                entries -= self._evict(conn, entries)
+            conn.execute("UPDATE cache_meta SET value = ? WHERE key = 'entries'", (entries,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+            
+    def _row_count(self, conn: sqlite3.Connection) -> int:
+        """Rows in the cache; counted once into cache_meta, then kept up to date by every write."""
+        row = conn.execute("SELECT value FROM cache_meta WHERE key = 'entries'").fetchone()
+        if row is not None:
+            return row[0]
+        count = conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        conn.execute("INSERT INTO cache_meta (key, value) VALUES ('entries', ?)", (count,))
+        return count
+        
+    def _evict(self, conn: sqlite3.Connection, count: int) -> int:
+        """Drop the least recently used rows down to max_entries minus the slack; returns how many."""
+        overflow = count - int(self.max_entries * (1 - self.evict_slack))
+        deleted = conn.execute(
+            "DELETE FROM embeddings WHERE (model, text_hash) IN "
+            "(SELECT model, text_hash FROM embeddings ORDER BY last_access LIMIT ?)",
+            (overflow,)
+        ).rowcount
+        with self._stats_lock:
+            self.evictions += deleted
+        return deleted
+            
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters for this process.
+        
+        Returns:
+            Dict with hits, misses, evictions and hit_rate
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Embedding model wrapper that consults an EmbeddingCache before the wrapped model.
+    
+    Query and document embeddings are cached under separate namespaces,
+    since some models embed them with different instructions.
+    """
+    
+    _embed_model: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+    
+    def __init__(self, embed_model: BaseEmbedding, cache: EmbeddingCache, **kwargs: Any):
+        super().__init__(
+            model_name=embed_model.model_name,
+            embed_batch_size=embed_model.embed_batch_size,
+            **kwargs
+        )
+        self._embed_model = embed_model
+        self._cache = cache
+        
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+        
+    @property
+    def cache(self) -> EmbeddingCache:
+        return self._cache
+        
+    @property
+    def embed_model(self) -> BaseEmbedding:
+        return self._embed_model
+        
+    def _lookup(self, kind: str, texts: List[str]) -> tuple[str, List[Optional[Embedding]], List[int]]:
+        namespace = f"{self.model_name}#{kind}"
+        embeddings = self._cache.get_many(namespace, texts)
+        missing = [i for i, e in enumerate(embeddings) if e is None]
+        return namespace, embeddings, missing
+        
+    def _fill(self, namespace: str, texts: List[str], embeddings: List[Optional[Embedding]],
+              missing: List[int], computed: List[Embedding]) -> List[Embedding]:
+        for i, embedding in zip(missing, computed):
+            embeddings[i] = embedding
+        self._cache.put_many(namespace, [texts[i] for i in missing], computed)
+        return embeddings
+        
+    def _cached(self, kind: str, texts: List[str],
+                compute: Callable[[List[str]], List[Embedding]]) -> List[Embedding]:
+        namespace, embeddings, missing = self._lookup(kind, texts)
+        if not missing:
+            return embeddings
+        computed = compute([texts[i] for i in missing])
+        return self._fill(namespace, texts, embeddings, missing, computed)
+        
+    async def _acached(self, kind: str, texts: List[str],
+                       compute: Callable[[List[str]], Awaitable[List[Embedding]]]) -> List[Embedding]:
+        # SQLite calls block, and a write may wait for another process's lock, so they stay off the event loop
+        namespace, embeddings, missing = await asyncio.to_thread(self._lookup, kind, texts)
+        if not missing:
+            return embeddings
+        computed = await compute([texts[i] for i in missing])
+        return await asyncio.to_thread(self._fill, namespace, texts, embeddings, missing, computed)
+        
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self._cached(
+            "query", [query], lambda qs: [self._embed_model.get_query_embedding(q) for q in qs]
+        )[0]
+        
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        async def compute(qs: List[str]) -> List[Embedding]:
+            return [await self._embed_model.aget_query_embedding(q) for q in qs]
+        return (await self._acached("query", [query], compute))[0]
+        
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+        
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aget_text_embeddings([text]))[0]
+        
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return self._cached("text", texts, self._embed_model.get_text_embedding_batch)
+        
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self._acached("text", texts, self._embed_model.aget_text_embedding_batch)
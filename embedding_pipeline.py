@@ -0,0 +1,164 @@
+"""
+Embedding pipeline module.
+Embeds nodes in batches over a bounded pool of concurrent requests.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+from llama_index.core import Settings
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.ingestion import run_transformations
+from llama_index.core.schema import BaseNode, Document, MetadataMode
+
+from config import EMBED_BATCH_SIZE, EMBED_MAX_CONCURRENCY, EMBED_MAX_RETRIES, EMBED_RETRY_BACKOFF
+from metrics import span
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, float], None]
+BatchSink = Callable[[List[BaseNode]], None]
+
+
+def batched(items: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """
+    Split an iterable into lists of at most batch_size items.
+    
+    Args:
+        items: Any iterable, consumed lazily
+        batch_size: Maximum number of items per batch
+        
+    Yields:
+        Lists of consecutive items
+    """
+    iterator = iter(items)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def documents_to_nodes(documents: Sequence[Document]) -> List[BaseNode]:
+    """
+    Run the configured transformations (node parsing) without embedding.
+    
+    Args:
+        documents: Documents to split into nodes
+        
+    Returns:
+        List of nodes, still without embeddings
+    """
+    return run_transformations(list(documents), Settings.transformations)
+
+
+async def _embed_batch(
+    embed_model: BaseEmbedding,
+    batch: List[BaseNode],
+    max_retries: int,
+    backoff: float,
+    stats: Dict[str, Any]
+):
+    """Embed one batch in place, retrying with exponential backoff and jitter."""
+    texts = [node.get_content(metadata_mode=MetadataMode.EMBED) for node in batch]
+    
+    for attempt in range(max_retries + 1):
+        try:
+            with span("embed"):
+                embeddings = await embed_model.aget_text_embedding_batch(texts)
+            break
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            stats["retries"] += 1
+            delay = backoff * (2 ** attempt) * (1 + random.random())
+            logger.warning("Embedding batch failed (%s), retrying in %.2fs", e, delay)
+            await asyncio.sleep(delay)
+            
+    for node, embedding in zip(batch, embeddings):
+        node.embedding = embedding
+
+
+async def aembed_nodes(
+    nodes: Iterable[BaseNode],
+    embed_model: BaseEmbedding | None = None,
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_concurrency: int = EMBED_MAX_CONCURRENCY,
+    max_retries: int = EMBED_MAX_RETRIES,
+    backoff: float = EMBED_RETRY_BACKOFF,
+    progress_callback: ProgressCallback | None = None,
+    sink: BatchSink | None = None
+) -> Dict[str, Any]:
+    """
+    Embed nodes in place using batched, concurrent requests.
+    
+    Nodes that already carry an embedding are not sent to the model. Batches
+    are pulled lazily from the input, so at most max_concurrency batches are
+    in flight; with a sink, nodes are handed off batch by batch and the
+    input can be a generator far larger than memory. The input and the sink
+    run on one side thread, so a slow producer or index insert never stalls
+    the requests already in flight.
+    
+    Args:
+        nodes: Nodes to embed
+        embed_model: Embedding model, defaults to Settings.embed_model
+        batch_size: Texts per embedding request
+        max_concurrency: Maximum concurrent embedding requests
+        max_retries: Retries per batch before the error is raised
+        backoff: Base retry delay in seconds, doubled on every retry
+        progress_callback: Called with (embedded_count, docs_per_sec) after each batch
+        sink: Called with every batch once it carries embeddings (including
+            nodes that needed none), e.g. index.insert_nodes
+        
+    Returns:
+        Report dict with documents, batches, retries, seconds and docs_per_sec
+    """
+    embed_model = embed_model or Settings.embed_model
+    batches = batched(nodes, batch_size)
+    stats = {"documents": 0, "batches": 0, "retries": 0}
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    # Pulling a batch can block (reading files, waiting on document worker processes) and so can
+    # the sink; a single thread runs both, which keeps the event loop free and never touches the
+    # input or the index from two threads at once
+    io_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed-input")
+    
+    async def worker():
+        while (batch := await loop.run_in_executor(io_thread, next, batches, None)) is not None:
+            pending = [node for node in batch if node.embedding is None]
+            if pending:
+                await _embed_batch(embed_model, pending, max_retries, backoff, stats)
+                stats["documents"] += len(pending)
+                stats["batches"] += 1
+            if sink:
+                await loop.run_in_executor(io_thread, sink, batch)
+            if progress_callback and pending:
+                elapsed = time.perf_counter() - start
+                progress_callback(stats["documents"], stats["documents"] / elapsed if elapsed else 0.0)
+                
+    try:
+        await asyncio.gather(*(worker() for _ in range(max(1, max_concurrency))))
+    finally:
+        io_thread.shutdown(wait=False, cancel_futures=True)
+    
+    elapsed = time.perf_counter() - start
+    stats["seconds"] = round(elapsed, 4)
+    stats["docs_per_sec"] = round(stats["documents"] / elapsed, 2) if elapsed else 0.0
+    logger.info("Embedded %(documents)d nodes in %(seconds).2fs (%(docs_per_sec).1f docs/sec)", stats)
+    return stats
+
+
+def embed_nodes(nodes: Iterable[BaseNode], **kwargs: Any) -> Dict[str, Any]:
+    """
+    Synchronous wrapper around aembed_nodes for scripts and Streamlit.
+    
+    Args:
+        nodes: Nodes to embed
+        **kwargs: Passed through to aembed_nodes
+        
+    Returns:
+        Report dict (see aembed_nodes)
+    """
+    return asyncio.run(aembed_nodes(nodes, **kwargs))
@@ -0,0 +1,152 @@
+"""
+Facets module.
+Precomputed catalog of distinct metadata values and their profile counts.
+"""
+
+import json
+import os
+from collections import Counter
+from typing import Any, Dict, Iterable, Optional
+
+from config import INDEX_PERSIST_DIR
+from profile_store import ProfileStore
+
+FACETS_FILENAME = "facets.json"
+
+# (label, lowest, highest) in whole years; None means no upper bound
+EXPERIENCE_BUCKETS = [("0-3 years", 0, 3), ("4-6 years", 4, 6), ("7+ years", 7, None)]
+
+FacetCatalog = Dict[str, Dict[str, int]]
+
+
+def experience_bucket(years: Any) -> str:
+    """
+    Map years of experience to its bucket label.
+    
+    Args:
+        years: experience_years value from a profile
+        
+    Returns:
+        Bucket label, e.g. "4-6 years"
+    """
+    try:
+        years = int(years or 0)
+    except (TypeError, ValueError):
+        years = 0
+        
+    for label, lowest, highest in EXPERIENCE_BUCKETS:
+        if years >= lowest and (highest is None or years <= highest):
+            return label
+    return EXPERIENCE_BUCKETS[0][0]
+
+
+class FacetCounter:
+    """
+    Facet counts accumulated one profile at a time, so profiles can stream past.
+    
+    Defaults match create_document_content, so facet values are exactly the
+    values the metadata filters compare against.
+    """
+    
+    def __init__(self):
+        self.counters = {name: Counter() for name in ("location", "team", "title", "skills", "experience")}
+        
+    def add(self, profile: Dict[str, Any]):
+        """Count one profile."""
+        self.counters["location"][profile.get("location", "Remote")] += 1
+        self.counters["team"][profile.get("team", "General")] += 1
+        self.counters["title"][profile.get("title", "N/A")] += 1
+        self.counters["skills"].update(set(profile.get("skills", [])))
+        self.counters["experience"][experience_bucket(profile.get("experience_years", 0))] += 1
+        
+    def add_store(self, store: ProfileStore):
+        """Count every profile of a store from its interned columns, without rebuilding profiles."""
+        self.counters["location"].update(store.value_counts("location", "Remote"))
+        self.counters["team"].update(store.value_counts("team", "General"))
+        self.counters["title"].update(store.value_counts("title", "N/A"))
+        self.counters["skills"].update(store.skill_counts())
+        for years, count in store.value_counts("experience_years", 0).items():
+            self.counters["experience"][experience_bucket(years)] += count
+            
+    def catalog(self) -> FacetCatalog:
+        """
+        Get the catalog of the profiles counted so far.
+        
+        Returns:
+            Dict of facet name -> {value: number of profiles}, values sorted by name
+        """
+        catalog = {name: dict(sorted(counter.items())) for name, counter in self.counters.items()}
+        # Buckets keep their natural order rather than alphabetical
+        catalog["experience"] = {
+            label: self.counters["experience"][label] for label, _, _ in EXPERIENCE_BUCKETS
+            if self.counters["experience"][label]
+        }
+        return catalog
+
+
+def compute_facets(profiles: Iterable[Dict[str, Any]] | ProfileStore) -> FacetCatalog:
+    """
+    Count distinct values per facet in one pass over the profiles.
+    
+    Args:
+        profiles: Employee profile dictionaries, or a ProfileStore
+        
+    Returns:
+        Dict of facet name -> {value: number of profiles}, values sorted by name
+    """
+    counter = FacetCounter()
+    if isinstance(profiles, ProfileStore):
+        counter.add_store(profiles)
+        return counter.catalog()
+    for profile in profiles:
+        counter.add(profile)
+    return counter.catalog()
+
+
+def save_facets(catalog: FacetCatalog, directory: str = INDEX_PERSIST_DIR):
+    """
+    Write a facet catalog next to the index snapshot.
+    
+    Args:
+        catalog: Catalog from compute_facets
+        directory: Snapshot directory
+    """
+    path = os.path.join(directory, FACETS_FILENAME)
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    
+    with open(tmp_path, "w") as f:
+        json.dump(catalog, f)
+    os.replace(tmp_path, path)
+
+
+def load_facets(directory: str = INDEX_PERSIST_DIR) -> Optional[FacetCatalog]:
+    """
+    Read the facet catalog stored with an index snapshot.
+    
+    Args:
+        directory: Snapshot directory
+        
+    Returns:
+        Facet catalog, or None if it is missing or unreadable
+    """
+    try:
+        with open(os.path.join(directory, FACETS_FILENAME), "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def format_facet_value(catalog: FacetCatalog, facet: str, value: str) -> str:
+    """
+    Format a facet value with its count for display, e.g. "Bangalore (42)".
+    
+    Args:
+        catalog: Facet catalog
+        facet: Facet name
+        value: Facet value
+        
+    Returns:
+        Display label
+    """
+    count = catalog.get(facet, {}).get(value)
+    return value if count is None else f"{value} ({count})"
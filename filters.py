@@ -3,53 +3,92 @@ Filters module.
 Handles UI filters and metadata filtering for search queries.
 """
 
-import streamlit as st
-from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
-from llama_index.core import VectorStoreIndex
+from __future__ import annotations
 
-from indexing import get_unique_metadata_values
+from typing import TYPE_CHECKING
 
+from facets import FacetCatalog, format_facet_value
 
-def create_sidebar_filters(index: VectorStoreIndex) -> tuple[str, str]:
+if TYPE_CHECKING:
+    from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
+
+
+def create_sidebar_filters(facets: FacetCatalog) -> tuple[list[str], list[str]]:
     """
     Create sidebar filter UI elements.
     
     Args:
-        index: VectorStoreIndex instance
+        facets: Facet catalog of the current index (see indexing.load_facet_catalog)
         
     Returns:
-        tuple: (selected_location, selected_team)
+        tuple: (selected_locations, selected_teams) - Empty lists mean "All"
     """
+    import streamlit as st
+    
     st.sidebar.header("Filter Results")
     
-    # Extract unique values for filters
-    locations = get_unique_metadata_values(index, "location")
-    teams = get_unique_metadata_values(index, "team")
+    # Values and counts come precomputed with the index snapshot
+    locations = list(facets.get("location", {}))
+    teams = list(facets.get("team", {}))
     
-    # Create selectboxes
-    selected_location = st.sidebar.selectbox("Location", ["All"] + locations)
-    selected_team = st.sidebar.selectbox("Team", ["All"] + teams)
+    # Create multiselects; selecting several values matches any of them
+    selected_locations = st.sidebar.multiselect(
+        "Location", locations, placeholder="All",
+        format_func=lambda value: format_facet_value(facets, "location", value)
+    )
+    selected_teams = st.sidebar.multiselect(
+        "Team", teams, placeholder="All",
+        format_func=lambda value: format_facet_value(facets, "team", value)
+    )
     
-    return selected_location, selected_team
+    return selected_locations, selected_teams
 
 
-def build_metadata_filters(selected_location: str, selected_team: str) -> MetadataFilters | None:
+def build_field_filter(key: str, selected: str | list[str]) -> MetadataFilter | None:
     """
-    Build MetadataFilters object based on user selections.
+    Build an exact-match filter for one field.
     
     Args:
-        selected_location: Selected location from filter
-        selected_team: Selected team from filter
+        key: Metadata key to filter on
+        selected: A single value, "All", or a list of values (empty means all)
         
     Returns:
-        MetadataFilters object if filters applied, None otherwise
+        EQ filter for one value, IN filter for several, None for no restriction
+    """
+    values = [selected] if isinstance(selected, str) else list(selected)
+    values = [v for v in values if v != "All"]
+    
+    if not values:
+        return None
+    from llama_index.core.vector_stores import FilterOperator, MetadataFilter
+    
+    if len(values) == 1:
+        return MetadataFilter(key=key, value=values[0])
+    return MetadataFilter(key=key, value=values, operator=FilterOperator.IN)
+
+
+def build_metadata_filters(selected_location: str | list[str], selected_team: str | list[str]) -> MetadataFilters | None:
     """
-    filters = []
+    Build MetadataFilters object based on user selections.
     
-    if selected_location != "All":
-        filters.append(MetadataFilter(key="location", value=selected_location))
+    Values within a field are OR-ed, fields are AND-ed together.
     
-    if selected_team != "All":
-        filters.append(MetadataFilter(key="team", value=selected_team))
+    Args:
+        selected_location: Selected location(s) from filter
+        selected_team: Selected team(s) from filter
+        
+    Returns:
+        MetadataFilters object if filters applied, None otherwise
+    """
+    filters = [
+        f for f in (
+            build_field_filter("location", selected_location),
+            build_field_filter("team", selected_team)
+        )
+        if f is not None
+    ]
+    if not filters:
+        return None
+    from llama_index.core.vector_stores import MetadataFilters
     
-    return MetadataFilters(filters=filters) if filters else None
+    return MetadataFilters(filters=filters)
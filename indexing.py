@@ -1,31 +1,439 @@
 """
 Indexing module.
-Handles creation and caching of vector store index.
+Handles creation, persistence and caching of vector store index.
 """
 
-import streamlit as st
-from llama_index.core import VectorStoreIndex
+from __future__ import annotations
 
-from data_processing import load_profiles_from_json, convert_profiles_to_documents
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List
 
+from config import (
+    DATA_PATH,
+    DOCUMENT_WORKERS,
+    EMBED_BATCH_SIZE,
+    EMBED_MODEL_NAME,
+    FILTER_INDEX_KEYS,
+    INDEX_PERSIST_DIR,
+    INDEX_SCHEMA_VERSION,
+    VECTOR_STORE_MMAP
+)
+from data_processing import iter_documents, iter_profiles, profile_files
+from facets import FacetCatalog, FacetCounter, load_facets, save_facets
+from lazy import cache_resource
+from lexical_index import LexicalIndex
+from metrics import span, timed_iter
 
-@st.cache_resource
-def create_vector_index():
+if TYPE_CHECKING:
+    from llama_index.core import Document, VectorStoreIndex
+
+INDEX_META_FILENAME = "index_meta.json"
+
+logger = logging.getLogger(__name__)
+
+
+def compute_index_key(file_path: str = DATA_PATH, embed_model_name: str = EMBED_MODEL_NAME) -> str:
     """
-    Load data and create a cached vector store index.
+    Compute the snapshot key for profile data and an embedding model.
     
+    Args:
+        file_path: Profiles file, or a directory of shards (see iter_profiles)
+        embed_model_name: Name of the embedding model used to build the index
+        
     Returns:
-        VectorStoreIndex: Indexed vector store, or None if data loading fails
+        Hex digest identifying the data, the embedding model and the index schema
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{embed_model_name}\0{INDEX_SCHEMA_VERSION}\0".encode("utf-8"))
+    
+    files = profile_files(file_path) if os.path.isdir(file_path) else [file_path]
+    for path in files:
+        if len(files) > 1 or path != file_path:
+            # Shard names are part of the key, so renaming or moving data between shards counts as a change
+            digest.update(f"{os.path.basename(path)}\0".encode("utf-8"))
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+            
+    return digest.hexdigest()
+
+
+def read_index_meta(persist_dir: str = INDEX_PERSIST_DIR) -> dict:
     """
+    Read the metadata stored next to a persisted index snapshot.
+    
+    Args:
+        persist_dir: Directory holding the snapshot
+        
+    Returns:
+        Metadata dictionary, or an empty dict if no readable snapshot exists
+    """
+    meta_path = os.path.join(persist_dir, INDEX_META_FILENAME)
+    
     try:
-        # Load profiles from JSON
-        profiles = load_profiles_from_json()
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+_data_version_cache: Dict[str, Any] = {}
+
+
+def current_data_version(persist_dir: str = INDEX_PERSIST_DIR) -> str | None:
+    """
+    Get the snapshot key of the index currently on disk.
+    
+    The key changes whenever the profiles or the embedding model change, so
+    caches derived from answers can use it to invalidate themselves. The meta
+    file is only re-read when its modification time changes.
+    
+    Args:
+        persist_dir: Directory holding the snapshot
+        
+    Returns:
+        Snapshot key, or None if no snapshot exists
+    """
+    try:
+        mtime = os.stat(os.path.join(persist_dir, INDEX_META_FILENAME)).st_mtime_ns
+    except OSError:
+        return None
+        
+    cached = _data_version_cache.get(persist_dir)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, read_index_meta(persist_dir).get("index_key"))
+        _data_version_cache[persist_dir] = cached
+    return cached[1]
+
+
+def load_persisted_index(index_key: str, persist_dir: str = INDEX_PERSIST_DIR) -> VectorStoreIndex | None:
+    """
+    Load a persisted index snapshot if it was built for the given key.
+    
+    Args:
+        index_key: Expected snapshot key (see compute_index_key)
+        persist_dir: Directory holding the snapshot
         
-        # Convert to documents
-        documents = convert_profiles_to_documents(profiles)
+    Returns:
+        VectorStoreIndex if the snapshot matches the key, None otherwise
+    """
+    if read_index_meta(persist_dir).get("index_key") != index_key:
+        return None
         
-        # Create and return vector index
-        return VectorStoreIndex.from_documents(documents)
+    return load_index_snapshot(persist_dir)
+
+
+def load_index_snapshot(persist_dir: str = INDEX_PERSIST_DIR) -> VectorStoreIndex | None:
+    """
+    Load whatever index snapshot exists in a directory, regardless of its key.
+    
+    Args:
+        persist_dir: Directory holding the snapshot
+        
+    Returns:
+        VectorStoreIndex, or None if the snapshot is missing or unreadable
+    """
+    from llama_index.core import StorageContext, load_index_from_storage
+    
+    from vector_store import NumpyVectorStore
+    
+    try:
+        with span("index_load"):
+            storage_context = StorageContext.from_defaults(
+                persist_dir=persist_dir,
+                vector_store=NumpyVectorStore.from_persist_dir(persist_dir, mmap=VECTOR_STORE_MMAP)
+            )
+            return load_index_from_storage(storage_context)
+    except Exception:
+        # A corrupt or partially written snapshot is treated as a cache miss
+        return None
+
+
+def persist_index(
+    index: VectorStoreIndex,
+    index_key: str,
+    persist_dir: str = INDEX_PERSIST_DIR,
+    last_update: Dict[str, Any] | None = None,
+    facets: FacetCatalog | None = None,
+    lexical_index: LexicalIndex | None = None
+):
+    """
+    Persist an index snapshot together with its key.
+    
+    The snapshot is written to a temporary directory first and swapped into
+    place, so concurrent readers never see a half-written snapshot.
+    
+    Args:
+        index: VectorStoreIndex to persist
+        index_key: Snapshot key (see compute_index_key)
+        persist_dir: Target directory for the snapshot
+        last_update: Optional report of the run that produced the snapshot
+        facets: Optional facet catalog to store with the snapshot
+        lexical_index: Optional BM25 index to store with the snapshot
+    """
+    persist_dir = os.path.abspath(persist_dir)
+    tmp_dir = f"{persist_dir}.tmp-{os.getpid()}"
+    old_dir = f"{persist_dir}.old-{os.getpid()}"
+    
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    index.storage_context.persist(persist_dir=tmp_dir)
+    
+    with open(os.path.join(tmp_dir, INDEX_META_FILENAME), "w") as f:
+        json.dump({
+            "index_key": index_key,
+            "embed_model": EMBED_MODEL_NAME,
+            "schema_version": INDEX_SCHEMA_VERSION,
+            "last_update": last_update or {}
+        }, f)
+    if facets is not None:
+        save_facets(facets, tmp_dir)
+    if lexical_index is not None:
+        lexical_index.save(tmp_dir)
+        
+    if os.path.exists(persist_dir):
+        os.replace(persist_dir, old_dir)
+    os.replace(tmp_dir, persist_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def insert_documents(index: VectorStoreIndex, documents: Iterable[Document]) -> Dict[str, Any]:
+    """
+    Embed documents and insert them into an index one batch at a time.
+    
+    Documents are pulled lazily, so only the batches in flight are held in
+    memory, however many documents the input yields.
+    
+    Args:
+        index: VectorStoreIndex to insert into
+        documents: Documents to index, e.g. a generator from iter_documents
+        
+    Returns:
+        Embedding pipeline report (see aembed_nodes) plus the number of documents inserted
+    """
+    from embedding_pipeline import batched, documents_to_nodes, embed_nodes
+    
+    inserted = 0
+    
+    def nodes() -> Iterator:
+        nonlocal inserted
+        for batch in batched(documents, EMBED_BATCH_SIZE):
+            for doc in batch:
+                index.docstore.set_document_hash(doc.id_, doc.hash)
+            inserted += len(batch)
+            yield from documents_to_nodes(batch)
+            
+    def insert(batch):
+        # Nodes already carry embeddings, so the index does not call the model again
+        with span("index_build"):
+            index.insert_nodes(batch)
+            
+    report = embed_nodes(nodes(), sink=insert)
+    report["inserted"] = inserted
+    return report
+
+
+def build_vector_index(documents: Iterable[Document]) -> tuple[VectorStoreIndex, Dict[str, Any]]:
+    """
+    Build a new index, streaming documents through the batched embedding pipeline.
+    
+    Args:
+        documents: Documents to index
+        
+    Returns:
+        tuple: (index, embed_report) - The new index and the embedding pipeline report
+    """
+    from llama_index.core import StorageContext, VectorStoreIndex
+    
+    from vector_store import NumpyVectorStore
+    
+    storage_context = StorageContext.from_defaults(
+        vector_store=NumpyVectorStore(indexed_keys=FILTER_INDEX_KEYS)
+    )
+    index = VectorStoreIndex(nodes=[], storage_context=storage_context)
+    embed_report = insert_documents(index, documents)
+    return index, embed_report
+
+
+def update_vector_index(index: VectorStoreIndex, documents: Iterable[Document]) -> Dict[str, Any]:
+    """
+    Bring an existing index in line with a new set of profile documents.
+    
+    Documents are diffed against the indexed state by id and content hash in
+    a single streaming pass: only added or changed profiles are embedded,
+    removed ones are deleted. Stale versions of changed profiles and removed
+    profiles are deleted together at the end, so the vector store is
+    compacted once however many profiles changed. Later documents repeating
+    an id are ignored.
+    
+    Args:
+        index: VectorStoreIndex built from an earlier version of the profiles
+        documents: Documents for the current profiles (see iter_documents)
+        
+    Returns:
+        Report dict with per-run counts (added, changed, removed, unchanged)
+        and timings in seconds (diff, delete, embed, total); embed covers
+        building and inserting the new documents
+    """
+    start = time.perf_counter()
+    docstore = index.docstore
+    indexed_ids = set(docstore.get_all_ref_doc_info().keys())
+    seen = set()
+    stale_node_ids: List[str] = []
+    counts = {"added": 0, "changed": 0, "unchanged": 0}
+    timings = {"diff": 0.0, "delete": 0.0}
+    
+    def to_insert() -> Iterator[Document]:
+        for doc in documents:
+            # 1. Diff by id and content hash
+            diff_start = time.perf_counter()
+            if doc.id_ in seen:
+                continue
+            seen.add(doc.id_)
+            if doc.id_ not in indexed_ids:
+                status = "added"
+            elif docstore.get_document_hash(doc.id_) != doc.hash:
+                status = "changed"
+            else:
+                status = "unchanged"
+            counts[status] += 1
+            timings["diff"] += time.perf_counter() - diff_start
+    
+            # 2. Note the nodes of a changed profile's stale version; the new one gets new node ids
+            if status == "changed":
+                stale_node_ids.extend(docstore.get_ref_doc_info(doc.id_).node_ids)
+            if status != "unchanged":
+                yield doc
+    
+    # 3. Embed and insert only what is new
+    embed_report = insert_documents(index, to_insert())
+    
+    # 4. Drop stale versions and profiles that are gone in one pass: each vector
+    # store deletion compacts the whole matrix, so it must not run per profile
+    delete_start = time.perf_counter()
+    removed = indexed_ids - seen
+    for doc_id in removed:
+        stale_node_ids.extend(docstore.get_ref_doc_info(doc_id).node_ids)
+    if stale_node_ids:
+        index.delete_nodes(stale_node_ids, delete_from_docstore=True)
+    end = time.perf_counter()
+    timings["delete"] += end - delete_start
+    
+    report = {
+        "added": counts["added"],
+        "changed": counts["changed"],
+        "removed": len(removed),
+        "unchanged": counts["unchanged"],
+        "docs_per_sec": embed_report["docs_per_sec"],
+        "timings": {
+            "diff": round(timings["diff"], 4),
+            "delete": round(timings["delete"], 4),
+            "embed": round(delete_start - start - timings["diff"] - timings["delete"], 4),
+            "total": round(end - start, 4)
+        }
+    }
+    logger.info("Incremental index update: %s", report)
+    return report
+
+
+def _tap_profiles(
+    profiles: Iterable[Dict[str, Any]],
+    facets: FacetCounter,
+    lexical_index: LexicalIndex
+) -> Iterator[Dict[str, Any]]:
+    """Feed streamed profiles into the facet counts and the BM25 index on their way through."""
+    for profile in profiles:
+        facets.add(profile)
+        lexical_index.add_profile(profile)
+        yield profile
+
+
+def sync_vector_index(
+    file_path: str = DATA_PATH,
+    persist_dir: str = INDEX_PERSIST_DIR,
+    document_workers: int | None = DOCUMENT_WORKERS
+) -> tuple[VectorStoreIndex, Dict[str, Any]]:
+    """
+    Load, incrementally update or build the index for profile data.
+    
+    A snapshot with a matching key is loaded as-is. A snapshot built with the
+    same embedding model and schema is updated incrementally. Anything else
+    triggers a full rebuild. Profiles are streamed from disk into documents,
+    facets and the BM25 index in one pass, so the profile list itself is
+    never held in memory.
+    
+    Args:
+        file_path: Profiles file (JSON array or JSONL, optionally gzipped) or a directory of shards
+        persist_dir: Directory holding the snapshot
+        document_workers: Processes building documents (see iter_documents)
+        
+    Returns:
+        tuple: (index, report) - The up-to-date index and the run report
+    """
+    start = time.perf_counter()
+    index_key = compute_index_key(file_path)
+    meta = read_index_meta(persist_dir)
+    
+    # Warm start from disk when nothing changed
+    if meta.get("index_key") == index_key:
+        index = load_index_snapshot(persist_dir)
+        if index is not None:
+            if load_facets(persist_dir) is None or LexicalIndex.load(persist_dir) is None:
+                # Snapshot predates the facet catalog or the lexical index
+                facets, lexical_index = FacetCounter(), LexicalIndex()
+                for _ in _tap_profiles(iter_profiles(file_path), facets, lexical_index):
+                    pass
+                save_facets(facets.catalog(), persist_dir)
+                lexical_index.save(persist_dir)
+            return index, {"mode": "snapshot", "timings": {"total": round(time.perf_counter() - start, 4)}}
+            
+    # Stream profiles into documents, counting facets and BM25 terms on the way
+    facets, lexical_index = FacetCounter(), LexicalIndex()
+    profiles = timed_iter(_tap_profiles(iter_profiles(file_path), facets, lexical_index), "load_profiles")
+    documents = timed_iter(iter_documents(profiles, document_workers), "build_documents")
+    
+    # Reuse the previous snapshot if its vectors are still compatible
+    index = None
+    if meta.get("embed_model") == EMBED_MODEL_NAME and meta.get("schema_version") == INDEX_SCHEMA_VERSION:
+        index = load_index_snapshot(persist_dir)
+        
+    if index is not None:
+        report = {"mode": "incremental", **update_vector_index(index, documents)}
+    else:
+        index, embed_report = build_vector_index(documents)
+        report = {
+            "mode": "full",
+            "added": embed_report["inserted"],
+            "docs_per_sec": embed_report["docs_per_sec"],
+            "timings": {"total": round(time.perf_counter() - start, 4)}
+        }
+        
+    persist_index(
+        index, index_key, persist_dir, last_update=report, facets=facets.catalog(), lexical_index=lexical_index
+    )
+    return index, report
+
+
+@cache_resource
+def create_vector_index():
+    """
+    Load a persisted index snapshot, or update/build and persist a new one.
+    
+    The snapshot is reused as long as the profiles file and embedding model
+    are unchanged; otherwise only the changed profiles are re-embedded.
+    
+    Returns:
+        VectorStoreIndex: Indexed vector store, or None if data loading fails
+    """
+    import streamlit as st
+    
+    try:
+        index, _ = sync_vector_index()
+        return index
         
     except FileNotFoundError as e:
         st.error(str(e))
@@ -35,6 +443,31 @@ def create_vector_index():
         return None
 
 
+@cache_resource
+def load_facet_catalog() -> FacetCatalog:
+    """
+    Load the facet catalog written with the current index snapshot.
+    
+    Cached for the lifetime of the process, like the index itself, so
+    sidebar reruns never scan the docstore.
+    
+    Returns:
+        Facet catalog, or an empty dict if none is available
+    """
+    return load_facets() or {}
+
+
+@cache_resource
+def load_lexical_index() -> LexicalIndex | None:
+    """
+    Load the BM25 index written with the current index snapshot.
+    
+    Returns:
+        LexicalIndex, or None if none is available (retrieval stays vector-only)
+    """
+    return LexicalIndex.load()
+
+
 def get_unique_metadata_values(index: VectorStoreIndex, metadata_key: str) -> list[str]:
     """
     Extract unique values for a metadata field across all documents.
@@ -49,3 +482,12 @@ def get_unique_metadata_values(index: VectorStoreIndex, metadata_key: str) -> li
     all_docs = index.docstore.docs.values()
     values = set(d.metadata.get(metadata_key, "Unknown") for d in all_docs)
     return sorted(list(values))
+
+
+if __name__ == "__main__":
+    # Run an incremental sync from the command line, e.g. after an HR export
+    from models import setup_global_settings
+    
+    setup_global_settings()
+    _, run_report = sync_vector_index()
+    print(json.dumps(run_report, indent=2))
@@ -0,0 +1,44 @@
+"""
+Lazy module.
+Defers importing Streamlit until a cached resource is first requested.
+"""
+
+import functools
+import threading
+from typing import Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def cache_resource(fn: F) -> F:
+    """
+    Decorator behaving like st.cache_resource, applied on the first call.
+    
+    Modules shared with the API server and the benchmarks can then be
+    imported without loading Streamlit; only code that actually calls a
+    cached factory pays for it.
+    
+    Args:
+        fn: Resource factory; arguments prefixed with _ are not hashed
+        
+    Returns:
+        Wrapper with the same signature and a clear() method
+    """
+    cached = None
+    lock = threading.Lock()
+    
+    def resolve() -> Callable[..., Any]:
+        nonlocal cached
+        if cached is None:
+            with lock:
+                if cached is None:
+                    import streamlit as st
+                    cached = st.cache_resource(fn)
+        return cached
+        
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        return resolve()(*args, **kwargs)
+        
+    wrapper.clear = lambda: resolve().clear()
+    return wrapper
@@ -0,0 +1,173 @@
+"""
+Lexical index module.
+BM25 inverted index over profile skills, domains, projects and tech stacks.
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from config import INDEX_PERSIST_DIR, BM25_K1, BM25_B
+from data_processing import get_profile_id
+
+LEXICAL_INDEX_FILENAME = "lexical_index.json"
+
+# Keeps tech names like "node.js", "ci/cd" and "c++" as single terms
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+_STOP_WORDS = {
+    "a", "an", "and", "any", "are", "at", "by", "can", "does", "find", "for", "from", "has", "have",
+    "in", "is", "knows", "me", "of", "on", "or", "show", "the", "to", "who", "with", "worked"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms, dropping stop words.
+    
+    Args:
+        text: Query or field text
+        
+    Returns:
+        List of terms in order of appearance
+    """
+    return [t for t in _TOKEN_PATTERN.findall(text.lower()) if t not in _STOP_WORDS]
+
+
+def profile_terms(profile: Dict[str, Any]) -> List[str]:
+    """
+    Collect the searchable terms of a profile.
+    
+    Args:
+        profile: Employee profile dictionary
+        
+    Returns:
+        Terms from skills, domains, project names, descriptions and tech stacks
+    """
+    fields = list(profile.get("skills", [])) + list(profile.get("domains", []))
+    for project in profile.get("projects", []) or []:
+        fields.append(project.get("name", ""))
+        fields.append(project.get("desc", ""))
+        fields.extend(project.get("stack", []))
+    return tokenize(" ".join(fields))
+
+
+class LexicalIndex:
+    """
+    Okapi BM25 over an inverted index of term -> {profile id: term frequency}.
+    
+    A query only touches the posting lists of its own terms, so exact skill
+    or stack names resolve with a few dictionary lookups regardless of how
+    many profiles are indexed.
+    
+    Args:
+        postings: Inverted index, term -> {doc id: term frequency}
+        doc_lengths: Number of terms per doc id
+        k1: BM25 term frequency saturation
+        b: BM25 length normalization
+    """
+    
+    def __init__(
+        self,
+        postings: Optional[Dict[str, Dict[str, int]]] = None,
+        doc_lengths: Optional[Dict[str, int]] = None,
+        k1: float = BM25_K1,
+        b: float = BM25_B
+    ):
+        self.postings = postings or {}
+        self.doc_lengths = doc_lengths or {}
+        self.total_length = sum(self.doc_lengths.values())
+        self.k1 = k1
+        self.b = b
+        
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[Dict[str, Any]]) -> "LexicalIndex":
+        """
+        Build the index from profiles, keyed by profile id (see get_profile_id).
+        
+        Args:
+            profiles: Employee profile dictionaries
+            
+        Returns:
+            LexicalIndex instance
+        """
+        index = cls()
+        for profile in profiles:
+            index.add_profile(profile)
+        return index
+        
+    def add_profile(self, profile: Dict[str, Any]):
+        """Add one profile's terms under its profile id; profiles without an id are skipped."""
+        doc_id = get_profile_id(profile)
+        if doc_id:
+            self.add(doc_id, profile_terms(profile))
+        
+    def add(self, doc_id: str, terms: List[str]):
+        """Add one document's terms to the inverted index."""
+        self.total_length += len(terms) - self.doc_lengths.get(doc_id, 0)
+        self.doc_lengths[doc_id] = len(terms)
+        for term, count in Counter(terms).items():
+            self.postings.setdefault(term, {})[doc_id] = count
+            
+    def search(self, query: str, top_k: Optional[int] = 10) -> List[tuple[str, float]]:
+        """
+        Rank documents for a query with BM25.
+        
+        Args:
+            query: Free-text query
+            top_k: Maximum number of results; None returns every match
+            
+        Returns:
+            List of (doc_id, score), best first; empty if no query term is indexed
+        """
+        total_docs = len(self.doc_lengths)
+        if not total_docs:
+            return []
+        avg_length = self.total_length / total_docs
+        
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, tf in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+                
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        
+    def save(self, directory: str = INDEX_PERSIST_DIR):
+        """
+        Write the index next to the vector index snapshot.
+        
+        Args:
+            directory: Snapshot directory
+        """
+        path = os.path.join(directory, LEXICAL_INDEX_FILENAME)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        
+        with open(tmp_path, "w") as f:
+            json.dump({"postings": self.postings, "doc_lengths": self.doc_lengths}, f)
+        os.replace(tmp_path, path)
+        
+    @classmethod
+    def load(cls, directory: str = INDEX_PERSIST_DIR) -> Optional["LexicalIndex"]:
+        """
+        Read the index stored with a snapshot.
+        
+        Args:
+            directory: Snapshot directory
+            
+        Returns:
+            LexicalIndex, or None if it is missing or unreadable
+        """
+        try:
+            with open(os.path.join(directory, LEXICAL_INDEX_FILENAME), "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cls(postings=data["postings"], doc_lengths=data["doc_lengths"])
@@ -0,0 +1,90 @@
+"""
+LLM metrics module.
+LlamaIndex event handler feeding LLM latency and token counts into the metrics registry.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+from llama_index.core.instrumentation.events.llm import (
+    LLMChatEndEvent,
+    LLMChatInProgressEvent,
+    LLMChatStartEvent
+)
+
+from config import LLM_REQUEST_TIMEOUT
+from metrics import registry
+
+
+class LLMMetricsHandler(BaseEventHandler):
+    """
+    LlamaIndex event handler timing LLM calls and counting their tokens.
+    
+    Streamed calls are split at the first chunk into llm_prefill and
+    llm_generation. Non-streamed calls use Ollama's own prompt/eval
+    durations when it reports them, and count as llm_generation otherwise.
+    
+    Calls that never send an end event (streams abandoned by a disconnecting
+    client) are forgotten once they are older than max_age, or when more
+    than max_calls are open, and counted as llm_abandoned_total.
+    """
+    
+    max_age: float = Field(default=LLM_REQUEST_TIMEOUT)
+    max_calls: int = Field(default=10_000)
+    
+    _calls: Dict[str, list] = PrivateAttr(default_factory=dict)  # span_id -> [start, first chunk or None]
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    
+    @classmethod
+    def class_name(cls) -> str:
+        return "LLMMetricsHandler"
+        
+    def handle(self, event: Any, **kwargs: Any):
+        now = time.perf_counter()
+        if isinstance(event, LLMChatStartEvent):
+            with self._lock:
+                abandoned = self._prune(now)
+                self._calls[event.span_id] = [now, None]
+            if abandoned:
+                registry.inc("llm_abandoned_total", abandoned)
+        elif isinstance(event, LLMChatInProgressEvent):
+            with self._lock:
+                call = self._calls.get(event.span_id)
+                if call is None or call[1] is not None:
+                    return
+                call[1] = now
+            registry.observe("llm_prefill", now - call[0])
+        elif isinstance(event, LLMChatEndEvent):
+            with self._lock:
+                call = self._calls.pop(event.span_id, None)
+            raw = (event.response.raw if event.response is not None else None) or {}
+            self._record(call, now, raw)
+            
+    def _prune(self, now: float) -> int:
+        """Drop open calls past max_age or beyond max_calls; _calls is in start order. Caller holds _lock."""
+        dropped = 0
+        while self._calls:
+            span_id, (start, _) = next(iter(self._calls.items()))
+            if now - start <= self.max_age and len(self._calls) < self.max_calls:
+                break
+            del self._calls[span_id]
+            dropped += 1
+        return dropped
+            
+    def _record(self, call: Optional[list], now: float, raw: Dict[str, Any]):
+        registry.inc("llm_requests_total")
+        registry.inc("llm_tokens_total", raw.get("prompt_eval_count") or 0, direction="in")
+        registry.inc("llm_tokens_total", raw.get("eval_count") or 0, direction="out")
+        if call is None:
+            return
+        start, first_chunk = call
+        if first_chunk is not None:
+            registry.observe("llm_generation", now - first_chunk)
+        elif raw.get("prompt_eval_duration") and raw.get("eval_duration"):
+            registry.observe("llm_prefill", raw["prompt_eval_duration"] / 1e9)
+            registry.observe("llm_generation", raw["eval_duration"] / 1e9)
+        else:
+            registry.observe("llm_generation", now - start)
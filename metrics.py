@@ -0,0 +1,305 @@
+"""
+Metrics module.
+Per-stage latency histograms and counters, exported in Prometheus text format.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+from config import METRICS_ENABLED
+
+METRIC_PREFIX = "expertise"
+
+# Seconds; from cache hits and BM25 lookups up to slow generations on CPU
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+COUNTER_HELP = {
+    "llm_requests_total": "LLM chat calls",
+    "llm_tokens_total": "LLM tokens; direction=in is the prompt, out the generated answer"
+}
+
+T = TypeVar("T")
+
+_NO_SPAN = nullcontext()
+_iter_clock = threading.local()  # per-thread stack of nested timed_iter charges
+_active_stages: ContextVar[frozenset] = ContextVar("active_stages", default=frozenset())
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus expects it."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+        
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile by linear interpolation inside its bucket (like histogram_quantile).
+        
+        Args:
+            q: Quantile between 0 and 1
+            
+        Returns:
+            Estimated value, 0.0 without observations
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for position, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[position - 1] if position else 0.0
+                if position == len(self.buckets):
+                    return lower  # +Inf bucket: the largest finite bound is all we know
+                return lower + (self.buckets[position] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class _Span:
+    """Times one stage; nested spans of the same stage are counted once, by the outermost."""
+    
+    __slots__ = ("_registry", "_stage", "_start", "_token")
+    
+    def __init__(self, registry: "MetricsRegistry", stage: str):
+        self._registry = registry
+        self._stage = stage
+        
+    def __enter__(self):
+        self._token = _active_stages.set(_active_stages.get() | {self._stage})
+        self._start = time.perf_counter()
+        return self
+        
+    def __exit__(self, *exc):
+        self._registry.observe(self._stage, time.perf_counter() - self._start)
+        _active_stages.reset(self._token)
+
+
+class MetricsRegistry:
+    """
+    Process-wide stage histograms and counters.
+    
+    Stages are timed with span() and land in one histogram family
+    (stage_seconds, labelled by stage). Disabled, span() returns a shared
+    no-op context manager and nothing is recorded.
+    
+    Args:
+        enabled: Whether to record anything
+        buckets: Histogram bucket upper bounds in seconds
+    """
+    
+    def __init__(self, enabled: bool = METRICS_ENABLED, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.enabled = enabled
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {}
+        
+    def span(self, stage: str):
+        """
+        Context manager timing a pipeline stage.
+        
+        Args:
+            stage: Stage name, e.g. "retrieve"
+            
+        Returns:
+            Context manager
+        """
+        if not self.enabled or stage in _active_stages.get():
+            return _NO_SPAN
+        return _Span(self, stage)
+        
+    def observe(self, stage: str, seconds: float):
+        """
+        Record a stage duration measured elsewhere.
+        
+        Args:
+            stage: Stage name
+            seconds: Duration in seconds
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram(self._buckets)
+            histogram.observe(seconds)
+            
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        """
+        Increase a counter.
+        
+        Args:
+            name: Counter name, ending in _total
+            amount: Increment
+            **labels: Label values
+        """
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+            
+    def reset(self):
+        """Drop everything recorded so far."""
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+            
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a summary for display.
+        
+        Returns:
+            Dict with "stages" (count, mean, estimated p50/p95 in ms per stage)
+            and "counters" (value per series)
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": h.count,
+                    "mean_ms": round(h.sum / h.count * 1000, 2),
+                    "p50_ms": round(h.quantile(0.5) * 1000, 2),
+                    "p95_ms": round(h.quantile(0.95) * 1000, 2)
+                }
+                for stage, h in sorted(self._stages.items())
+            }
+            counters = {
+                name + _labels(key): value
+                for name, series in sorted(self._counters.items())
+                for key, value in sorted(series.items())
+            }
+        return {"stages": stages, "counters": counters}
+        
+    def render_prometheus(self, components: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Render everything in the Prometheus text exposition format.
+        
+        Args:
+            components: Optional stats() dicts by component name (answer cache,
+                router, ...); their numeric values are exported as gauges
+                
+        Returns:
+            Exposition text
+        """
+        lines: List[str] = []
+        stage_metric = f"{METRIC_PREFIX}_stage_seconds"
+        with self._lock:
+            if self._stages:
+                lines += [f"# HELP {stage_metric} Duration of pipeline stages", f"# TYPE {stage_metric} histogram"]
+            for stage, h in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, count in zip(self._buckets + (float("inf"),), h.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{stage_metric}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{stage_metric}_sum{{stage="{stage}"}} {h.sum:.6f}')
+                lines.append(f'{stage_metric}_count{{stage="{stage}"}} {h.count}')
+                
+            for name, series in sorted(self._counters.items()):
+                metric = f"{METRIC_PREFIX}_{name}"
+                lines += [f"# HELP {metric} {COUNTER_HELP.get(name, name)}", f"# TYPE {metric} counter"]
+                lines += [f"{metric}{_labels(key)} {value:g}" for key, value in sorted(series.items())]
+                
+        for name, value in sorted(_flatten(components or {}).items()):
+            metric = f"{METRIC_PREFIX}_{name}"
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value:g}"]
+        return "\n".join(lines) + "\n"
+
+
+def _labels(key: Tuple[Tuple[str, str], ...]) -> str:
+    return "{" + ",".join(f'{k}="{v}"' for k, v in key) + "}" if key else ""
+
+
+def _flatten(stats: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    """Numeric leaves of nested stats dicts, keyed by their joined path."""
+    flat = {}
+    for key, value in stats.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, name + "_"))
+        elif isinstance(value, (int, float)):
+            flat[name] = float(value)
+    return flat
+
+
+registry = MetricsRegistry()
+
+
+def span(stage: str):
+    """Time a stage in the process-wide registry (see MetricsRegistry.span)."""
+    return registry.span(stage)
+
+
+def timed_iter(iterable: Iterable[T], stage: str) -> Iterator[T]:
+    """
+    Time a lazily consumed stage: one observation with the total time spent producing items.
+    
+    Stages chained through each other (documents built from streamed
+    profiles) are charged exclusively: time a nested timed_iter spends is
+    not counted again by the one consuming it.
+    
+    Args:
+        iterable: Items to pass through
+        stage: Stage name, e.g. "load_profiles"
+        
+    Returns:
+        Iterator over the same items (the iterable itself when metrics are off)
+    """
+    if not registry.enabled:
+        return iter(iterable)
+    return _timed_iter(iter(iterable), stage)
+
+
+def _timed_iter(iterator: Iterator[T], stage: str) -> Iterator[T]:
+    stack = getattr(_iter_clock, "stack", None)
+    if stack is None:
+        stack = _iter_clock.stack = []
+    total = 0.0
+    try:
+        while True:
+            stack.append(0.0)  # time charged by stages nested in this next()
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                elapsed = time.perf_counter() - start
+                nested = stack.pop()
+                total += elapsed - nested
+                if stack:
+                    stack[-1] += elapsed
+            yield item
+    finally:
+        registry.observe(stage, total)
+
+
+_handler_lock = threading.Lock()
+_handler: Optional[Any] = None
+
+
+def install_llm_metrics():
+    """Register the LLM event handler with LlamaIndex once per process (no-op when metrics are off)."""
+    global _handler
+    if not registry.enabled:
+        return
+    with _handler_lock:
+        if _handler is None:
+            # LlamaIndex is only imported once an LLM is actually configured
+            from llama_index.core.instrumentation import get_dispatcher
+            from llm_metrics import LLMMetricsHandler
+            _handler = LLMMetricsHandler()
+            get_dispatcher().add_event_handler(_handler)
@@ -3,41 +3,131 @@ Model initialization module.
 Handles initialization of LLM and embedding models.
 """
 
-import streamlit as st
-from llama_index.core import Settings
+from __future__ import annotations
 
-try:
+from typing import TYPE_CHECKING
+
+from config import (
+    MODEL_NAME,
+    EMBED_MODEL_NAME,
+    OLLAMA_BASE_URL,
+    OLLAMA_MAX_CONNECTIONS,
+    EMBED_BATCH_SIZE,
+    EMBED_CACHE_ENABLED,
+    LLM_TEMPERATURE,
+    LLM_REQUEST_TIMEOUT,
+    LLM_CONTEXT_WINDOW
+)
+from lazy import cache_resource
+from metrics import install_llm_metrics
+
+if TYPE_CHECKING:
+    from llama_index.core.base.embeddings.base import BaseEmbedding
     from llama_index.llms.ollama import Ollama
-    from llama_index.embeddings.ollama import OllamaEmbedding
-except ImportError:
-    st.error("Missing libraries. Run: pip install llama-index-llms-ollama llama-index-embeddings-ollama")
-    st.stop()
+    from ollama import AsyncClient
 
-from config import MODEL_NAME, EMBED_MODEL_NAME, LLM_TEMPERATURE, LLM_REQUEST_TIMEOUT
 
+def _ollama_classes():
+    """Import the Ollama integrations, stopping the app with install instructions if they are missing."""
+    try:
+        from llama_index.llms.ollama import Ollama
+        from llama_index.embeddings.ollama import OllamaEmbedding
+    except ImportError:
+        import streamlit as st
+        st.error("Missing libraries. Run: pip install llama-index-llms-ollama llama-index-embeddings-ollama")
+        st.stop()
+    return Ollama, OllamaEmbedding
 
-@st.cache_resource
-def initialize_models():
+
+def build_models(base_url: str = OLLAMA_BASE_URL):
     """
-    Initialize and cache LLM and embedding models.
+    Create the Ollama LLM and embedding model.
     
+    Args:
+        base_url: URL of the Ollama server
+        
     Returns:
-        tuple: (llm, embed_model) - Initialized Ollama LLM and embedding model
+        tuple: (llm, embed_model) - Ollama LLM and embedding model
     """
+    from embedding_cache import CachedEmbedding, EmbeddingCache
+    
+    Ollama, OllamaEmbedding = _ollama_classes()
+    
     # Initialize LLM with configuration
     # json_mode=False is safer for reasoning; request_timeout prevents hanging
     llm = Ollama(
         model=MODEL_NAME, 
+        base_url=base_url,
         request_timeout=LLM_REQUEST_TIMEOUT, 
-        temperature=LLM_TEMPERATURE
+        temperature=LLM_TEMPERATURE,
+        context_window=LLM_CONTEXT_WINDOW  # Sent as num_ctx; the retrieval token budget is derived from it
     )
     
     # Initialize embedding model
-    embed_model = OllamaEmbedding(model_name=EMBED_MODEL_NAME)
+    # embed_batch_size matches the ingestion pipeline so each batch is one request
+    embed_model = OllamaEmbedding(model_name=EMBED_MODEL_NAME, base_url=base_url, embed_batch_size=EMBED_BATCH_SIZE)
     
+    # Serve repeated document and query embeddings from the shared on-disk cache
+    if EMBED_CACHE_ENABLED:
+        embed_model = CachedEmbedding(embed_model, EmbeddingCache())
+        
+    # Time LLM prefill/generation and count tokens of every call
+    install_llm_metrics()
     return llm, embed_model
 
 
+def create_async_client(base_url: str = OLLAMA_BASE_URL, max_connections: int = OLLAMA_MAX_CONNECTIONS) -> AsyncClient:
+    """
+    Create an Ollama client with a bounded keep-alive connection pool.
+    
+    Pooled connections belong to the event loop that opened them, so create
+    the client on the loop that serves requests.
+    
+    Args:
+        base_url: URL of the Ollama server
+        max_connections: Maximum number of concurrent connections
+        
+    Returns:
+        ollama.AsyncClient
+    """
+    import httpx
+    from ollama import AsyncClient
+    
+    return AsyncClient(
+        host=base_url,
+        timeout=LLM_REQUEST_TIMEOUT,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    )
+
+
+def share_async_client(llm: Ollama, embed_model: BaseEmbedding, client: AsyncClient):
+    """
+    Route the async calls of both models through one client and its connection pool.
+    
+    Args:
+        llm: Ollama LLM from build_models
+        embed_model: Embedding model from build_models
+        client: Client from create_async_client
+    """
+    from embedding_cache import CachedEmbedding
+    
+    llm._async_client = client
+    if isinstance(embed_model, CachedEmbedding):
+        embed_model = embed_model.embed_model
+    embed_model._async_client = client
+
+
+@cache_resource
+def initialize_models():
+    """
+    Initialize and cache LLM and embedding models.
+    
+    Returns:
+        tuple: (llm, embed_model) - Initialized Ollama LLM and embedding model
+    """
+    return build_models()
+
+
 def setup_global_settings():
     """
     Configure global LlamaIndex settings with initialized models.
@@ -45,6 +135,8 @@ def setup_global_settings():
     Returns:
         tuple: (llm, embed_model) - The initialized models
     """
+    from llama_index.core import Settings
+    
     llm, embed_model = initialize_models()
     Settings.llm = llm
     Settings.embed_model = embed_model
@@ -0,0 +1,450 @@
+"""
+Profile store module.
+Compact columnar in-memory storage of employee profiles.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+from config import DATA_PATH
+from data_processing import create_document_content, get_profile_id, iter_profiles, make_document
+
+if TYPE_CHECKING:
+    from llama_index.core import Document
+    from llama_index.core.vector_stores import MetadataFilters
+
+# Schema fields with a typed column, in the order profiles list them
+FIELDS = ("id", "name", "title", "team", "location", "email", "experience_years", "skills", "domains", "projects", "bio")
+CATEGORICAL_FIELDS = ("title", "team", "location")
+PROJECT_FIELDS = ("name", "desc", "stack")
+
+_BIT = {field: 1 << position for position, field in enumerate(FIELDS)}
+_PROJECT_BIT = {field: 1 << position for position, field in enumerate(PROJECT_FIELDS)}
+_ABSENT = object()  # placeholder in extra-field columns
+
+# Values create_document_content assumes for missing fields
+DOCUMENT_DEFAULTS = {"title": "N/A", "team": "General", "location": "Remote"}
+
+
+class _Vocab:
+    """Distinct values interned as consecutive integer codes."""
+    
+    __slots__ = ("values", "codes")
+    
+    def __init__(self):
+        self.values: List[Any] = []
+        self.codes: Dict[Any, int] = {}
+        
+    def code(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+        
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class _Strings:
+    """Strings packed into one UTF-8 buffer with row offsets."""
+    
+    __slots__ = ("data", "offsets")
+    
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("Q", [0])
+        
+    def append(self, value: str):
+        self.data += value.encode("utf-8")
+        self.offsets.append(len(self.data))
+        
+    def __getitem__(self, row: int) -> str:
+        return self.data[self.offsets[row]:self.offsets[row + 1]].decode("utf-8")
+        
+    def nbytes(self) -> int:
+        return len(self.data) + len(self.offsets) * self.offsets.itemsize
+
+
+class _CodeLists:
+    """Variable-length lists of interned values, CSR style: flat codes plus row offsets."""
+    
+    __slots__ = ("vocab", "codes", "offsets")
+    
+    def __init__(self, vocab: _Vocab):
+        self.vocab = vocab
+        self.codes = array("I")
+        self.offsets = array("I", [0])
+        
+    def append(self, values: Iterable[Any]):
+        self.codes.extend(self.vocab.code(value) for value in values)
+        self.offsets.append(len(self.codes))
+        
+    def row_codes(self, row: int) -> array:
+        return self.codes[self.offsets[row]:self.offsets[row + 1]]
+        
+    def __getitem__(self, row: int) -> List[Any]:
+        values = self.vocab.values
+        return [values[code] for code in self.codes[self.offsets[row]:self.offsets[row + 1]]]
+        
+    def nbytes(self) -> int:
+        return (len(self.codes) * self.codes.itemsize) + (len(self.offsets) * self.offsets.itemsize)
+
+
+def _is_str_list(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
+
+
+def _fits_project(project: Any) -> bool:
+    return (
+        isinstance(project, dict) and project.keys() <= _PROJECT_BIT.keys()
+        and all(isinstance(project[key], str) for key in ("name", "desc") if key in project)
+        and _is_str_list(project.get("stack", []))
+    )
+
+
+# Value check per typed column; values failing it are kept as extra fields instead
+_FITS: Dict[str, Callable[[Any], bool]] = {
+    "id": lambda value: isinstance(value, str),
+    "name": lambda value: isinstance(value, str),
+    "email": lambda value: isinstance(value, str),
+    "bio": lambda value: isinstance(value, str),
+    "title": lambda value: isinstance(value, str),
+    "team": lambda value: isinstance(value, str),
+    "location": lambda value: isinstance(value, str),
+    "experience_years": lambda value: type(value) is int and -2 ** 63 <= value < 2 ** 63,
+    "skills": _is_str_list,
+    "domains": _is_str_list,
+    "projects": lambda value: isinstance(value, list) and all(_fits_project(project) for project in value)
+}
+
+
+class ProfileStore:
+    """
+    Employee profiles kept column by column instead of as nested dicts.
+    
+    Title, team and location are interned as integer codes; skills, domains
+    and project stacks are CSR arrays of codes into one shared vocabulary;
+    names, emails, bios and ids are packed UTF-8. Project names and descriptions,
+    which repeat across profiles, are interned as well. Fields outside the
+    schema (and values of an unexpected type) are kept as they are, so
+    profile() returns what was added. Document text is rendered on demand
+    (see document()) rather than stored.
+    """
+    
+    def __init__(self):
+        self._present = array("H")  # per row: bit set per typed field the profile has
+        self._ids = _Strings()
+        self._names = _Strings()
+        self._emails = _Strings()
+        self._bios = _Strings()
+        self._categories = {field: (_Vocab(), array("I")) for field in CATEGORICAL_FIELDS}
+        self._experience = array("q")
+        technologies = _Vocab()  # skills and stacks largely overlap
+        self._skills = _CodeLists(technologies)
+        self._domains = _CodeLists(_Vocab())
+        
+        self._project_offsets = array("I", [0])  # row -> range of project entries
+        self._project_present = array("B")
+        self._project_names = array("I")
+        self._project_descs = array("I")
+        self._project_text = _Vocab()  # project names and descriptions
+        self._project_stacks = _CodeLists(technologies)
+        
+        self._extras: Dict[str, List[Any]] = {}
+        
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[Dict[str, Any]]) -> "ProfileStore":
+        """
+        Build a store from profile dictionaries, consumed one at a time.
+        
+        Args:
+            profiles: Employee profile dictionaries
+            
+        Returns:
+            ProfileStore instance
+        """
+        store = cls()
+        for profile in profiles:
+            store.add(profile)
+        return store
+        
+    @classmethod
+    def from_file(cls, path: str = DATA_PATH) -> "ProfileStore":
+        """
+        Stream a profiles file or shard directory into a store (see iter_profiles).
+        
+        Raises:
+            FileNotFoundError: If the path doesn't exist
+        """
+        return cls.from_profiles(iter_profiles(path))
+        
+    def add(self, profile: Dict[str, Any]) -> int:
+        """
+        Append a profile.
+        
+        Args:
+            profile: Employee profile dictionary
+            
+        Returns:
+            Row number of the profile
+        """
+        row = len(self._present)
+        present = 0
+        extras = {}
+        for key, value in profile.items():
+            fits = _FITS.get(key)
+            if fits is not None and fits(value):
+                present |= _BIT[key]
+            else:
+                extras[key] = value
+                
+        self._ids.append(profile["id"] if present & _BIT["id"] else "")
+        self._names.append(profile["name"] if present & _BIT["name"] else "")
+        self._emails.append(profile["email"] if present & _BIT["email"] else "")
+        self._bios.append(profile["bio"] if present & _BIT["bio"] else "")
+        for field, (vocab, codes) in self._categories.items():
+            codes.append(vocab.code(profile[field]) if present & _BIT[field] else 0)
+        self._experience.append(profile["experience_years"] if present & _BIT["experience_years"] else 0)
+        self._skills.append(profile["skills"] if present & _BIT["skills"] else ())
+        self._domains.append(profile["domains"] if present & _BIT["domains"] else ())
+        
+        for project in profile["projects"] if present & _BIT["projects"] else ():
+            self._project_present.append(sum(_PROJECT_BIT[key] for key in project))
+            self._project_names.append(self._project_text.code(project.get("name", "")))
+            self._project_descs.append(self._project_text.code(project.get("desc", "")))
+            self._project_stacks.append(project.get("stack", ()))
+        self._project_offsets.append(len(self._project_present))
+        
+        for key in extras.keys() - self._extras.keys():
+            self._extras[key] = [_ABSENT] * row
+        for key, column in self._extras.items():
+            column.append(extras.get(key, _ABSENT))
+            
+        self._present.append(present)
+        return row
+        
+    def __len__(self) -> int:
+        return len(self._present)
+        
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self.profile(row) for row in range(len(self)))
+        
+    def get(self, row: int, field: str, default: Any = None) -> Any:
+        """
+        Read one field of a profile without building the whole dict.
+        
+        Args:
+            row: Row number
+            field: Profile field, e.g. "team"
+            default: Returned when the profile lacks the field
+            
+        Returns:
+            Field value, or default
+        """
+        bit = _BIT.get(field)
+        if bit is None or not self._present[row] & bit:
+            column = self._extras.get(field)
+            value = column[row] if column is not None else _ABSENT
+            return default if value is _ABSENT else value
+            
+        if field in self._categories:
+            vocab, codes = self._categories[field]
+            return vocab.values[codes[row]]
+        if field == "id":
+            return self._ids[row]
+        if field == "name":
+            return self._names[row]
+        if field == "email":
+            return self._emails[row]
+        if field == "bio":
+            return self._bios[row]
+        if field == "experience_years":
+            return self._experience[row]
+        if field == "skills":
+            return self._skills[row]
+        if field == "domains":
+            return self._domains[row]
+        return self._projects(row)
+        
+    def _projects(self, row: int) -> List[Dict[str, Any]]:
+        text = self._project_text.values
+        projects = []
+        for entry in range(self._project_offsets[row], self._project_offsets[row + 1]):
+            present = self._project_present[entry]
+            project = {}
+            if present & _PROJECT_BIT["name"]:
+                project["name"] = text[self._project_names[entry]]
+            if present & _PROJECT_BIT["desc"]:
+                project["desc"] = text[self._project_descs[entry]]
+            if present & _PROJECT_BIT["stack"]:
+                project["stack"] = self._project_stacks[entry]
+            projects.append(project)
+        return projects
+        
+    def profile(self, row: int) -> Dict[str, Any]:
+        """
+        Rebuild a profile dictionary.
+        
+        Args:
+            row: Row number
+            
+        Returns:
+            Dict equal to the one added; schema fields come first, in schema order
+        """
+        present = self._present[row]
+        profile = {field: self.get(row, field) for field in FIELDS if present & _BIT[field]}
+        for key, column in self._extras.items():
+            if column[row] is not _ABSENT:
+                profile[key] = column[row]
+        return profile
+        
+    def document_text(self, row: int) -> str:
+        """Render a profile's document text (see create_document_content)."""
+        return create_document_content(self.profile(row))[0]
+        
+    def document(self, row: int) -> Document:
+        """Build a profile's document, identical to the one iter_documents yields."""
+        profile = self.profile(row)
+        return make_document(*create_document_content(profile), get_profile_id(profile))
+        
+    def iter_documents(self) -> Iterator[Document]:
+        """Build documents one row at a time."""
+        return (self.document(row) for row in range(len(self)))
+        
+    def _present_rows(self, field: str) -> np.ndarray:
+        return (np.frombuffer(self._present, dtype=np.uint16) & _BIT[field]) != 0
+        
+    def value_counts(self, field: str, default: Any = None) -> Counter:
+        """
+        Count profiles per value of a categorical field or of experience_years.
+        
+        Args:
+            field: One of CATEGORICAL_FIELDS, or "experience_years"
+            default: Value counted for profiles lacking the field
+            
+        Returns:
+            Counter of value -> number of profiles
+        """
+        present = self._present_rows(field)
+        if field == "experience_years":
+            values, per_value = np.unique(np.frombuffer(self._experience, dtype=np.int64)[present], return_counts=True)
+            counts = Counter(dict(zip(values.tolist(), per_value.tolist())))
+        else:
+            vocab, codes = self._categories[field]
+            per_code = np.bincount(np.frombuffer(codes, dtype=np.uint32)[present], minlength=len(vocab))
+            counts = Counter({vocab.values[code]: int(n) for code, n in enumerate(per_code) if n})
+        for row in np.flatnonzero(~present):
+            counts[self.get(int(row), field, default)] += 1
+        return counts
+        
+    def skill_counts(self) -> Counter:
+        """Count profiles per skill (a skill listed twice counts once)."""
+        per_code = Counter()
+        counts = Counter()
+        present = self._present_rows("skills")
+        for row in range(len(self)):
+            if present[row]:
+                per_code.update(set(self._skills.row_codes(row)))
+            else:
+                counts.update(set(self.get(row, "skills", [])))
+        values = self._skills.vocab.values
+        counts.update({values[code]: n for code, n in per_code.items()})
+        return counts
+        
+    def rows_matching(self, filters: Optional[MetadataFilters], rows: Optional[Iterable[int]] = None) -> List[int]:
+        """
+        Rows whose profile passes metadata filters, with the defaults documents use.
+        
+        Exact-match filters on title, team and location are answered from the
+        interned codes; anything else is checked row by row against the
+        document metadata fields.
+        
+        Args:
+            filters: Metadata filters, e.g. from the sidebar (None passes everything)
+            rows: Candidate rows, all rows by default
+            
+        Returns:
+            Matching rows in ascending order
+        """
+        candidates = np.arange(len(self)) if rows is None else np.fromiter(sorted(rows), dtype=np.int64)
+        if not filters or not filters.filters:
+            return candidates.tolist()
+            
+        from llama_index.core.vector_stores import FilterCondition
+        from llama_index.core.vector_stores.utils import build_metadata_filter_fn
+        
+        masks = [self._code_mask(metadata_filter) for metadata_filter in filters.filters]
+        if all(mask is not None for mask in masks) and filters.condition in (FilterCondition.AND, FilterCondition.OR):
+            combine = np.logical_or if filters.condition == FilterCondition.OR else np.logical_and
+            return candidates[combine.reduce(masks)[candidates]].tolist()
+            
+        filter_fn = build_metadata_filter_fn(lambda row: self.metadata(row), filters)
+        return [int(row) for row in candidates if filter_fn(int(row))]
+        
+    def _code_mask(self, metadata_filter: Any) -> Optional[np.ndarray]:
+        """Boolean mask over all rows for an exact-match filter on a categorical field, else None."""
+        if not hasattr(metadata_filter, "key") or metadata_filter.key not in self._categories:
+            return None
+        from llama_index.core.vector_stores import FilterOperator
+        
+        if metadata_filter.operator == FilterOperator.EQ:
+            wanted = [metadata_filter.value]
+        elif metadata_filter.operator == FilterOperator.IN and isinstance(metadata_filter.value, list):
+            wanted = metadata_filter.value
+        else:
+            return None
+            
+        field = metadata_filter.key
+        vocab, codes = self._categories[field]
+        wanted_codes = [vocab.codes[value] for value in wanted if value in vocab.codes]
+        present = self._present_rows(field)
+        mask = np.isin(np.frombuffer(codes, dtype=np.uint32), wanted_codes) & present
+        for row in np.flatnonzero(~present):
+            mask[row] = self.get(int(row), field, DOCUMENT_DEFAULTS[field]) in wanted
+        return mask
+        
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """Filterable fields of a profile, defaulted as in its document metadata."""
+        return {
+            "name": self.get(row, "name", "Unknown"),
+            "title": self.get(row, "title", DOCUMENT_DEFAULTS["title"]),
+            "team": self.get(row, "team", DOCUMENT_DEFAULTS["team"]),
+            "location": self.get(row, "location", DOCUMENT_DEFAULTS["location"])
+        }
+        
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Approximate bytes held per part of the store.
+        
+        Returns:
+            Dict of part -> bytes; interned values and extra-field strings are
+            counted as str objects, other extra values as one pointer
+        """
+        def arrays(*columns: array) -> int:
+            return sum(len(column) * column.itemsize for column in columns)
+            
+        def strings(values: Iterable[Any]) -> int:
+            return sum(sys.getsizeof(value) if isinstance(value, str) else 8 for value in values)
+            
+        categories = self._categories.values()
+        return {
+            "presence": arrays(self._present),
+            "ids_names_emails": self._ids.nbytes() + self._names.nbytes() + self._emails.nbytes(),
+            "bios": self._bios.nbytes(),
+            "categorical": sum(arrays(codes) + strings(vocab.values) for vocab, codes in categories),
+            "experience": arrays(self._experience),
+            "skills_domains": self._skills.nbytes() + self._domains.nbytes() + strings(self._domains.vocab.values),
+            "technologies": strings(self._skills.vocab.values),
+            "projects": (
+                arrays(self._project_offsets, self._project_present, self._project_names, self._project_descs)
+                + self._project_stacks.nbytes() + strings(self._project_text.values)
+            ),
+            "extras": sum(strings(column) for column in self._extras.values())
+        }
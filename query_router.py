@@ -0,0 +1,299 @@
+"""
+Query router module.
+Answers plain profile lookups from structured fields without calling the LLM.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional
+
+from config import DATA_PATH, QUERY_ROUTER_ENABLED, ROUTER_MAX_RESULTS
+from lazy import cache_resource
+from profile_store import ProfileStore
+
+if TYPE_CHECKING:
+    from llama_index.core.vector_stores import MetadataFilters
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+
+# Words a lookup may contain besides the entities it names
+_FILLER_WORDS = {
+    "a", "all", "an", "and", "any", "anyone", "are", "at", "based", "can", "dev", "developer", "developers",
+    "devs", "do", "does", "employee", "employees", "engineer", "engineers", "experience", "experienced",
+    "expert", "experts", "familiar", "find", "from", "get", "give", "good", "has", "have", "having", "in",
+    "is", "knowing", "knows", "know", "list", "located", "me", "need", "of", "on", "people", "person",
+    "please", "proficient", "s", "show", "skill", "skilled", "skills", "someone", "specialist",
+    "specialists", "team", "the", "there", "we", "which", "who", "whos", "with", "works", "working"
+}
+
+# Field questions about a named person, e.g. "what is Rohan Iyer's email"
+_FIELD_FILLER_WORDS = _FILLER_WORDS | {"what", "whats", "tell", "about"}
+
+_FIELD_WORDS = {
+    "email": "email", "mail": "email", "contact": "email",
+    "title": "title", "role": "title", "position": "title", "designation": "title",
+    "team": "team",
+    "location": "location", "based": "location", "located": "location", "where": "location",
+    "experience": "experience_years", "years": "experience_years", "senior": "experience_years",
+    "skills": "skills", "skill": "skills", "stack": "skills"
+}
+
+_FIELD_LABELS = {
+    "email": "Email", "title": "Role", "team": "Team", "location": "Location",
+    "experience_years": "Experience", "skills": "Skills"
+}
+
+
+def words(text: str) -> List[str]:
+    """Lowercase words of a query or field value."""
+    return _WORD_PATTERN.findall(text.lower())
+
+
+def _phrase(text: str) -> str:
+    return " ".join(words(text))
+
+
+def _singular(phrase: str) -> str:
+    """Strip a plural "s" from the last word ("data engineers" -> "data engineer")."""
+    return phrase[:-1] if phrase.endswith("s") and not phrase.endswith("ss") else phrase
+
+
+def format_person(profile: Dict[str, Any]) -> str:
+    """Format a profile as "**Name** (Role, Team)", the answer format of SYSTEM_PROMPT."""
+    return f"**{profile.get('name', 'Unknown')}** ({profile.get('title', 'N/A')}, {profile.get('team', 'General')})"
+
+
+class ProfileDirectory:
+    """
+    Exact-match lookup tables over the structured profile fields.
+    
+    Every table maps a normalized phrase (lowercase words joined by spaces)
+    to the rows holding it, so recognizing the entities in a query costs
+    one dictionary lookup per word n-gram.
+    
+    Args:
+        profiles: ProfileStore, or employee profile dictionaries to build one from
+    """
+    
+    # Lookup order when a phrase is ambiguous
+    ENTITY_KINDS = ("name", "title", "skill", "location", "team")
+    
+    def __init__(self, profiles: ProfileStore | Iterable[Dict[str, Any]]):
+        self.store = profiles if isinstance(profiles, ProfileStore) else ProfileStore.from_profiles(profiles)
+        self.tables: Dict[str, Dict[str, List[int]]] = {kind: {} for kind in self.ENTITY_KINDS}
+        self.labels: Dict[tuple, str] = {}
+        
+        store = self.store
+        for row in range(len(store)):
+            self._add("name", store.get(row, "name"), row)
+            self._add("title", store.get(row, "title"), row)
+            self._add("location", store.get(row, "location", "Remote"), row)
+            self._add("team", store.get(row, "team", "General"), row)
+            for skill in store.get(row, "skills", []):
+                self._add("skill", skill, row)
+                
+        self.max_phrase_words = max((len(key.split()) for table in self.tables.values() for key in table), default=1)
+        
+    def _add(self, kind: str, value: Optional[str], row: int):
+        if not value:
+            return
+        key = _phrase(value)
+        if kind == "title":
+            key = _singular(key)
+        rows = self.tables[kind].setdefault(key, [])
+        if not rows or rows[-1] != row:
+            rows.append(row)
+        self.labels.setdefault((kind, key), value)
+        
+    def lookup(self, phrase: str) -> Optional[tuple[str, str]]:
+        """
+        Recognize a phrase as an entity.
+        
+        Args:
+            phrase: Normalized word n-gram from a query
+            
+        Returns:
+            (kind, key) of the first table holding the phrase, or None
+        """
+        for kind in self.ENTITY_KINDS:
+            key = _singular(phrase) if kind == "title" else phrase
+            if key in self.tables[kind]:
+                return kind, key
+        return None
+
+
+class QueryRouter:
+    """
+    Intent router in front of the chat engine.
+    
+    A query is answered directly when it consists only of recognized entities
+    (names, titles, skills, locations, teams) and filler words, e.g. "who knows
+    Python", "Data Engineers in Chennai" or "what is Rohan Iyer's email".
+    Anything else returns None and goes to the LLM. Handled/total counters
+    are kept per process.
+    
+    Args:
+        directory: ProfileDirectory over the current profiles
+        max_results: Maximum number of people listed in one answer
+    """
+    
+    def __init__(self, directory: ProfileDirectory, max_results: int = ROUTER_MAX_RESULTS):
+        self.directory = directory
+        self.max_results = max_results
+        self.total = 0
+        self.handled = 0
+        self.by_intent: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        
+    def _parse(self, query: str) -> Optional[tuple[Dict[str, List[str]], List[str]]]:
+        """Split a query into recognized entities and leftover words (longest match first)."""
+        tokens = words(query)
+        entities: Dict[str, List[str]] = {}
+        leftover = []
+        
+        i = 0
+        while i < len(tokens):
+            for n in range(min(self.directory.max_phrase_words, len(tokens) - i), 0, -1):
+                match = self.directory.lookup(" ".join(tokens[i:i + n]))
+                if match is not None:
+                    entities.setdefault(match[0], []).append(match[1])
+                    i += n
+                    break
+            else:
+                leftover.append(tokens[i])
+                i += 1
+                
+        return (entities, leftover) if entities else None
+        
+    def _rows(self, entities: Dict[str, List[str]], filters: Optional[MetadataFilters]) -> List[int]:
+        """Rows matching the recognized entities and the sidebar filters."""
+        tables = self.directory.tables
+        row_sets = []
+        for kind, keys in entities.items():
+            key_rows = [set(tables[kind][key]) for key in keys]
+            # Several skills must all be present; a person has one title, team and location
+            row_sets.append(set.intersection(*key_rows) if kind == "skill" else set.union(*key_rows))
+        rows = set.intersection(*row_sets)
+        return self.directory.store.rows_matching(filters, rows)
+        
+    def _answer_field(self, row: int, fields: List[str]) -> str:
+        profile = self.directory.store.profile(row)
+        lines = [format_person(profile)]
+        for field in fields or ["title", "team", "location", "email", "experience_years", "skills"]:
+            value = profile.get(field, "N/A")
+            if field == "skills":
+                value = ", ".join(value) if value else "N/A"
+            elif field == "experience_years":
+                value = f"{value} years"
+            lines.append(f"- **{_FIELD_LABELS[field]}:** {value}")
+        return "\n".join(lines)
+        
+    def _relevance(self, entities: Dict[str, List[str]]) -> str:
+        labels = {kind: [self.directory.labels[(kind, key)] for key in keys] for kind, keys in entities.items()}
+        parts = []
+        if "skill" in labels:
+            parts.append(f"Has {' and '.join(labels['skill'])} listed in skills")
+        if "title" in labels:
+            parts.append(f"Works as {' / '.join(labels['title'])}")
+        if "team" in labels:
+            parts.append(f"Member of the {' / '.join(labels['team'])} team")
+        if "location" in labels:
+            parts.append(f"Based in {' / '.join(labels['location'])}")
+        return "; ".join(parts) + "."
+        
+    def _answer_list(self, rows: List[int], entities: Dict[str, List[str]]) -> str:
+        if not rows:
+            return "I couldn't find any information about that."
+            
+        store = self.directory.store
+        rows = sorted(rows, key=lambda row: -(store.get(row, "experience_years") or 0))
+        relevance = self._relevance(entities)
+        
+        lines = [f"Found {len(rows)} {'person' if len(rows) == 1 else 'people'}:"]
+        for position, row in enumerate(rows[:self.max_results], start=1):
+            lines.append(f"{position}. {format_person(store.profile(row))}")
+            lines.append(f"   - **Relevance:** {relevance}")
+        if len(rows) > self.max_results:
+            lines.append(f"...and {len(rows) - self.max_results} more.")
+        return "\n".join(lines)
+        
+    def route(self, query: str, filters: Optional[MetadataFilters] = None) -> Optional[Dict[str, Any]]:
+        """
+        Answer a query from the profile fields if it is a plain lookup.
+        
+        Args:
+            query: User query
+            filters: Optional metadata filters from the sidebar
+            
+        Returns:
+            Dict with intent, response and profile names, or None to fall through to the LLM
+        """
+        result = None
+        parsed = self._parse(query)
+        
+        if parsed is not None:
+            entities, leftover = parsed
+            names = entities.get("name", [])
+            
+            if names:
+                fields = list(dict.fromkeys(_FIELD_WORDS[w] for w in leftover if w in _FIELD_WORDS))
+                understood = all(w in _FIELD_FILLER_WORDS or w in _FIELD_WORDS for w in leftover)
+                rows = self.directory.tables["name"][names[0]]
+                if understood and len(entities) == 1 and len(names) == 1 and len(rows) == 1:
+                    result = {"intent": "field", "response": self._answer_field(rows[0], fields), "rows": rows}
+                    
+            elif all(w in _FILLER_WORDS for w in leftover):
+                rows = self._rows(entities, filters)
+                intent = "skill" if "skill" in entities else "directory"
+                result = {"intent": intent, "response": self._answer_list(rows, entities), "rows": rows}
+                
+        with self._stats_lock:
+            self.total += 1
+            if result is not None:
+                self.handled += 1
+                self.by_intent[result["intent"]] = self.by_intent.get(result["intent"], 0) + 1
+                
+        if result is None:
+            return None
+        logger.info("Routed %r as %s (%d profiles)", query, result["intent"], len(result["rows"]))
+        return {
+            "intent": result["intent"],
+            "response": result["response"],
+            "profiles": [self.directory.store.get(row, "name") for row in result["rows"]]
+        }
+        
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get routing counters for this process.
+        
+        Returns:
+            Dict with total, handled, handled_share and per-intent counts
+        """
+        return {
+            "total": self.total,
+            "handled": self.handled,
+            "handled_share": round(self.handled / self.total, 4) if self.total else 0.0,
+            "by_intent": dict(self.by_intent)
+        }
+
+
+@cache_resource
+def create_query_router() -> QueryRouter | None:
+    """
+    Build the query router over the current profiles.
+    
+    Returns:
+        QueryRouter, or None if the router is disabled or profiles can't be loaded
+    """
+    if not QUERY_ROUTER_ENABLED:
+        return None
+    try:
+        return QueryRouter(ProfileDirectory(ProfileStore.from_file(DATA_PATH)))
+    except (OSError, ValueError) as e:
+        logger.warning("Query router disabled: %s", e)
+        return None
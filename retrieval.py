@@ -0,0 +1,332 @@
+"""
+Retrieval module.
+Hybrid retriever fusing vector search with the BM25 lexical index.
+"""
+
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+from llama_index.core import VectorStoreIndex
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from llama_index.core.vector_stores import MetadataFilters
+from llama_index.core.vector_stores.utils import build_metadata_filter_fn
+
+from config import SIMILARITY_TOP_K, RRF_K, MIN_TOP_K, SCORE_GAP_RATIO
+from lexical_index import LexicalIndex
+from metrics import span
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K) -> Dict[str, float]:
+    """
+    Fuse ranked id lists: each list contributes 1 / (k + rank) per id.
+    
+    Args:
+        rankings: Lists of ids, best first
+        k: Damping constant; larger values flatten the head of each list
+        
+    Returns:
+        Dict of id -> fused score
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] = scores.get(item_id, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+# Follow-ups asking for the next page of the previous query's candidates
+_MORE_PATTERN = re.compile(
+    r"^\s*(?:show|list|give|get|find)?\s*(?:me\s+)?(?:some\s+|any\s+)?"
+    r"(?:more|next(?:\s+page)?|the\s+rest|others)"
+    r"(?:\s+(?:people|profiles|results|matches|candidates|ones))?\s*[.?!]*\s*$",
+    re.IGNORECASE
+)
+
+
+def is_more_request(query: str) -> bool:
+    """
+    Check whether a query only asks for more results ("show more", "next page").
+    
+    Args:
+        query: User query
+        
+    Returns:
+        True if the query is a paging request
+    """
+    return bool(_MORE_PATTERN.match(query))
+
+
+def choose_top_k(scores: Sequence[float], min_k: int = MIN_TOP_K, gap_ratio: float = SCORE_GAP_RATIO) -> int:
+    """
+    Choose how many results to keep from their scores, best first.
+    
+    The cut goes at the largest drop between consecutive scores, provided it
+    spans at least gap_ratio of the whole score range: a narrow question
+    ("who knows MikroORM") has a few clear winners, while list-style
+    questions have flat scores and keep every candidate.
+    
+    Args:
+        scores: Result scores in descending order
+        min_k: Minimum number of results to keep
+        gap_ratio: Minimum share of the score range a drop must span
+        
+    Returns:
+        Number of leading results to keep
+    """
+    n = len(scores)
+    if n <= min_k:
+        return n
+    score_range = scores[0] - scores[-1]
+    if score_range <= 0:
+        return n
+        
+    cut = max(range(max(min_k, 1), n), key=lambda i: scores[i - 1] - scores[i])
+    return cut if scores[cut - 1] - scores[cut] >= gap_ratio * score_range else n
+
+
+def _embed_query(embed_model: BaseEmbedding, query_bundle: QueryBundle):
+    """Embed the query up front, so its time is recorded apart from the vector search."""
+    if query_bundle.embedding is None and query_bundle.embedding_strs:
+        with span("query_embed"):
+            query_bundle.embedding = embed_model.get_agg_embedding_from_queries(query_bundle.embedding_strs)
+
+
+async def _aembed_query(embed_model: BaseEmbedding, query_bundle: QueryBundle):
+    """Like _embed_query, without blocking the event loop."""
+    if query_bundle.embedding is None and query_bundle.embedding_strs:
+        with span("query_embed"):
+            query_bundle.embedding = await embed_model.aget_agg_embedding_from_queries(query_bundle.embedding_strs)
+
+
+class VectorRetriever(BaseRetriever):
+    """
+    Plain vector search, timed in the same stages as HybridRetriever.
+    
+    Args:
+        index: VectorStoreIndex instance
+        filters: Optional metadata filters for search
+        similarity_top_k: Number of nodes to return
+    """
+    
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        filters: MetadataFilters | None = None,
+        similarity_top_k: int = SIMILARITY_TOP_K
+    ):
+        super().__init__()
+        self._vector_retriever = index.as_retriever(filters=filters, similarity_top_k=similarity_top_k)
+        
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        with span("retrieve"):
+            _embed_query(self._vector_retriever._embed_model, query_bundle)
+            return self._vector_retriever.retrieve(query_bundle)
+            
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        with span("retrieve"):
+            await _aembed_query(self._vector_retriever._embed_model, query_bundle)
+            return await self._vector_retriever.aretrieve(query_bundle)
+
+
+class FusedNode(NodeWithScore):
+    """
+    Result of rank fusion: score is the fused score, similarity the vector
+    similarity it was fused from (None for lexical-only matches).
+    """
+    
+    similarity: Optional[float] = None
+
+
+def _similarity(result: NodeWithScore) -> Optional[float]:
+    """Vector similarity of a result; a plain vector result carries it as its score."""
+    return result.similarity if isinstance(result, FusedNode) else result.score
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Retriever combining the vector index with BM25 over skills and stacks.
+    
+    Vector search covers paraphrases ("someone who builds data pipelines"),
+    the lexical index covers exact names ("EventBridge", "MikroORM") that
+    embeddings tend to blur. Both rankings are merged with reciprocal rank
+    fusion, and lexical hits respect the same metadata filters. Results are
+    FusedNodes, which keep the vector similarity next to the fused score.
+    
+    Args:
+        index: VectorStoreIndex instance
+        lexical_index: LexicalIndex built from the same profiles
+        filters: Optional metadata filters for search
+        similarity_top_k: Number of nodes to return
+    """
+    
+    def __init__(
+        self,
+        index: VectorStoreIndex,
+        lexical_index: LexicalIndex,
+        filters: MetadataFilters | None = None,
+        similarity_top_k: int = SIMILARITY_TOP_K
+    ):
+        super().__init__()
+        self._index = index
+        self._lexical_index = lexical_index
+        self._filters = filters
+        self._similarity_top_k = similarity_top_k
+        self._vector_retriever = index.as_retriever(filters=filters, similarity_top_k=similarity_top_k)
+        
+    def _lexical_nodes(self, query: str) -> List[NodeWithScore]:
+        """Nodes of the best BM25 matches that pass the filters, best first."""
+        docstore = self._index.docstore
+        filter_fn = build_metadata_filter_fn(lambda node: node.metadata, self._filters) if self._filters else None
+        
+        # With filters, keep walking the ranking until enough matches pass them
+        top_k = None if self._filters else self._similarity_top_k
+        
+        results = []
+        for doc_id, score in self._lexical_index.search(query, top_k=top_k):
+            if len(results) >= self._similarity_top_k:
+                break
+            ref_doc_info = docstore.get_ref_doc_info(doc_id)
+            if ref_doc_info is None:
+                continue
+            for node in docstore.get_nodes(ref_doc_info.node_ids, raise_error=False):
+                if node is not None and (filter_fn is None or filter_fn(node)):
+                    results.append(NodeWithScore(node=node, score=score))
+        return results
+        
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        """Run both retrievers and keep the top nodes by fused score."""
+        with span("retrieve"):
+            _embed_query(self._vector_retriever._embed_model, query_bundle)
+            vector = self._vector_retriever.retrieve(query_bundle)
+            return self._fuse(vector, self._lexical_nodes(query_bundle.query_str))
+        
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        """Like _retrieve, without blocking the event loop on the query embedding."""
+        with span("retrieve"):
+            await _aembed_query(self._vector_retriever._embed_model, query_bundle)
+            vector = await self._vector_retriever.aretrieve(query_bundle)
+            return self._fuse(vector, self._lexical_nodes(query_bundle.query_str))
+        
+    def _fuse(self, vector: List[NodeWithScore], lexical: List[NodeWithScore]) -> List[NodeWithScore]:
+        """Merge vector and lexical results with reciprocal rank fusion."""
+        nodes = {result.node.node_id: result.node for result in lexical + vector}
+        similarities = {result.node.node_id: result.score for result in vector}
+        fused = reciprocal_rank_fusion([
+            [result.node.node_id for result in vector],
+            [result.node.node_id for result in lexical]
+        ])
+        
+        ranked = sorted(fused.items(), key=lambda item: -item[1])[:self._similarity_top_k]
+        return [
+            FusedNode(node=nodes[node_id], score=score, similarity=similarities.get(node_id))
+            for node_id, score in ranked
+        ]
+
+
+class AdaptiveRetriever(BaseRetriever):
+    """
+    Retriever choosing the number of results per query.
+    
+    The base retriever returns up to MAX_TOP_K candidates. They are cut at
+    the gap in vector similarity (see choose_top_k; fused rank scores fall
+    too smoothly to show one) and then to the token budget, so narrow
+    questions send a handful of profiles to the LLM and list questions send
+    as many as fit. Candidates left over are kept, and a paging request
+    ("show more") returns the next budget-sized page of them instead of
+    searching again.
+    
+    Args:
+        retriever: Base retriever returning candidates best first
+        token_counter: Callable node -> tokens it adds to the LLM context
+        token_budget: Maximum tokens of one page of results
+        min_top_k: Minimum number of results to keep
+        gap_ratio: See choose_top_k
+    """
+    
+    def __init__(
+        self,
+        retriever: BaseRetriever,
+        token_counter: Callable[[NodeWithScore], int],
+        token_budget: int,
+        min_top_k: int = MIN_TOP_K,
+        gap_ratio: float = SCORE_GAP_RATIO
+    ):
+        super().__init__()
+        self._retriever = retriever
+        self._token_counter = token_counter
+        self._token_budget = token_budget
+        self._min_top_k = min_top_k
+        self._gap_ratio = gap_ratio
+        self._pending: List[NodeWithScore] = []
+        self._lock = threading.Lock()
+        self.last_stats: Dict[str, int] = {}
+        
+    @property
+    def pending(self) -> int:
+        """Number of candidates of the last query not returned yet."""
+        return len(self._pending)
+        
+    def _take_page(self, candidates: List[NodeWithScore], limit: Optional[int] = None) -> List[NodeWithScore]:
+        """Pop leading candidates while they fit into the token budget; the rest stay pending."""
+        limit = len(candidates) if limit is None else limit
+        page = []
+        used = 0
+        for position, candidate in enumerate(candidates[:limit]):
+            tokens = self._token_counter(candidate)
+            if page and used + tokens > self._token_budget:
+                self._pending = candidates[position:]
+                return page
+            page.append(candidate)
+            used += tokens
+        self._pending = candidates[limit:]
+        return page
+        
+    def _next_page(self, query_bundle: QueryBundle) -> Optional[List[NodeWithScore]]:
+        """Next page of pending candidates for a paging request, None for a new query."""
+        with self._lock:
+            if not (is_more_request(query_bundle.query_str) and self._pending):
+                return None
+            page = self._take_page(self._pending)
+            self.last_stats = {"paged": 1, "top_k": len(page), "pending": len(self._pending)}
+            return page
+                
+    def _gap_top_k(self, candidates: List[NodeWithScore]) -> int:
+        """
+        Number of leading candidates above the similarity gap.
+        
+        The gap is found among the vector similarities sorted on their own;
+        the cut then falls after the last candidate above it, so it stays a
+        prefix of the fused order and keeps lexical matches ranked before it.
+        """
+        similarities = [_similarity(candidate) for candidate in candidates]
+        ranked = sorted((s for s in similarities if s is not None), reverse=True)
+        keep = choose_top_k(ranked, self._min_top_k, self._gap_ratio)
+        if keep == len(ranked):
+            return len(candidates)
+        threshold = ranked[keep - 1]
+        last = max(i for i, s in enumerate(similarities) if s is not None and s >= threshold)
+        return max(last + 1, min(self._min_top_k, len(candidates)))
+        
+    def _cut(self, candidates: List[NodeWithScore]) -> List[NodeWithScore]:
+        """Keep the gap-selected head of a new query's candidates; paging continues from where it stops."""
+        top_k = self._gap_top_k(candidates)
+        with self._lock:
+            page = self._take_page(candidates, top_k)
+            self.last_stats = {
+                "paged": 0, "candidates": len(candidates), "top_k": len(page), "pending": len(self._pending)
+            }
+            return page
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        """Return the adaptive top-k of a new query, or the next page for "show more"."""
+        with span("retrieve"):
+            page = self._next_page(query_bundle)
+            return page if page is not None else self._cut(self._retriever.retrieve(query_bundle))
+        
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        with span("retrieve"):
+            page = self._next_page(query_bundle)
+            return page if page is not None else self._cut(await self._retriever.aretrieve(query_bundle))
@@ -0,0 +1,278 @@
+"""
+Session registry module.
+Keeps chat engines and chat memory per user session across Streamlit reruns.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from config import (
+    SESSION_TTL_SECONDS,
+    MAX_CHAT_SESSIONS,
+    MAX_ENGINES_PER_SESSION
+)
+from chat_engine import create_chat_engine
+from lazy import cache_resource
+from lexical_index import LexicalIndex
+
+if TYPE_CHECKING:
+    from llama_index.core import VectorStoreIndex
+    from llama_index.core.memory import BaseMemory
+    from llama_index.core.vector_stores import MetadataFilters
+
+logger = logging.getLogger(__name__)
+
+FilterKey = tuple
+
+
+def filter_key(filters: Optional[MetadataFilters]) -> FilterKey:
+    """
+    Hashable, order-independent key for a set of sidebar filters.
+    
+    Args:
+        filters: Metadata filters, or None for no restriction
+        
+    Returns:
+        Tuple of the condition and sorted (field, operator, sorted values) entries
+    """
+    if not filters or not filters.filters:
+        return ()
+    from llama_index.core.vector_stores import FilterOperator, MetadataFilter
+        
+    fields = []
+    for f in filters.filters:
+        if isinstance(f, MetadataFilter):
+            values = f.value if isinstance(f.value, list) else [f.value]
+            # EQ is a one-value IN, so "Chennai" -> ["Chennai", "Pune"] counts as widening
+            operator = FilterOperator.IN if f.operator == FilterOperator.EQ else f.operator
+            fields.append((f.key, str(operator), tuple(sorted(map(str, values)))))
+        else:
+            fields.append((repr(f),))
+    return (str(filters.condition),) + tuple(sorted(fields))
+
+
+def filters_widen(old: FilterKey, new: FilterKey) -> bool:
+    """
+    Check whether new filters accept every profile the old ones accepted.
+    
+    Chat history is only carried into a new filter combination in that case:
+    after narrowing, earlier answers may name people that are now out of
+    scope, and the LLM would happily repeat them.
+    
+    Args:
+        old: filter_key of the filters the memory was built under
+        new: filter_key of the filters about to be used
+        
+    Returns:
+        True if carrying the memory over is safe
+    """
+    if not new or old == new:
+        return True
+    if not old or old[0] != new[0]:
+        return False
+        
+    old_fields = {field[0]: field for field in old[1:]}
+    for field in new[1:]:
+        previous = old_fields.get(field[0])
+        # Every constraint in new must already have been at least as strict in old
+        if previous is None or previous[1] != field[1] or not set(previous[2]) <= set(field[2]):
+            return False
+    return True
+
+
+class ChatEngineRegistry:
+    """
+    LRU/TTL registry of chat engines keyed by (session id, filter combination).
+    
+    Each session owns one chat memory shared by its engines, so switching
+    filters back and forth reuses engines and keeps the conversation. The
+    memory is reset when the filters narrow (see filters_widen). Sessions
+    idle for longer than ttl_seconds, or beyond max_sessions, are evicted
+    least recently used first.
+    
+    Args:
+        factory: Callable (filters, memory) -> chat engine
+        max_sessions: Maximum number of sessions kept
+        ttl_seconds: Idle time after which a session is evicted
+        max_engines_per_session: Engines cached per session, LRU-evicted
+    """
+    
+    def __init__(
+        self,
+        factory: Callable[[Optional[MetadataFilters], BaseMemory], Any],
+        max_sessions: int = MAX_CHAT_SESSIONS,
+        ttl_seconds: float = SESSION_TTL_SECONDS,
+        max_engines_per_session: int = MAX_ENGINES_PER_SESSION
+    ):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_engines_per_session = max_engines_per_session
+        self.sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.engines_created = 0
+        self.engine_hits = 0
+        self.memory_resets = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        
+    def _evict(self, now: float):
+        """Drop expired sessions, then the least recently used ones over capacity."""
+        while self.sessions:
+            session_id, session = next(iter(self.sessions.items()))
+            if now - session["last_used"] <= self.ttl_seconds and len(self.sessions) <= self.max_sessions:
+                break
+            del self.sessions[session_id]
+            self.evictions += 1
+            logger.debug("Evicted chat session %s", session_id)
+            
+    def get(self, session_id: str, filters: Optional[MetadataFilters] = None):
+        """
+        Get the chat engine for a session and filter combination.
+        
+        Args:
+            session_id: Stable id of the user session
+            filters: Current metadata filters
+            
+        Returns:
+            Chat engine, reused when this session already had one for the filters
+        """
+        from chat_memory import create_chat_memory
+        
+        key = filter_key(filters)
+        now = time.monotonic()
+        
+        with self._lock:
+            session = self.sessions.pop(session_id, None)
+            if session is None:
+                session = {
+                    "memory": create_chat_memory(),
+                    "memory_id": uuid.uuid4().hex,
+                    "memory_filters": key,
+                    "engines": OrderedDict()
+                }
+            elif not filters_widen(session["memory_filters"], key):
+                # Engines hold a reference to the memory, so they go with it
+                session["memory"] = create_chat_memory()
+                session["memory_id"] = uuid.uuid4().hex
+                session["engines"].clear()
+                self.memory_resets += 1
+            session["memory_filters"] = key
+            session["last_used"] = now
+            self.sessions[session_id] = session
+            self._evict(now)
+            
+            engines = session["engines"]
+            engine = engines.pop(key, None)
+            if engine is None:
+                engine = self.factory(filters, session["memory"])
+                self.engines_created += 1
+            else:
+                self.engine_hits += 1
+            engines[key] = engine
+            while len(engines) > self.max_engines_per_session:
+                engines.popitem(last=False)
+                
+        return engine
+        
+    def engine_without_history(self, filters: Optional[MetadataFilters] = None):
+        """
+        Create a chat engine with a new, empty memory that belongs to no session.
+        
+        Answers shared between sessions (see SingleFlight) are generated on
+        it, so they never depend on the history of whichever session asked
+        first. Nothing is cached; every call builds a new engine.
+        
+        Args:
+            filters: Metadata filters of the request
+            
+        Returns:
+            Chat engine
+        """
+        from chat_memory import create_chat_memory
+        
+        return self.factory(filters, create_chat_memory())
+        
+    def memory(self, session_id: str) -> Optional[BaseMemory]:
+        """
+        Get the chat memory shared by a session's engines.
+        
+        Args:
+            session_id: Stable id of the user session
+            
+        Returns:
+            Chat memory, or None for unknown sessions
+        """
+        with self._lock:
+            session = self.sessions.get(session_id)
+            return session["memory"] if session is not None else None
+            
+    def memory_id(self, session_id: str) -> Optional[str]:
+        """
+        Get the id of a session's current chat memory.
+        
+        The id changes whenever the memory is replaced: when the filters
+        narrow, and when an evicted session is created again.
+        
+        Args:
+            session_id: Stable id of the user session
+            
+        Returns:
+            Random memory id, or None for unknown sessions
+        """
+        with self._lock:
+            session = self.sessions.get(session_id)
+            return session["memory_id"] if session is not None else None
+        
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get registry counters.
+        
+        Returns:
+            Dict with active sessions, engines created/reused, memory resets and evictions
+        """
+        return {
+            "sessions": len(self.sessions),
+            "engines_created": self.engines_created,
+            "engine_hits": self.engine_hits,
+            "memory_resets": self.memory_resets,
+            "evictions": self.evictions
+        }
+
+
+def get_session_id() -> str:
+    """
+    Get a stable id for the current Streamlit session.
+    
+    Returns:
+        Random id stored in st.session_state on first use
+    """
+    import streamlit as st
+    
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+
+@cache_resource
+def get_chat_engine_registry(_index: VectorStoreIndex, _lexical_index: LexicalIndex | None = None) -> ChatEngineRegistry:
+    """
+    Create the process-wide chat engine registry for the current index.
+    
+    Args:
+        _index: VectorStoreIndex instance (not hashed by st.cache_resource)
+        _lexical_index: Optional BM25 index for hybrid retrieval
+        
+    Returns:
+        ChatEngineRegistry building engines with create_chat_engine
+    """
+    return ChatEngineRegistry(
+        lambda filters, memory: create_chat_engine(
+            _index, filters=filters, lexical_index=_lexical_index, memory=memory
+        )
+    )
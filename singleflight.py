@@ -0,0 +1,257 @@
+"""
+Singleflight module.
+Coalesces identical in-flight queries so concurrent users share one computation.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+import threading
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from config import COALESCE_QUERIES
+from lazy import cache_resource
+from session_registry import filter_key
+
+if TYPE_CHECKING:
+    from llama_index.core.vector_stores import MetadataFilters
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalize a question for coalescing: case, whitespace and trailing punctuation are ignored.
+    
+    Args:
+        query: User query
+        
+    Returns:
+        Normalized query
+    """
+    return _WHITESPACE.sub(" ", query.lower()).strip().rstrip("?!. ")
+
+
+def query_key(query: str, filters: Optional[MetadataFilters], data_version: Optional[str], *extra: Hashable) -> tuple:
+    """
+    Key under which identical requests are coalesced.
+    
+    Args:
+        query: User query
+        filters: Metadata filters of the request
+        data_version: Current data version (see indexing.current_data_version)
+        *extra: Anything else the result depends on (endpoint, top_k)
+        
+    Returns:
+        Hashable key
+    """
+    return (normalize_query(query), filter_key(filters), data_version) + extra
+
+
+class _Call:
+    """A computation running on one thread, awaited by others."""
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[Exception] = None
+        self.interrupted = False
+
+
+class _Broadcast:
+    """Items of one async stream, replayed from the start to every follower."""
+    
+    def __init__(self):
+        self.items: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.changed = asyncio.Condition()
+        
+    async def feed(self, source: AsyncIterator[Any]):
+        try:
+            async for item in source:
+                async with self.changed:
+                    self.items.append(item)
+                    self.changed.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            async with self.changed:
+                self.finished = True
+                self.changed.notify_all()
+                
+    async def follow(self) -> AsyncIterator[Any]:
+        position = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: position < len(self.items) or self.finished)
+                items = self.items[position:]
+                finished = self.finished
+            for item in items:
+                yield item
+            position += len(items)
+            if finished:
+                if self.error is not None:
+                    raise self.error
+                return
+
+
+class SingleFlight:
+    """
+    Group of in-flight computations keyed by request.
+    
+    The first caller for a key runs the computation; callers arriving while
+    it runs wait for it and get the same result (or Exception) instead of
+    starting their own. If the first caller is interrupted by anything that
+    is not an Exception (a Streamlit rerun or stop), a waiting caller runs
+    the computation instead. Nothing is kept once a computation finishes - that
+    is the answer cache's job. Thread callers (Streamlit sessions) use do(),
+    coroutines (the HTTP API) use ado() and stream(). Async computations run
+    as their own tasks, so a disconnecting first caller does not cancel them
+    for the others.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Future] = {}
+        self._broadcasts: Dict[Hashable, _Broadcast] = {}
+        self.executions = 0
+        self.shared = 0
+        
+    def _count(self, shared: bool):
+        if shared:
+            self.shared += 1
+        else:
+            self.executions += 1
+            
+    def in_flight(self, key: Hashable) -> bool:
+        """Whether a computation for key is currently running."""
+        return key in self._calls or key in self._tasks or key in self._broadcasts
+        
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Run fn, or wait for the identical computation already running on another thread.
+        
+        Args:
+            key: Request key (see query_key)
+            fn: Computation
+            
+        Returns:
+            tuple: (result, shared) - shared is True if another caller computed it
+        """
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                shared = call is not None
+                if not shared:
+                    call = self._calls[key] = _Call()
+                    
+            if not shared:
+                break
+            call.done.wait()
+            if not call.interrupted:
+                with self._lock:
+                    self._count(True)
+                if call.error is not None:
+                    raise call.error
+                return call.result, True
+            # The leader's own session stopped it (e.g. a Streamlit rerun); one follower takes over
+            
+        with self._lock:
+            self._count(False)
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+        except BaseException:
+            # Script control flow (RerunException, StopException, KeyboardInterrupt) belongs to
+            # the leader's session alone and must not reach the followers
+            call.interrupted = True
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+                
+        if call.error is not None:
+            raise call.error
+        return call.result, False
+        
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Await fn(), or the identical computation already in flight.
+        
+        Args:
+            key: Request key (see query_key)
+            fn: Coroutine function
+            
+        Returns:
+            tuple: (result, shared) - shared is True if another caller computed it
+        """
+        with self._lock:
+            task = self._tasks.get(key)
+            shared = task is not None
+            self._count(shared)
+            if not shared:
+                task = self._tasks[key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _, key=key: self._forget(self._tasks, key))
+        return await asyncio.shield(task), shared
+        
+    def stream(self, key: Hashable, factory: Callable[[], AsyncIterator[Any]]) -> tuple[AsyncIterator[Any], bool]:
+        """
+        Follow the async stream factory() produces, or the identical one already in flight.
+        
+        Every follower sees every item from the start, however late it joins.
+        Must be called from a running event loop.
+        
+        Args:
+            key: Request key (see query_key)
+            factory: Callable returning the async iterator to share
+            
+        Returns:
+            tuple: (items, shared) - Async iterator over the items; shared is True
+                if another caller started the stream
+        """
+        with self._lock:
+            broadcast = self._broadcasts.get(key)
+            shared = broadcast is not None
+            self._count(shared)
+            if not shared:
+                broadcast = self._broadcasts[key] = _Broadcast()
+                task = asyncio.ensure_future(broadcast.feed(factory()))
+                task.add_done_callback(lambda _, key=key: self._forget(self._broadcasts, key))
+        return broadcast.follow(), shared
+        
+    def _forget(self, flights: Dict[Hashable, Any], key: Hashable):
+        with self._lock:
+            flights.pop(key, None)
+            
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get coalescing counters.
+        
+        Returns:
+            Dict with requests, executions, shared (computations saved),
+            saved_share and in_flight
+        """
+        requests = self.executions + self.shared
+        return {
+            "requests": requests,
+            "executions": self.executions,
+            "shared": self.shared,
+            "saved_share": round(self.shared / requests, 4) if requests else 0.0,
+            "in_flight": len(self._calls) + len(self._tasks) + len(self._broadcasts)
+        }
+
+
+@cache_resource
+def get_query_coalescer() -> SingleFlight | None:
+    """
+    Create the process-wide query coalescer.
+    
+    Returns:
+        SingleFlight, or None if COALESCE_QUERIES is off
+    """
+    return SingleFlight() if COALESCE_QUERIES else None
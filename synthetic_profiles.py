@@ -0,0 +1,246 @@
+"""
+Synthetic profiles module.
+Seeded generator of realistic employee profiles for scale testing.
+
+Usage:
+    python synthetic_profiles.py --count 100000 --output data/synthetic_100k.jsonl
+"""
+
+import argparse
+import bisect
+import gzip
+import itertools
+import json
+import random
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Sequence, Tuple
+
+from config import DATA_PATH
+from data_processing import load_profiles_from_json
+
+BIO_TEMPLATE = (
+    "{title} in {team}. Works on {domain}. Enjoys shipping reliable systems and clean APIs. "
+    "Known for debugging tricky issues like {focus}."
+)
+FOCUS_SEPARATOR = " Focus: "
+ID_WIDTH = 7  # u0000001 ... u9999999, fixed so ids do not depend on the count
+
+
+class _Weighted:
+    """Values with their sample frequencies; cumulative weights are computed once."""
+    
+    def __init__(self, counts: Counter):
+        self.values = list(counts)
+        self.cum_weights = list(itertools.accumulate(counts[v] for v in self.values))
+        self.total = self.cum_weights[-1]
+        
+    def pick(self, rng: random.Random) -> Any:
+        return self.values[bisect.bisect_right(self.cum_weights, rng.random() * self.total)]
+        
+    def pick_distinct(self, rng: random.Random, k: int) -> List[Any]:
+        """k distinct values, more frequent ones more likely (k is capped at the number of values)."""
+        k = min(k, len(self.values))
+        picked = {}
+        while len(picked) < k:
+            picked.setdefault(self.pick(rng), None)
+        return list(picked)
+
+
+class ProfileDistribution:
+    """
+    Field distributions learned from a sample of real profiles.
+    
+    Every categorical field (team, location, title, skills, domains,
+    project names and stacks, focus topics) and every count (skills,
+    domains and projects per profile, stack size, experience) is drawn
+    with the frequencies observed in the sample, as is the share of
+    project entries repeating a project already listed in the same profile.
+    
+    Args:
+        profiles: Sample profiles in the data/profiles.json schema
+    """
+    
+    def __init__(self, profiles: Sequence[Dict[str, Any]]):
+        if not profiles:
+            raise ValueError("Need at least one sample profile")
+            
+        def weighted(values) -> _Weighted:
+            return _Weighted(Counter(values))
+            
+        names = [p["name"].split(" ", 1) for p in profiles if " " in p["name"]]
+        self.first_names = weighted(first for first, _ in names)
+        self.last_names = weighted(last for _, last in names)
+        self.teams = weighted(p["team"] for p in profiles)
+        self.locations = weighted(p["location"] for p in profiles)
+        self.titles = weighted(p["title"] for p in profiles)
+        self.experience = weighted(p.get("experience_years", 0) for p in profiles)
+        self.skills = weighted(s for p in profiles for s in p.get("skills", []))
+        self.skill_counts = weighted(len(p.get("skills", [])) for p in profiles)
+        self.domains = weighted(d for p in profiles for d in p.get("domains", []))
+        self.domain_counts = weighted(len(p.get("domains", [])) for p in profiles)
+        self.project_counts = weighted(len(p.get("projects", [])) for p in profiles)
+        
+        projects = [proj for p in profiles for proj in p.get("projects", [])]
+        self.project_names = weighted(proj["name"] for proj in projects)
+        self.project_descriptions: Dict[str, str] = {}
+        self.project_stacks: Dict[str, _Weighted] = {}
+        self.stack_sizes: Dict[str, _Weighted] = {}
+        focus = []
+        for name in self.project_names.values:
+            entries = [proj for proj in projects if proj["name"] == name]
+            self.project_descriptions[name] = entries[0].get("desc", "").split(FOCUS_SEPARATOR, 1)[0]
+            self.project_stacks[name] = weighted(s for proj in entries for s in proj.get("stack", []))
+            self.stack_sizes[name] = weighted(len(proj.get("stack", [])) for proj in entries)
+        for proj in projects:
+            if FOCUS_SEPARATOR in proj.get("desc", ""):
+                focus.append(proj["desc"].rsplit(FOCUS_SEPARATOR, 1)[1].rstrip("."))
+        self.focus = weighted(focus or ["performance"])
+        
+        # Share of project entries (after a profile's first) naming a project already listed
+        repeats, later_entries = 0, 0
+        for p in profiles:
+            seen = set()
+            for position, proj in enumerate(p.get("projects", [])):
+                if position:
+                    later_entries += 1
+                    repeats += proj["name"] in seen
+                seen.add(proj["name"])
+        self.repeat_share = repeats / later_entries if later_entries else 0.0
+        
+    @classmethod
+    def from_file(cls, file_path: str = DATA_PATH) -> "ProfileDistribution":
+        """Learn the distributions from a profiles file."""
+        return cls(load_profiles_from_json(file_path))
+        
+    def _project(self, rng: random.Random, name: str) -> Dict[str, Any]:
+        stack = self.project_stacks[name].pick_distinct(rng, self.stack_sizes[name].pick(rng))
+        return {
+            "name": name,
+            "desc": f"{self.project_descriptions[name]}{FOCUS_SEPARATOR}{self.focus.pick(rng)}.",
+            "stack": stack
+        }
+        
+    def sample(self, rng: random.Random, profile_id: str, serial: int) -> Dict[str, Any]:
+        """
+        Draw one profile.
+        
+        Args:
+            rng: Random generator (determines the profile)
+            profile_id: Value of the "id" field
+            serial: Number appended to the email local part so emails stay unique
+            
+        Returns:
+            Profile dict in the data/profiles.json schema
+        """
+        first, last = self.first_names.pick(rng), self.last_names.pick(rng)
+        title, team = self.titles.pick(rng), self.teams.pick(rng)
+        domains = self.domains.pick_distinct(rng, self.domain_counts.pick(rng))
+        
+        # Repeats happen at the sample's rate; otherwise a project not listed yet is drawn
+        names: List[str] = []
+        for _ in range(self.project_counts.pick(rng)):
+            if names and (rng.random() < self.repeat_share or len(set(names)) == len(self.project_names.values)):
+                names.append(rng.choice(names))
+            else:
+                name = self.project_names.pick(rng)
+                while name in names:
+                    name = self.project_names.pick(rng)
+                names.append(name)
+                
+        return {
+            "id": profile_id,
+            "name": f"{first} {last}",
+            "title": title,
+            "team": team,
+            "location": self.locations.pick(rng),
+            "email": f"{first.lower()}.{last.lower()}{serial}@company.com",
+            "experience_years": self.experience.pick(rng),
+            "skills": sorted(self.skills.pick_distinct(rng, self.skill_counts.pick(rng))),
+            "domains": domains,
+            "projects": [self._project(rng, name) for name in names],
+            "bio": BIO_TEMPLATE.format(
+                title=title, team=team, domain=rng.choice(domains) if domains else "internal tools",
+                focus=self.focus.pick(rng)
+            )
+        }
+
+
+def generate_profiles(
+    count: int,
+    seed: int = 0,
+    distribution: ProfileDistribution | None = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily generate synthetic profiles.
+    
+    The same count, seed and sample always produce the same profiles, and
+    the first n profiles do not depend on count.
+    
+    Args:
+        count: Number of profiles
+        seed: Random seed
+        distribution: Field distributions, learned from data/profiles.json by default
+        
+    Yields:
+        Profile dicts with ids u0000001, u0000002, ...
+    """
+    distribution = distribution or ProfileDistribution.from_file()
+    rng = random.Random(seed)
+    for serial in range(1, count + 1):
+        yield distribution.sample(rng, f"u{serial:0{ID_WIDTH}d}", serial)
+
+
+def _format_for(path: str) -> Tuple[str, bool]:
+    """Output format ("json" or "jsonl") and compression implied by a file name."""
+    compressed = path.endswith(".gz")
+    base = path[:-3] if compressed else path
+    return ("jsonl" if base.endswith(".jsonl") else "json"), compressed
+
+
+def write_profiles(path: str, profiles: Iterator[Dict[str, Any]], fmt: str | None = None) -> int:
+    """
+    Stream profiles to a JSON array or JSONL file without holding them in memory.
+    
+    Args:
+        path: Output path; ".jsonl" selects JSONL, a ".gz" suffix gzips the output
+        profiles: Profiles to write
+        fmt: "json" or "jsonl", overriding the file name
+        
+    Returns:
+        Number of profiles written
+    """
+    inferred, compressed = _format_for(path)
+    fmt = fmt or inferred
+    opener = gzip.open if compressed else open
+    written = 0
+    with opener(path, "wt", encoding="utf-8") as f:
+        if fmt == "json":
+            f.write("[")
+        for profile in profiles:
+            if fmt == "json":
+                f.write(",\n" if written else "\n")
+                f.write(json.dumps(profile))
+            else:
+                f.write(json.dumps(profile) + "\n")
+            written += 1
+        if fmt == "json":
+            f.write("\n]\n")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--sample", default=DATA_PATH, help="Profiles file the distributions are learned from")
+    parser.add_argument("--output", required=True, help="Output path (.json, .jsonl, optionally .gz)")
+    parser.add_argument("--format", choices=["json", "jsonl"], help="Override the format implied by --output")
+    args = parser.parse_args()
+    
+    profiles = generate_profiles(args.count, args.seed, ProfileDistribution.from_file(args.sample))
+    written = write_profiles(args.output, profiles, args.format)
+    print(f"Wrote {written} profiles to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
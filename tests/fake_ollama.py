@@ -0,0 +1,221 @@
+"""
+Fake Ollama Server
+A local stand-in for the Ollama HTTP API with injectable latency and failures.
+
+Usage:
+    with FakeOllamaServer(embed_latency=0.05) as server:
+        llm, embed_model = fake_models(server.url)
+"""
+
+import hashlib
+import json
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_embedding(text: str, dim: int) -> list[float]:
+    """Deterministic unit-length pseudo embedding derived from the text hash"""
+    values = []
+    counter = 0
+    while len(values) < dim:
+        digest = hashlib.sha256(f"{counter}:{text}".encode("utf-8")).digest()
+        values.extend((b - 127.5) / 127.5 for b in digest)
+        counter += 1
+    values = values[:dim]
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    return [v / norm for v in values]
+
+
+def fake_answer(prompt: str, num_tokens: int) -> list[str]:
+    """Deterministic answer tokens echoing the start of the prompt"""
+    words = prompt.split() or ["empty"]
+    return [f"{words[i % len(words)]} " for i in range(num_tokens)]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler; configuration lives on the server instance"""
+    
+    def log_message(self, format, *args):
+        pass
+        
+    def _read_json(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+        
+    def _send_json(self, payload: dict, status: int = 200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        
+    def _send_generation(self, fake: "FakeOllamaServer", payload: dict, tokens: list[str], key: str):
+        """Answer /api/chat (key "message") or /api/generate (key "response"), streamed as NDJSON if asked"""
+        def body(text: str) -> dict:
+            return {"message": {"role": "assistant", "content": text}} if key == "message" else {"response": text}
+            
+        model = payload.get("model")
+        time.sleep(fake.first_token_latency)
+        final = {
+            "model": model, "done": True, "done_reason": "stop",
+            "prompt_eval_count": sum(len(m.get("content", "")) for m in payload.get("messages", [])) // 4,
+            "eval_count": len(tokens)
+        }
+        if not payload.get("stream", True):
+            time.sleep(fake.token_latency * len(tokens))
+            self._send_json({**final, **body("".join(tokens))})
+            return
+            
+        # HTTP/1.0 without Content-Length: the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for token in tokens:
+            self.wfile.write((json.dumps({"model": model, "done": False, **body(token)}) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(fake.token_latency)
+        self.wfile.write((json.dumps({**final, **body("")}) + "\n").encode("utf-8"))
+        
+    def _should_fail(self) -> bool:
+        fake = self.server.fake
+        with fake.lock:
+            fake.request_count += 1
+            return bool(fake.fail_every) and fake.request_count % fake.fail_every == 0
+            
+    def do_POST(self):
+        fake = self.server.fake
+        with fake.lock:
+            fake.in_flight += 1
+            fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+        try:
+            self._dispatch(fake, self._read_json())
+        finally:
+            with fake.lock:
+                fake.in_flight -= 1
+                
+    def _dispatch(self, fake: "FakeOllamaServer", payload: dict):
+        if self._should_fail():
+            self._send_json({"error": "injected failure"}, status=500)
+            return
+            
+        if self.path == "/api/embed":
+            inputs = payload.get("input", [])
+            texts = [inputs] if isinstance(inputs, str) else list(inputs)
+            fake.record_embed(texts)
+            time.sleep(fake.embed_latency)
+            self._send_json({
+                "model": payload.get("model"),
+                "embeddings": [fake_embedding(t, fake.dim) for t in texts]
+            })
+        elif self.path == "/api/embeddings":
+            text = payload.get("prompt", "")
+            fake.record_embed([text])
+            time.sleep(fake.embed_latency)
+            self._send_json({"embedding": fake_embedding(text, fake.dim)})
+        elif self.path == "/api/chat":
+            messages = payload.get("messages", [])
+            fake.record_generation(messages)
+            prompt = messages[-1].get("content", "") if messages else ""
+            self._send_generation(fake, payload, fake_answer(prompt, fake.answer_tokens), "message")
+        elif self.path == "/api/generate":
+            fake.record_generation()
+            self._send_generation(fake, payload, fake_answer(payload.get("prompt", ""), fake.answer_tokens), "response")
+        else:
+            self._send_json({"error": f"unknown endpoint {self.path}"}, status=404)
+
+
+class FakeOllamaServer:
+    """
+    Threaded fake Ollama server.
+    
+    Args:
+        embed_latency: Seconds to sleep per embedding request
+        dim: Embedding dimension
+        fail_every: If set, every Nth request returns HTTP 500
+        first_token_latency: Seconds before a chat/generate answer starts (prompt processing)
+        token_latency: Seconds per generated token
+        answer_tokens: Tokens per chat/generate answer
+    """
+    
+    def __init__(
+        self,
+        embed_latency: float = 0.0,
+        dim: int = 64,
+        fail_every: int = 0,
+        first_token_latency: float = 0.0,
+        token_latency: float = 0.0,
+        answer_tokens: int = 16
+    ):
+        self.embed_latency = embed_latency
+        self.dim = dim
+        self.fail_every = fail_every
+        self.first_token_latency = first_token_latency
+        self.token_latency = token_latency
+        self.answer_tokens = answer_tokens
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.embed_requests = 0
+        self.embedded_texts = 0
+        self.generation_requests = 0
+        self.chat_messages: list[list[dict]] = []  # messages of every /api/chat request
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server = None
+        self._thread = None
+        
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+        
+    def record_embed(self, texts: list[str]):
+        with self.lock:
+            self.embed_requests += 1
+            self.embedded_texts += len(texts)
+            
+    def record_generation(self, messages: list[dict] | None = None):
+        with self.lock:
+            self.generation_requests += 1
+            if messages is not None:
+                self.chat_messages.append(messages)
+            
+    def start(self) -> "FakeOllamaServer":
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.fake = self
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+        
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+        
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def fake_models(
+    url: str,
+    request_timeout: float = 30,
+    context_window: int = 8192,
+    embed_batch_size: int | None = None
+) -> tuple:
+    """
+    Ollama LLM and embedding model talking to a fake server (or any URL).
+    
+    The fake server has no /api/show, so the LLM gets an explicit context window.
+    """
+    from llama_index.embeddings.ollama import OllamaEmbedding
+    from llama_index.llms.ollama import Ollama
+    
+    llm = Ollama(model="fake", base_url=url, context_window=context_window, request_timeout=request_timeout)
+    embed_kwargs = {"embed_batch_size": embed_batch_size} if embed_batch_size is not None else {}
+    return llm, OllamaEmbedding(model_name="fake", base_url=url, **embed_kwargs)
@@ -0,0 +1,131 @@
+"""
+Answer Cache Tests
+Checks hits on paraphrased questions and every way an answer stops being reused.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+from typing import Dict, List
+
+from llama_index.core.embeddings import BaseEmbedding
+from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
+
+from answer_cache import SemanticAnswerCache, is_self_contained
+
+
+class TableEmbedding(BaseEmbedding):
+    """Embedding model returning fixed vectors for known questions"""
+    
+    table: Dict[str, List[float]] = {}
+    
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self.table[query]
+        
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self.table[query]
+        
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self.table[text]
+
+
+EMBED_MODEL = TableEmbedding(table={
+    "Who knows Kubernetes?": [1.0, 0.0, 0.0],
+    "Kubernetes experts?": [0.98, 0.2, 0.0],
+    "Who knows Kafka?": [0.0, 1.0, 0.0],
+    "Who knows Go?": [0.0, 0.0, 1.0]
+})
+
+PUNE = MetadataFilters(filters=[MetadataFilter(key="location", value="Pune")])
+
+
+def test_1_paraphrase_hit_within_filters():
+    """Test Case 1: Paraphrases hit, other questions and other filters miss"""
+    print("=" * 70)
+    print("TEST 1: Paraphrase Hits")
+    print("=" * 70)
+    
+    cache = SemanticAnswerCache(EMBED_MODEL, threshold=0.92)
+    miss, embedding = cache.lookup("Who knows Kubernetes?", None, "v1")
+    cache.store(embedding, None, "v1", "Asha and Ravi.", ["Asha", "Ravi"])
+    
+    hit, _ = cache.lookup("Kubernetes experts?", None, "v1")
+    other_question, _ = cache.lookup("Who knows Kafka?", None, "v1")
+    other_filters, _ = cache.lookup("Kubernetes experts?", PUNE, "v1")
+    
+    print(f"✓ Hit: {hit}")
+    print(f"✓ Stats: {cache.stats()}")
+    
+    assert miss is None
+    assert hit["response"] == "Asha and Ravi." and hit["sources"] == ["Asha", "Ravi"]
+    assert hit["similarity"] >= 0.92
+    assert other_question is None and other_filters is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 3
+
+
+def test_2_ttl_lru_and_data_version():
+    """Test Case 2: Entries expire, are LRU-evicted and dropped on a new data version"""
+    print("\n" + "=" * 70)
+    print("TEST 2: TTL, LRU and Data Version Invalidation")
+    print("=" * 70)
+    
+    cache = SemanticAnswerCache(EMBED_MODEL, max_entries=2, ttl_seconds=0.2)
+    for question in ["Who knows Kubernetes?", "Who knows Kafka?"]:
+        _, embedding = cache.lookup(question, None, "v1")
+        cache.store(embedding, None, "v1", question.upper())
+        
+    assert cache.lookup("Who knows Kubernetes?", None, "v1")[0] is not None
+    _, embedding = cache.lookup("Who knows Go?", None, "v1")
+    cache.store(embedding, None, "v1", "GO")  # "Who knows Kafka?" is least recently used
+    after_lru = [entry["response"] for entry in cache.entries.values()]
+    
+    stale, _ = cache.lookup("Who knows Go?", None, "v2")
+    
+    cache.store(embedding, None, "v2", "GO")
+    time.sleep(0.3)
+    expired, _ = cache.lookup("Who knows Go?", None, "v2")
+    
+    print(f"✓ After LRU: {after_lru}")
+    print(f"✓ Stats: {cache.stats()}")
+    
+    assert after_lru == ["WHO KNOWS KUBERNETES?", "GO"]
+    assert stale is None and expired is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["entries"] == 0
+
+    # Storing under other filters purges expired answers of every bucket
+    cache.store(embedding, PUNE, "v2", "GO IN PUNE")
+    time.sleep(0.3)
+    cache.store(embedding, None, "v2", "GO")
+    assert [entry["response"] for entry in cache.entries.values()] == ["GO"]
+
+
+def test_3_self_contained_questions():
+    """Test Case 3: Follow-ups that refer to earlier turns are not cacheable"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Self-Contained Questions")
+    print("=" * 70)
+    
+    assert is_self_contained("Who knows Kafka in Pune?")
+    assert is_self_contained("Find a Node.js expert")
+    assert not is_self_contained("Which of them are in Pune?")
+    assert not is_self_contained("What else did she work on?")
+    
+    print("✓ Follow-up questions detected")
+
+
+def run_all_tests():
+    """Run all answer cache tests"""
+    test_1_paraphrase_hit_within_filters()
+    test_2_ttl_lru_and_data_version()
+    test_3_self_contained_questions()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
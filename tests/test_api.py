@@ -0,0 +1,236 @@
+"""
+HTTP API Tests
+Drives the async API against the fake Ollama server.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import json
+import time
+
+import httpx
+from llama_index.core import Settings
+
+from api import ExpertiseService, create_app
+from data_processing import load_profiles_from_json, convert_profiles_to_documents
+from facets import compute_facets
+from fake_ollama import FakeOllamaServer, fake_models
+from indexing import build_vector_index
+from lexical_index import LexicalIndex
+from models import create_async_client, share_async_client
+from query_router import ProfileDirectory, QueryRouter
+from singleflight import SingleFlight
+from config import DATA_PATH
+
+
+def build_service(server: FakeOllamaServer, coalescer: SingleFlight | None = None) -> ExpertiseService:
+    """Service over the sample profiles, with both models served by the fake Ollama"""
+    Settings.llm, Settings.embed_model = fake_models(server.url)
+    profiles = load_profiles_from_json(DATA_PATH)
+    index, _ = build_vector_index(convert_profiles_to_documents(profiles))
+    return ExpertiseService(
+        index,
+        LexicalIndex.from_profiles(profiles),
+        compute_facets(profiles),
+        QueryRouter(ProfileDirectory(profiles), max_results=25),
+        coalescer
+    )
+
+
+async def with_client(server: FakeOllamaServer, service: ExpertiseService, requests):
+    """Run requests(client) against the app, with the pooled Ollama client attached on this loop"""
+    ollama_client = create_async_client(server.url, max_connections=8)
+    share_async_client(Settings.llm, Settings.embed_model, ollama_client)
+    transport = httpx.ASGITransport(app=create_app(service))
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=30) as client:
+            return await requests(client)
+    finally:
+        await ollama_client.close()
+
+
+def test_1_facets_search_and_validation():
+    """Test Case 1: /facets, /search with filters, and 400 on bad input"""
+    print("=" * 70)
+    print("TEST 1: Facets, Search and Validation")
+    print("=" * 70)
+    
+    with FakeOllamaServer() as server:
+        service = build_service(server)
+        
+        async def requests(client):
+            facets = await client.get("/facets")
+            search = await client.post("/search", json={
+                "query": "EventBridge", "filters": {"location": ["Chennai"]}, "top_k": 5
+            })
+            bad = await client.post("/search", json={"query": "", "top_k": 5})
+            unknown = await client.post("/chat", json={"message": "hi", "filters": {"salary": [1]}})
+            sessions = [
+                await client.post("/chat", json={"message": "hi", "session_id": session_id})
+                for session_id in ({"id": 1}, ["a"], 7, "")
+            ]
+            return facets, search, bad, unknown, sessions
+            
+        facets, search, bad, unknown, sessions = asyncio.run(with_client(server, service, requests))
+        
+    results = search.json()["results"]
+    print(f"✓ Facets: {list(facets.json())}")
+    print(f"✓ Search: {[(r['name'], r['location']) for r in results]}")
+    
+    assert facets.status_code == 200 and "location" in facets.json()
+    assert search.status_code == 200 and 0 < len(results) <= 5
+    assert all(r["location"] == "Chennai" for r in results)
+    assert bad.status_code == 400 and "query" in bad.json()["error"]
+    assert unknown.status_code == 400
+    assert all(r.status_code == 400 and "session_id" in r.json()["error"] for r in sessions)
+
+
+def test_2_concurrent_chat_requests():
+    """Test Case 2: Chat requests of different sessions overlap instead of queueing"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Concurrent Chat Requests")
+    print("=" * 70)
+    
+    latency = 0.5
+    requests_count = 12
+    with FakeOllamaServer(first_token_latency=latency) as server:
+        service = build_service(server)
+        
+        async def requests(client):
+            return await asyncio.gather(*(
+                client.post("/chat", json={"message": f"Who has built data pipelines? ({i})", "session_id": f"s{i}"})
+                for i in range(requests_count)
+            ))
+            
+        start = time.perf_counter()
+        responses = asyncio.run(with_client(server, service, requests))
+        elapsed = time.perf_counter() - start
+        max_in_flight = server.max_in_flight
+        
+    print(f"✓ {requests_count} chats in {elapsed:.2f}s (serial would take {requests_count * latency:.1f}s)")
+    print(f"✓ Max concurrent Ollama requests: {max_in_flight}")
+    
+    assert all(r.status_code == 200 and r.json()["response"] for r in responses)
+    assert not any(r.json()["routed"] for r in responses)
+    assert 1 < max_in_flight <= 8
+
+
+def test_3_streaming_chat_keeps_session_memory():
+    """Test Case 3: Streaming /chat sends sources, token deltas and done; the session remembers turns"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Streaming Chat")
+    print("=" * 70)
+    
+    with FakeOllamaServer(answer_tokens=10) as server:
+        service = build_service(server)
+        
+        async def requests(client):
+            first = await client.post("/chat", json={"message": "Who worked on Expertise Finder?", "stream": True})
+            session_id = json.loads(first.text.splitlines()[0])["session_id"]
+            routed = await client.post("/chat", json={"message": "Who knows Python?", "session_id": session_id})
+            return first, routed, session_id
+            
+        first, routed, session_id = asyncio.run(with_client(server, service, requests))
+        
+    events = [json.loads(line) for line in first.text.splitlines()]
+    history = service.registry.get(session_id).chat_history
+    
+    print(f"✓ Events: {len(events)}, first: {events[0]}")
+    print(f"✓ Session history: {len(history)} messages")
+    
+    assert first.headers["content-type"].startswith("application/x-ndjson")
+    assert events[0]["sources"] and not events[0]["routed"]
+    assert len([e for e in events if e.get("delta")]) == 10
+    assert events[-1]["done"] and events[-1]["context"]["nodes_packed"] > 0
+    assert routed.json()["routed"]
+    assert len(history) == 4
+
+
+def test_4_identical_questions_coalesced():
+    """Test Case 4: Identical concurrent questions from different users cost one generation"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Coalesced Identical Questions")
+    print("=" * 70)
+    
+    with FakeOllamaServer(first_token_latency=0.3, answer_tokens=10) as server:
+        service = build_service(server, SingleFlight())
+        question = "Who has built data pipelines?"
+        
+        async def requests(client):
+            plain = [
+                client.post("/chat", json={"message": question, "session_id": f"user{i}"})
+                for i in range(6)
+            ]
+            streamed = [
+                client.post("/chat", json={"message": question.lower(), "session_id": f"stream{i}", "stream": True})
+                for i in range(2)
+            ]
+            return await asyncio.gather(*plain, *streamed)
+            
+        responses = asyncio.run(with_client(server, service, requests))
+        generations = server.generation_requests
+        
+    plain, streamed = responses[:6], responses[6:]
+    answers = {r.json()["response"] for r in plain}
+    streamed_answers = {
+        "".join(json.loads(line).get("delta", "") for line in r.text.splitlines()) for r in streamed
+    }
+    stats = service.stats()["coalescing"]
+    
+    print(f"✓ Ollama generations: {generations}, coalescing: {stats}")
+    
+    assert generations == 2  # one blocking, one streamed
+    assert len(answers) == 1 and len(streamed_answers) == 1
+    assert stats["executions"] == 2 and stats["shared"] == 6
+    for session_id in [f"user{i}" for i in range(6)] + ["stream0", "stream1"]:
+        assert len(service.registry.get(session_id).chat_history) == 2
+
+
+def test_5_shared_answers_ignore_session_history():
+    """Test Case 5: A self-contained follow-up is answered without the history; a real follow-up keeps it"""
+    print("\n" + "=" * 70)
+    print("TEST 5: Shared Answers Without Session History")
+    print("=" * 70)
+    
+    with FakeOllamaServer(answer_tokens=10) as server:
+        service = build_service(server, SingleFlight())
+        
+        async def requests(client):
+            for message in ["Who has built data pipelines?", "Who has experience with event-driven systems?", "Which of them led a migration?"]:
+                await client.post("/chat", json={"message": message, "session_id": "alice"})
+                
+        asyncio.run(with_client(server, service, requests))
+        
+    def mentions_first_question(messages):
+        return any("data pipelines" in message.get("content", "") for message in messages)
+        
+    first, self_contained, follow_up = server.chat_messages
+    print(f"✓ Messages sent per turn: {[len(m) for m in server.chat_messages]}")
+    
+    assert mentions_first_question(first)
+    assert not mentions_first_question(self_contained)
+    assert mentions_first_question(follow_up)
+    # The shared answer still entered alice's memory, so the follow-up sees it
+    assert any(m.get("content", "").startswith("Who has experience with event-driven systems?") for m in follow_up)
+    assert len(service.registry.get("alice").chat_history) == 6
+
+
+def run_all_tests():
+    """Run all HTTP API tests"""
+    test_1_facets_search_and_validation()
+    test_2_concurrent_chat_requests()
+    test_3_streaming_chat_keeps_session_memory()
+    test_4_identical_questions_coalesced()
+    test_5_shared_answers_ignore_session_history()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
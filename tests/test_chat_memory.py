@@ -0,0 +1,176 @@
+"""
+Chat Memory Tests
+Checks the rolling summarized chat memory against the fake Ollama server.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import time
+
+from llama_index.core.llms import ChatMessage, MessageRole
+from llama_index.core.memory import ChatMemoryBuffer
+
+from chat_memory import SummaryMemory, foreground_generation
+from fake_ollama import FakeOllamaServer, fake_models
+
+
+class CountingTokenizer:
+    """Whitespace tokenizer counting its calls"""
+    
+    def __init__(self):
+        self.calls = 0
+        
+    def __call__(self, text: str) -> list:
+        self.calls += 1
+        return text.split()
+
+
+def turn(memory, number: int):
+    """Store one exchange: a 30-word question and a 60-word answer"""
+    memory.put(ChatMessage(role=MessageRole.USER, content=" ".join([f"q{number}"] * 30)))
+    memory.put(ChatMessage(role=MessageRole.ASSISTANT, content=" ".join([f"a{number}"] * 60)))
+
+
+def history_tokens(messages) -> int:
+    return sum(len(str(message.content).split()) for message in messages)
+
+
+def test_1_prompt_size_stays_flat():
+    """Test Case 1: History tokens per turn stop growing once older turns are summarized"""
+    print("=" * 70)
+    print("TEST 1: Flat Prompt Size")
+    print("=" * 70)
+    
+    tokenizer = CountingTokenizer()
+    with FakeOllamaServer(answer_tokens=40) as server:
+        llm, _ = fake_models(server.url, request_timeout=10)
+        memory = SummaryMemory(llm=llm, tokenizer=tokenizer, recent_turns=3, token_limit=4000, summary_min_tokens=0)
+        buffer = ChatMemoryBuffer.from_defaults(token_limit=4000, tokenizer_fn=str.split)
+        summarized, buffered = [], []
+        for number in range(20):
+            turn(memory, number)
+            turn(buffer, number)
+            memory.flush(10)
+            summarized.append(history_tokens(memory.get("next question")))
+            buffered.append(history_tokens(buffer.get("next question")))
+            
+        calls_before = tokenizer.calls
+        history = memory.get("next question")
+        
+    print(f"✓ Summary memory tokens per turn: {summarized}")
+    print(f"✓ Plain buffer tokens per turn:   {buffered}")
+    print(f"✓ Stats: {memory.stats()}")
+    
+    assert max(summarized[4:]) - min(summarized[4:]) <= 10
+    assert summarized[-1] < buffered[-1] / 5
+    assert history[0].role == MessageRole.SYSTEM and "Summary" in history[0].content
+    assert [m.content.split()[0] for m in history[1:]] == ["q17", "a17", "q18", "a18", "q19", "a19"]
+    assert memory.stats()["summarized_messages"] == 34
+    
+    # One count per stored message and summary, none per get()
+    assert tokenizer.calls == calls_before == 40 + memory.stats()["summaries"]
+
+
+def test_2_summary_off_the_critical_path():
+    """Test Case 2: Storing a reply never waits for the LLM; pending turns stay verbatim meanwhile"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Background Summaries")
+    print("=" * 70)
+    
+    with FakeOllamaServer(first_token_latency=0.5, answer_tokens=10) as server:
+        llm, _ = fake_models(server.url, request_timeout=10)
+        memory = SummaryMemory(llm=llm, tokenizer=str.split, recent_turns=1, summary_min_tokens=0)
+        turn(memory, 0)
+        start = time.perf_counter()
+        turn(memory, 1)
+        put_seconds = time.perf_counter() - start
+        
+        while_summarizing = memory.get()
+        assert memory.flush(10)
+        after = memory.get()
+        requests = server.generation_requests
+        
+    print(f"✓ Reply stored in {put_seconds * 1000:.1f} ms while the summary took 0.5 s")
+    assert put_seconds < 0.25
+    assert [m.content.split()[0] for m in while_summarizing] == ["q0", "a0", "q1", "a1"]
+    assert after[0].role == MessageRole.SYSTEM and [m.content.split()[0] for m in after[1:]] == ["q1", "a1"]
+    assert requests == 1
+    print("✓ Pending turn sent verbatim until its summary arrived")
+
+
+def test_3_failures_and_limits():
+    """Test Case 3: Failed summaries keep turns verbatim within the token limit; reset drops late summaries"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Failures and Limits")
+    print("=" * 70)
+    
+    # Nothing listens on port 9
+    llm, _ = fake_models("http://127.0.0.1:9", request_timeout=10)
+    memory = SummaryMemory(llm=llm, tokenizer=str.split, recent_turns=1, token_limit=200, summary_min_tokens=0)
+    for number in range(5):
+        turn(memory, number)
+        memory.flush(10)
+    history = memory.get()
+    stats = memory.stats()
+    print(f"✓ After failed summaries: {stats}")
+    
+    assert stats["summary_failures"] >= 1 and stats["summaries"] == 0
+    assert history_tokens(history) <= 200 and history[0].role == MessageRole.USER
+    assert [m.content.split()[0] for m in history] == ["q3", "a3", "q4", "a4"]
+    
+    with FakeOllamaServer(first_token_latency=0.3) as server:
+        memory = SummaryMemory(llm=fake_models(server.url)[0], tokenizer=str.split, recent_turns=1, summary_min_tokens=0)
+        turn(memory, 0)
+        turn(memory, 1)
+        memory.reset()
+        turn(memory, 2)
+        assert memory.flush(10)
+    print(f"✓ Reset while summarizing: {memory.stats()}")
+    assert memory.get_all()[0].content.split()[0] == "q2" and memory.stats()["summaries"] == 0
+
+
+def test_4_threshold_and_priority():
+    """Test Case 4: No summary until enough tokens are pending, and none while a user answer is generated"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Summary Threshold and Priority")
+    print("=" * 70)
+    
+    with FakeOllamaServer(answer_tokens=10) as server:
+        memory = SummaryMemory(llm=fake_models(server.url)[0], tokenizer=str.split, recent_turns=1, summary_min_tokens=200)
+        for number in range(3):
+            turn(memory, number)
+            memory.flush(10)
+        below_threshold = server.generation_requests
+        
+        with foreground_generation():
+            turn(memory, 3)
+            finished_while_generating = memory.flush(0.3)
+            during = server.generation_requests
+        assert memory.flush(10)
+        after = server.generation_requests
+        
+    print(f"✓ Requests below 200 pending tokens: {below_threshold}; while generating: {during}; after: {after}")
+    print(f"✓ Stats: {memory.stats()}")
+    
+    assert below_threshold == 0 and memory.stats()["summarized_messages"] == 6
+    assert not finished_while_generating and during == 0 and after == 1
+    assert memory.stats()["summary_deferrals"] == 1
+
+
+def run_all_tests():
+    """Run all chat memory tests"""
+    test_1_prompt_size_stays_flat()
+    test_2_summary_off_the_critical_path()
+    test_3_failures_and_limits()
+    test_4_threshold_and_priority()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,101 @@
+"""
+Context Packer Tests
+Checks project de-duplication and the context token budget.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llama_index.core import Settings
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.llms import MockLLM
+from llama_index.core.schema import NodeWithScore
+
+from data_processing import load_profiles_from_json, convert_profiles_to_documents, merge_duplicate_projects
+from indexing import build_vector_index
+from context_packer import ContextPacker
+from chat_engine import create_chat_engine, context_packing_stats
+from config import DATA_PATH
+
+
+def test_1_duplicate_projects_merged():
+    """Test Case 1: Repeated projects collapse into one entry without losing details"""
+    print("=" * 70)
+    print("TEST 1: Duplicate Project Merging")
+    print("=" * 70)
+    
+    profiles = load_profiles_from_json(DATA_PATH)
+    raw = profiles[0]["projects"]
+    merged = merge_duplicate_projects(raw)
+    
+    print(f"✓ {len(raw)} project entries -> {len(merged)}")
+    print(f"✓ Merged description: {merged[0]['desc']}")
+    
+    assert [p["name"] for p in merged] == list(dict.fromkeys(p["name"] for p in raw))
+    for proj in raw:
+        focus = proj["desc"].rsplit("Focus: ", 1)[1].rstrip(".")
+        merged_proj = next(p for p in merged if p["name"] == proj["name"])
+        assert focus in merged_proj["desc"]
+        assert set(proj["stack"]) <= set(merged_proj["stack"])
+    assert merged[0]["desc"].count("Implemented internal expertise search") == 1
+
+
+def test_2_token_budget_and_dedup():
+    """Test Case 2: Packed context stays within budget, one node per profile"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Token Budget")
+    print("=" * 70)
+    
+    documents = convert_profiles_to_documents(load_profiles_from_json(DATA_PATH))
+    nodes = [NodeWithScore(node=doc, score=1.0) for doc in documents[:10]]
+    nodes.insert(1, NodeWithScore(node=documents[0], score=0.9))  # same profile retrieved twice
+    
+    packer = ContextPacker(token_budget=1000)
+    packed = packer.postprocess_nodes(nodes)
+    last = packer.last_stats
+    
+    print(f"✓ Last query: {last}")
+    print(f"✓ Totals: {packer.stats()}")
+    
+    ids = [n.node.node_id for n in packed]
+    assert len(ids) == len(set(ids))
+    assert ids[0] == documents[0].node_id
+    assert 0 < last["tokens_packed"] <= 1000
+    assert last["nodes_retrieved"] == 11 and last["nodes_packed"] < 10
+    assert last["tokens_saved"] == last["tokens_retrieved"] - last["tokens_packed"] > 0
+
+
+def test_3_chat_engine_packs_context():
+    """Test Case 3: Chat engines pack retrieved profiles before calling the LLM"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Chat Engine Integration")
+    print("=" * 70)
+    
+    Settings.embed_model = MockEmbedding(embed_dim=8)
+    Settings.llm = MockLLM(max_tokens=20)
+    index, _ = build_vector_index(convert_profiles_to_documents(load_profiles_from_json(DATA_PATH)))
+    chat_engine = create_chat_engine(index)
+    
+    response = chat_engine.chat("Who knows Kafka?")
+    packing = context_packing_stats(chat_engine)
+    
+    print(f"✓ Packing: {packing}")
+    
+    assert packing["nodes_packed"] == len(response.source_nodes) > 0
+    assert packing["tokens_packed"] <= ContextPacker().token_budget
+
+
+def run_all_tests():
+    """Run all context packer tests"""
+    test_1_duplicate_projects_merged()
+    test_2_token_budget_and_dedup()
+    test_3_chat_engine_packs_context()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
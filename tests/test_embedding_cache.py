@@ -0,0 +1,189 @@
+"""
+Embedding Cache Tests
+Checks the shared SQLite embedding cache in front of the Ollama embedding model.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import multiprocessing
+import tempfile
+import threading
+
+from embedding_cache import CachedEmbedding, EmbeddingCache
+from fake_ollama import FakeOllamaServer, fake_models
+
+
+def _read_in_child(path: str, texts: list, queue):
+    """Read the cache from a separate process"""
+    cache = EmbeddingCache(path)
+    queue.put([e is not None for e in cache.get_many("m#text", texts)])
+
+
+def test_1_cache_hits_skip_model():
+    """Test Case 1: Repeated texts and queries are served from the cache"""
+    print("=" * 70)
+    print("TEST 1: Cache Hits Skip the Embedding Server")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as tmp, FakeOllamaServer(dim=16) as server:
+        cache = EmbeddingCache(os.path.join(tmp, "embeddings.sqlite"))
+        embed_model = CachedEmbedding(fake_models(server.url)[1], cache)
+        
+        texts = ["Python expert", "Kafka and EventBridge", "Python expert"]
+        first = embed_model.get_text_embedding_batch(texts)
+        requests_after_first = server.embed_requests
+        second = embed_model.get_text_embedding_batch(texts)
+        
+        embed_model.get_query_embedding("who knows Kafka?")
+        embed_model.get_query_embedding("who knows Kafka?")
+        
+        print(f"✓ Server requests: {server.embed_requests}")
+        print(f"✓ Cache stats: {cache.stats()}")
+        
+        assert [round(v, 5) for v in first[0]] == [round(v, 5) for v in second[0]]
+        assert server.embed_requests == requests_after_first + 1
+        assert cache.stats()["hits"] == 4
+        assert cache.stats()["misses"] == 4
+
+
+def test_2_lru_eviction():
+    """Test Case 2: Least recently used entries are evicted beyond max_entries"""
+    print("\n" + "=" * 70)
+    print("TEST 2: LRU Eviction")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(os.path.join(tmp, "embeddings.sqlite"), max_entries=2, touch_interval=0, evict_slack=0)
+        cache.put_many("m#text", ["a"], [[1.0]])
+        cache.put_many("m#text", ["b"], [[2.0]])
+        cache.get_many("m#text", ["a"])  # "a" is now more recent than "b"
+        cache.put_many("m#text", ["c"], [[3.0]])
+        
+        present = [e is not None for e in cache.get_many("m#text", ["a", "b", "c"])]
+        print(f"✓ Present (a, b, c): {present}")
+        print(f"✓ Evictions: {cache.stats()['evictions']}")
+        
+        assert present == [True, False, True]
+
+
+def test_3_shared_across_processes():
+    """Test Case 3: Another process reads entries written by this one"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Shared Across Processes")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.sqlite")
+        EmbeddingCache(path).put_many("m#text", ["x", "y"], [[0.5, 0.5], [0.1, 0.9]])
+        
+        queue = multiprocessing.Queue()
+        child = multiprocessing.Process(target=_read_in_child, args=(path, ["x", "y", "z"], queue))
+        child.start()
+        found = queue.get(timeout=30)
+        child.join()
+        
+        print(f"✓ Child process lookups (x, y, z): {found}")
+        
+        assert found == [True, True, False]
+
+
+def test_4_reads_rarely_write():
+    """Test Case 4: Fresh hits write nothing, and the table is only counted once"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Write-free Reads and Periodic Eviction")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = EmbeddingCache(os.path.join(tmp, "embeddings.sqlite"), max_entries=10, evict_slack=0.5)
+        statements = []
+        conn = cache._connection()
+        conn.set_trace_callback(statements.append)
+        
+        for i in range(10):
+            cache.put_many("m#text", [f"t{i}"], [[float(i)]])
+        changes, writes = conn.total_changes, len(statements)
+        assert all(e is not None for e in cache.get_many("m#text", [f"t{i}" for i in range(10)]))
+        print(f"✓ Rows changed by 10 fresh hits: {conn.total_changes - changes}")
+        assert conn.total_changes == changes
+        assert not any(s.startswith("UPDATE") for s in statements[writes:])
+        
+        cache.put_many("m#text", ["t10"], [[10.0]])
+        counts = sum("COUNT(*)" in s for s in statements)
+        entries = conn.execute("SELECT value FROM cache_meta WHERE key = 'entries'").fetchone()[0]
+        present = sum(e is not None for e in cache.get_many("m#text", [f"t{i}" for i in range(11)]))
+        print(f"✓ COUNT(*) queries for 11 writes: {counts}, rows left after eviction: {present}")
+        
+        # Once when first written; afterwards the stored count is updated with every write
+        assert counts == 1
+        assert present == entries == 5 and cache.stats()["evictions"] == 6
+
+
+def test_5_limit_holds_with_several_writers():
+    """Test Case 5: Writers sharing one file keep the table within max_entries together"""
+    print("\n" + "=" * 70)
+    print("TEST 5: Several Writers")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "embeddings.sqlite")
+        writers = [EmbeddingCache(path, max_entries=10, evict_slack=0) for _ in range(3)]
+        sizes = []
+        for i in range(30):
+            writers[i % 3].put_many("m#text", [f"t{i}", f"t{i // 2}"], [[float(i)], [0.0]])
+            sizes.append(writers[0]._connection().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0])
+            
+        print(f"✓ Rows after each write: {sizes}")
+        assert max(sizes) == sizes[-1] == 10
+
+
+async def _cached_lookups(embed_model, texts):
+    """Embed texts twice from the event loop, noting the threads the cache ran on"""
+    threads = []
+    get_many = embed_model.cache.get_many
+    
+    def traced(*args):
+        threads.append(threading.current_thread())
+        return get_many(*args)
+        
+    embed_model.cache.get_many = traced
+    first = await embed_model.aget_text_embedding_batch(texts)
+    second = await embed_model.aget_text_embedding_batch(texts)
+    return first, second, threads
+
+
+def test_6_async_lookups_off_the_event_loop():
+    """Test Case 6: The async path reads and writes SQLite on worker threads"""
+    print("\n" + "=" * 70)
+    print("TEST 6: Async Lookups Off the Event Loop")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as tmp, FakeOllamaServer(dim=8) as server:
+        embed_model = CachedEmbedding(fake_models(server.url)[1], EmbeddingCache(os.path.join(tmp, "embeddings.sqlite")))
+        first, second, threads = asyncio.run(_cached_lookups(embed_model, ["a", "b"]))
+        
+    print(f"✓ Lookup threads: {[thread.name for thread in threads]}")
+    assert [round(v, 5) for v in first[0]] == [round(v, 5) for v in second[0]]
+    assert server.embed_requests == 1
+    assert threads and threading.main_thread() not in threads
+
+
+def run_all_tests():
+    """Run all embedding cache tests"""
+    test_1_cache_hits_skip_model()
+    test_2_lru_eviction()
+    test_3_shared_across_processes()
+    test_4_reads_rarely_write()
+    test_5_limit_holds_with_several_writers()
+    test_6_async_lookups_off_the_event_loop()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
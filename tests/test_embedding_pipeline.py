@@ -0,0 +1,141 @@
+"""
+Embedding Pipeline Tests
+Runs the batched, concurrent embedding pipeline against a local fake Ollama server.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import threading
+
+from data_processing import load_profiles_from_json, convert_profiles_to_documents
+from embedding_pipeline import documents_to_nodes, embed_nodes
+from config import DATA_PATH
+from fake_ollama import FakeOllamaServer, fake_models
+
+
+def build_nodes():
+    """Load the sample profiles and split them into nodes"""
+    profiles = load_profiles_from_json(DATA_PATH)
+    return documents_to_nodes(convert_profiles_to_documents(profiles))
+
+
+def test_1_batches_and_concurrency():
+    """Test Case 1: All nodes embedded in batches, within the concurrency bound"""
+    print("=" * 70)
+    print("TEST 1: Batched, Concurrent Embedding")
+    print("=" * 70)
+    
+    nodes = build_nodes()
+    
+    with FakeOllamaServer(embed_latency=0.05, dim=32) as server:
+        _, embed_model = fake_models(server.url, embed_batch_size=4)
+        report = embed_nodes(nodes, embed_model=embed_model, batch_size=4, max_concurrency=3)
+        
+    print(f"✓ Report: {report}")
+    print(f"✓ Requests: {server.embed_requests}, peak in flight: {server.max_in_flight}")
+    
+    assert all(node.embedding is not None and len(node.embedding) == 32 for node in nodes)
+    assert report["documents"] == len(nodes)
+    assert report["batches"] == server.embed_requests == -(-len(nodes) // 4)
+    assert 1 < server.max_in_flight <= 3
+
+
+def test_2_concurrency_overlaps_requests():
+    """Test Case 2: Concurrency overlaps requests; concurrency 1 sends them one at a time"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Requests in Flight vs Concurrency")
+    print("=" * 70)
+    
+    peaks = {}
+    for concurrency in (1, 4):
+        nodes = build_nodes()
+        with FakeOllamaServer(embed_latency=0.05, dim=16) as server:
+            _, embed_model = fake_models(server.url, embed_batch_size=2)
+            report = embed_nodes(nodes, embed_model=embed_model, batch_size=2, max_concurrency=concurrency)
+        peaks[concurrency] = server.max_in_flight
+        print(f"✓ Concurrency {concurrency}: {server.embed_requests} requests, peak in flight {server.max_in_flight}")
+        
+        assert report["batches"] == server.embed_requests == -(-len(nodes) // 2)
+        assert server.embedded_texts == len(nodes)
+        
+    assert peaks[1] == 1
+    assert 2 <= peaks[4] <= 4
+
+
+def test_3_retry_with_backoff():
+    """Test Case 3: Transient server errors are retried"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Retry With Backoff")
+    print("=" * 70)
+    
+    nodes = build_nodes()
+    progress = []
+    
+    with FakeOllamaServer(dim=8, fail_every=3) as server:
+        _, embed_model = fake_models(server.url, embed_batch_size=5)
+        report = embed_nodes(
+            nodes,
+            embed_model=embed_model,
+            batch_size=5,
+            max_concurrency=2,
+            backoff=0.01,
+            progress_callback=lambda done, rate: progress.append(done)
+        )
+        
+    print(f"✓ Retries: {report['retries']}")
+    print(f"✓ Progress updates: {progress}")
+    
+    assert report["retries"] > 0
+    assert all(node.embedding is not None for node in nodes)
+    assert progress[-1] == len(nodes)
+
+
+def test_4_slow_input_keeps_requests_moving():
+    """Test Case 4: A producer waiting for more input does not stall the requests in flight"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Slow Input Off the Event Loop")
+    print("=" * 70)
+    
+    nodes = build_nodes()
+    first_batch_done = threading.Event()
+    waited = []
+    
+    def slow_input():
+        # Like a process pool still building documents: the next batch is
+        # only ready once the first one has come back from the model
+        yield from nodes[:2]
+        waited.append(first_batch_done.wait(timeout=5))
+        yield from nodes[2:]
+        
+    with FakeOllamaServer(embed_latency=0.05, dim=8) as server:
+        _, embed_model = fake_models(server.url, embed_batch_size=2)
+        report = embed_nodes(
+            slow_input(),
+            embed_model=embed_model,
+            batch_size=2,
+            max_concurrency=2,
+            progress_callback=lambda done, rate: first_batch_done.set()
+        )
+        
+    print(f"✓ First batch finished while the input was waiting: {waited}")
+    assert waited == [True]
+    assert report["documents"] == len(nodes)
+
+
+def run_all_tests():
+    """Run all embedding pipeline tests"""
+    test_1_batches_and_concurrency()
+    test_2_concurrency_overlaps_requests()
+    test_3_retry_with_backoff()
+    test_4_slow_input_keeps_requests_moving()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,79 @@
+"""
+Facet Catalog Tests
+Checks the precomputed facet catalog against the indexed document metadata.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+from collections import Counter
+
+from data_processing import load_profiles_from_json, convert_profiles_to_documents
+from facets import compute_facets, experience_bucket, format_facet_value, load_facets, save_facets
+from config import DATA_PATH
+
+
+def test_1_counts_match_documents():
+    """Test Case 1: Location/team facets match the document metadata used by filters"""
+    print("=" * 70)
+    print("TEST 1: Facet Counts Match Document Metadata")
+    print("=" * 70)
+    
+    profiles = load_profiles_from_json(DATA_PATH)
+    documents = convert_profiles_to_documents(profiles)
+    catalog = compute_facets(profiles)
+    
+    print(f"✓ Locations: {catalog['location']}")
+    print(f"✓ Experience: {catalog['experience']}")
+    print(f"✓ Distinct skills: {len(catalog['skills'])}")
+    
+    for key in ("location", "team"):
+        assert catalog[key] == dict(sorted(Counter(d.metadata[key] for d in documents).items()))
+    assert sum(catalog["experience"].values()) == len(profiles)
+    assert set(catalog) == {"location", "team", "title", "skills", "experience"}
+
+
+def test_2_buckets_and_labels():
+    """Test Case 2: Experience buckets and display labels"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Experience Buckets and Labels")
+    print("=" * 70)
+    
+    buckets = [experience_bucket(y) for y in (0, 3, 4, 6, 7, 25, None)]
+    print(f"✓ Buckets: {buckets}")
+    
+    assert buckets == ["0-3 years", "0-3 years", "4-6 years", "4-6 years", "7+ years", "7+ years", "0-3 years"]
+    assert format_facet_value({"location": {"Bangalore": 42}}, "location", "Bangalore") == "Bangalore (42)"
+    assert format_facet_value({}, "location", "Pune") == "Pune"
+
+
+def test_3_round_trip():
+    """Test Case 3: Catalog survives a save/load round trip"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Save and Load")
+    print("=" * 70)
+    
+    catalog = compute_facets(load_profiles_from_json(DATA_PATH))
+    with tempfile.TemporaryDirectory() as tmp:
+        assert load_facets(tmp) is None
+        save_facets(catalog, tmp)
+        assert load_facets(tmp) == catalog
+        
+    print("✓ Round trip OK")
+
+
+def run_all_tests():
+    """Run all facet catalog tests"""
+    test_1_counts_match_documents()
+    test_2_buckets_and_labels()
+    test_3_round_trip()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
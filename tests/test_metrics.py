@@ -0,0 +1,170 @@
+"""
+Metrics Tests
+Checks stage histograms, the Prometheus export and the instrumented query path.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import time
+
+import httpx
+from llama_index.core import Settings
+from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
+
+import metrics
+from api import ExpertiseService, create_app
+from chat_engine import create_chat_engine
+from data_processing import load_profiles_from_json, convert_profiles_to_documents
+from facets import compute_facets
+from fake_ollama import FakeOllamaServer, fake_models
+from indexing import build_vector_index
+from lexical_index import LexicalIndex
+from metrics import MetricsRegistry
+from config import DATA_PATH
+
+
+def test_1_histograms_and_prometheus_text():
+    """Test Case 1: Spans land in cumulative buckets; nested spans of one stage count once"""
+    print("=" * 70)
+    print("TEST 1: Histograms and Prometheus Text")
+    print("=" * 70)
+    
+    registry = MetricsRegistry(enabled=True, buckets=(0.01, 0.1, 1.0))
+    for seconds in (0.005, 0.05, 0.05, 0.5):
+        registry.observe("retrieve", seconds)
+    with registry.span("embed"):
+        with registry.span("embed"):
+            time.sleep(0.02)
+    registry.inc("llm_tokens_total", 120, direction="in")
+    registry.inc("llm_tokens_total", 30, direction="out")
+    
+    text = registry.render_prometheus({"answer_cache": {"hits": 3, "hit_rate": 0.5, "label": "x"}, "router": None})
+    snapshot = registry.snapshot()
+    print(text)
+    print(f"✓ Snapshot: {snapshot}")
+    
+    assert 'expertise_stage_seconds_bucket{stage="retrieve",le="0.01"} 1' in text
+    assert 'expertise_stage_seconds_bucket{stage="retrieve",le="0.1"} 3' in text
+    assert 'expertise_stage_seconds_bucket{stage="retrieve",le="+Inf"} 4' in text
+    assert 'expertise_stage_seconds_count{stage="embed"} 1' in text
+    assert 'expertise_llm_tokens_total{direction="in"} 120' in text
+    assert "expertise_answer_cache_hits 3" in text and "label" not in text
+    assert 10 < snapshot["stages"]["retrieve"]["p50_ms"] <= 100
+    
+    disabled = MetricsRegistry(enabled=False)
+    with disabled.span("retrieve"):
+        pass
+    disabled.inc("llm_requests_total")
+    assert disabled.span("retrieve") is disabled.span("embed")  # one shared no-op
+    assert disabled.snapshot() == {"stages": {}, "counters": {}}
+
+
+def test_2_query_path_stages():
+    """Test Case 2: A filtered streaming chat turn records every query stage and token counts"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Query Path Stages")
+    print("=" * 70)
+    
+    with FakeOllamaServer(first_token_latency=0.05, token_latency=0.005, answer_tokens=8) as server:
+        Settings.llm, Settings.embed_model = fake_models(server.url)
+        metrics.install_llm_metrics()
+        profiles = load_profiles_from_json(DATA_PATH)
+        index, _ = build_vector_index(convert_profiles_to_documents(profiles))
+        
+        metrics.registry.reset()
+        filters = MetadataFilters(filters=[MetadataFilter(key="location", value="Chennai")])
+        chat_engine = create_chat_engine(index, filters=filters, lexical_index=LexicalIndex.from_profiles(profiles))
+        answer = "".join(chat_engine.stream_chat("Who knows Kafka?").response_gen)
+        snapshot = metrics.registry.snapshot()
+        
+        # Without the lexical index the plain vector retriever is used
+        metrics.registry.reset()
+        create_chat_engine(index, filters=filters).chat("Who knows Kafka?")
+        vector_only = metrics.registry.snapshot()["stages"]
+        
+    for stage, values in snapshot["stages"].items():
+        print(f"✓ {stage:>15}: {values}")
+    print(f"✓ Counters: {snapshot['counters']}")
+    
+    stages = snapshot["stages"]
+    assert answer
+    assert {"query_embed", "retrieve", "filter", "context_pack", "llm_prefill", "llm_generation"} <= set(stages)
+    assert stages["retrieve"]["count"] == 1  # hybrid retriever nested in the adaptive one
+    assert stages["llm_prefill"]["p50_ms"] >= 25
+    assert snapshot["counters"]['llm_tokens_total{direction="out"}'] == 8
+    assert snapshot["counters"]['llm_tokens_total{direction="in"}'] > 0
+    assert vector_only["query_embed"]["count"] == vector_only["retrieve"]["count"] == 1
+
+
+def test_3_metrics_endpoint():
+    """Test Case 3: GET /metrics serves the Prometheus text including service counters"""
+    print("\n" + "=" * 70)
+    print("TEST 3: /metrics Endpoint")
+    print("=" * 70)
+    
+    with FakeOllamaServer() as server:
+        Settings.llm, Settings.embed_model = fake_models(server.url)
+        profiles = load_profiles_from_json(DATA_PATH)
+        index, _ = build_vector_index(convert_profiles_to_documents(profiles))
+        service = ExpertiseService(index, LexicalIndex.from_profiles(profiles), compute_facets(profiles))
+        
+        async def requests():
+            transport = httpx.ASGITransport(app=create_app(service))
+            async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=30) as client:
+                await client.post("/search", json={"query": "Kafka", "top_k": 3})
+                return await client.get("/metrics")
+                
+        response = asyncio.run(requests())
+        
+    print(response.text[:400])
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'expertise_stage_seconds_count{stage="retrieve"}' in response.text
+    assert "expertise_sessions_" in response.text
+
+
+def test_4_abandoned_llm_calls_are_forgotten():
+    """Test Case 4: Calls without an end event do not pile up in the LLM handler"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Abandoned LLM Calls")
+    print("=" * 70)
+    
+    from llama_index.core.instrumentation.events.llm import LLMChatStartEvent
+    from llm_metrics import LLMMetricsHandler
+    
+    def start(handler, span_id):
+        handler.handle(LLMChatStartEvent(messages=[], additional_kwargs={}, model_dict={}, span_id=span_id))
+        
+    metrics.registry.reset()
+    handler = LLMMetricsHandler(max_age=0.05, max_calls=3)
+    for i in range(5):
+        start(handler, f"capped{i}")
+    capped = list(handler._calls)
+    time.sleep(0.1)
+    start(handler, "fresh")
+    
+    print(f"✓ Open calls: {capped} then {list(handler._calls)}")
+    assert capped == ["capped2", "capped3", "capped4"]
+    assert list(handler._calls) == ["fresh"]
+    assert metrics.registry.snapshot()["counters"]["llm_abandoned_total"] == 5
+
+
+def run_all_tests():
+    """Run all metrics tests"""
+    test_1_histograms_and_prometheus_text()
+    test_2_query_path_stages()
+    test_3_metrics_endpoint()
+    test_4_abandoned_llm_calls_are_forgotten()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
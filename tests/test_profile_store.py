@@ -0,0 +1,139 @@
+"""
+Profile Store Tests
+Checks that the columnar store round-trips profiles and serves documents, facets and filters.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gc
+import tempfile
+import tracemalloc
+
+from llama_index.core.vector_stores import FilterCondition, FilterOperator, MetadataFilter, MetadataFilters
+
+from data_processing import load_profiles_from_json, convert_profiles_to_documents
+from facets import compute_facets
+from profile_store import ProfileStore
+from synthetic_profiles import ProfileDistribution, generate_profiles, write_profiles
+from config import DATA_PATH
+
+# Off-schema values and missing fields must survive the round trip
+ODD_PROFILES = [
+    {"name": "No Id", "experience_years": 2.5, "skills": ["Go", "Go"], "projects": [{"name": "P", "owner": "x"}]},
+    {"id": "t1", "email": 42, "team": "Data", "projects": [{"desc": "Only a description."}], "tags": ["a"]},
+    {}
+]
+
+
+def test_1_round_trip_and_documents():
+    """Test Case 1: Profiles come back unchanged; documents match the dict path exactly"""
+    print("=" * 70)
+    print("TEST 1: Round Trip and Lazy Documents")
+    print("=" * 70)
+    
+    profiles = load_profiles_from_json(DATA_PATH) + ODD_PROFILES
+    store = ProfileStore.from_profiles(profiles)
+    documents = convert_profiles_to_documents(profiles)
+    
+    print(f"✓ {len(store)} profiles stored")
+    
+    assert list(store) == profiles
+    assert store.get(0, "skills") == profiles[0]["skills"]
+    assert store.get(len(profiles) - 1, "team", "General") == "General"
+    for row, doc in enumerate(documents):
+        lazy = store.document(row)
+        assert (lazy.text, lazy.metadata) == (doc.text, doc.metadata)
+        assert lazy.id_ == doc.id_ or not (profiles[row].get("id") or profiles[row].get("email"))
+    print("✓ Document text and metadata identical for every profile")
+
+
+def test_2_facets_and_filters():
+    """Test Case 2: Facets and filtered rows match the dict-based computations"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Facets and Filters")
+    print("=" * 70)
+    
+    profiles = load_profiles_from_json(DATA_PATH) + ODD_PROFILES
+    store = ProfileStore.from_profiles(profiles)
+    
+    assert compute_facets(store) == compute_facets(profiles)
+    print("✓ Facet catalog identical")
+    
+    location, team = profiles[0]["location"], profiles[1]["team"]
+    cases = {
+        "eq": MetadataFilters(filters=[MetadataFilter(key="location", value=location)]),
+        "in + eq": MetadataFilters(filters=[
+            MetadataFilter(key="location", value=[location, "Remote"], operator=FilterOperator.IN),
+            MetadataFilter(key="team", value=team)
+        ]),
+        "or": MetadataFilters(
+            filters=[MetadataFilter(key="team", value=team), MetadataFilter(key="title", value="N/A")],
+            condition=FilterCondition.OR
+        ),
+        "fallback": MetadataFilters(filters=[MetadataFilter(key="team", value=team, operator=FilterOperator.NE)])
+    }
+    defaults = {"title": "N/A", "team": "General", "location": "Remote"}
+    
+    def matches(profile, metadata_filter):
+        value = profile.get(metadata_filter.key, defaults[metadata_filter.key])
+        if metadata_filter.operator == FilterOperator.IN:
+            return value in metadata_filter.value
+        if metadata_filter.operator == FilterOperator.NE:
+            return value != metadata_filter.value
+        return value == metadata_filter.value
+        
+    for name, filters in cases.items():
+        combine = any if filters.condition == FilterCondition.OR else all
+        expected = [row for row, p in enumerate(profiles) if combine(matches(p, f) for f in filters.filters)]
+        assert store.rows_matching(filters) == expected, name
+        assert store.rows_matching(filters, rows={0, 1, 2}) == [row for row in expected if row < 3], name
+        print(f"✓ {name}: {len(expected)} rows")
+    assert store.rows_matching(None, rows=[3, 1]) == [1, 3]
+
+
+def test_3_memory_per_profile():
+    """Test Case 3: The store takes a fraction of the memory of the profile dicts"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Memory per Profile")
+    print("=" * 70)
+    
+    distribution = ProfileDistribution(load_profiles_from_json(DATA_PATH))
+    
+    def traced(build):
+        gc.collect()
+        tracemalloc.start()
+        built = build()
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return built, size
+        
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.jsonl")
+        count = write_profiles(path, generate_profiles(5000, seed=2, distribution=distribution))
+        profiles, dict_bytes = traced(lambda: load_profiles_from_json(path))
+        store, store_bytes = traced(lambda: ProfileStore.from_file(path))
+        
+    print(f"✓ Dicts: {dict_bytes / count:.0f} B/profile, store: {store_bytes / count:.0f} B/profile")
+    print(f"✓ Store breakdown: {store.memory_usage()}")
+    
+    assert store_bytes < dict_bytes / 4
+    assert list(store) == profiles
+    # Every field of a generated profile, bio included, has a typed column
+    assert store.memory_usage()["extras"] == 0
+
+
+def run_all_tests():
+    """Run all profile store tests"""
+    test_1_round_trip_and_documents()
+    test_2_facets_and_filters()
+    test_3_memory_per_profile()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
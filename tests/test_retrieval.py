@@ -0,0 +1,201 @@
+"""
+Hybrid Retrieval Tests
+Checks the BM25 lexical index, its fusion with vector search and adaptive top-k.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llama_index.core import Settings
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
+
+from data_processing import load_profiles_from_json, convert_profiles_to_documents
+from indexing import build_vector_index
+from lexical_index import LexicalIndex, tokenize
+from retrieval import AdaptiveRetriever, HybridRetriever, choose_top_k, is_more_request, reciprocal_rank_fusion
+from config import DATA_PATH
+
+
+class KeywordEmbedding(BaseEmbedding):
+    """Embeds texts mentioning the keyword far apart from all others"""
+    
+    keyword: str
+    
+    def _vector(self, text: str) -> list:
+        return [1.0, 0.0] if self.keyword in text.lower() else [0.3, 1.0]
+        
+    def _get_query_embedding(self, query: str) -> list:
+        return self._vector(query)
+        
+    async def _aget_query_embedding(self, query: str) -> list:
+        return self._vector(query)
+        
+    def _get_text_embedding(self, text: str) -> list:
+        return self._vector(text)
+
+
+def profiles_mentioning(profiles, term):
+    """Ids of profiles whose skills, domains or projects mention a term"""
+    fields = ("skills", "domains", "projects")
+    return {p["id"] for p in profiles if any(term.lower() in str(p.get(f, "")).lower() for f in fields)}
+
+
+def test_1_tokenize_tech_names():
+    """Test Case 1: Tech names survive tokenization as single terms"""
+    print("=" * 70)
+    print("TEST 1: Tokenize Tech Names")
+    print("=" * 70)
+    
+    tokens = tokenize("Who knows Node.js, CI/CD and C++?")
+    print(f"✓ Tokens: {tokens}")
+    
+    assert tokens == ["node.js", "ci/cd", "c++"]
+
+
+def test_2_exact_terms_from_lexical_index():
+    """Test Case 2: Exact skill/stack names resolve to every profile that has them"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Exact Terms From the Lexical Index")
+    print("=" * 70)
+    
+    profiles = load_profiles_from_json(DATA_PATH)
+    lexical_index = LexicalIndex.from_profiles(profiles)
+    
+    for term in ("EventBridge", "MikroORM"):
+        found = {doc_id for doc_id, _ in lexical_index.search(f"Who knows {term}?", top_k=len(profiles))}
+        print(f"✓ {term}: {sorted(found)}")
+        assert found == profiles_mentioning(profiles, term)
+        
+    assert lexical_index.search("quantum annealing") == []
+
+
+def test_3_hybrid_retriever_fuses_and_filters():
+    """Test Case 3: Lexical matches are fused to the top and respect metadata filters"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Hybrid Retrieval With Filters")
+    print("=" * 70)
+    
+    Settings.embed_model = MockEmbedding(embed_dim=8)
+    profiles = load_profiles_from_json(DATA_PATH)
+    index, _ = build_vector_index(convert_profiles_to_documents(profiles))
+    lexical_index = LexicalIndex.from_profiles(profiles)
+    
+    filters = MetadataFilters(filters=[MetadataFilter(key="location", value="Chennai")])
+    retriever = HybridRetriever(index, lexical_index, filters=filters, similarity_top_k=5)
+    results = retriever.retrieve("EventBridge")
+    
+    chennai = {p["id"] for p in profiles if p["location"] == "Chennai"}
+    expected = profiles_mentioning(profiles, "EventBridge") & chennai
+    top = [r.node.ref_doc_id for r in results[:len(expected)]]
+    print(f"✓ Expected: {sorted(expected)}, top results: {top}")
+    
+    assert all(r.node.metadata["location"] == "Chennai" for r in results)
+    assert set(top) == expected
+
+
+def test_4_reciprocal_rank_fusion():
+    """Test Case 4: Items ranked by both lists beat items ranked by one"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Reciprocal Rank Fusion")
+    print("=" * 70)
+    
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d"]], k=60)
+    ranked = sorted(fused, key=fused.get, reverse=True)
+    print(f"✓ Fused order: {ranked}")
+    
+    assert ranked[0] == "c"
+
+
+def test_5_choose_top_k():
+    """Test Case 5: Cut at a clear score gap, keep everything when scores are flat"""
+    print("\n" + "=" * 70)
+    print("TEST 5: Adaptive Top-K From Score Gaps")
+    print("=" * 70)
+    
+    narrow = [0.9, 0.88, 0.87, 0.86, 0.41, 0.40, 0.39]
+    flat = [0.62, 0.61, 0.60, 0.59, 0.58, 0.57, 0.56]
+    print(f"✓ Narrow: {choose_top_k(narrow, min_k=3)}, flat: {choose_top_k(flat, min_k=3)}")
+    
+    assert choose_top_k(narrow, min_k=3) == 4
+    assert choose_top_k(narrow, min_k=5) == 7
+    assert choose_top_k(flat, min_k=3) == len(flat)
+    assert choose_top_k([0.5, 0.1], min_k=3) == 2
+
+
+def test_6_adaptive_retriever_pages_within_budget():
+    """Test Case 6: Narrow queries get few profiles; "show more" pages the rest within budget"""
+    print("\n" + "=" * 70)
+    print("TEST 6: Adaptive Retrieval and Paging")
+    print("=" * 70)
+    
+    Settings.embed_model = MockEmbedding(embed_dim=8)
+    profiles = load_profiles_from_json(DATA_PATH)
+    index, _ = build_vector_index(convert_profiles_to_documents(profiles))
+    base = HybridRetriever(index, LexicalIndex.from_profiles(profiles), similarity_top_k=len(profiles))
+    expected = profiles_mentioning(profiles, "EventBridge")
+    retriever = AdaptiveRetriever(base, token_counter=lambda node: 100, token_budget=100 * len(expected), min_top_k=1)
+    
+    first = retriever.retrieve("EventBridge")
+    first_stats = retriever.last_stats
+    pages = []
+    while retriever.pending:
+        pages.append(retriever.retrieve("show more"))
+        
+    print(f"✓ First turn: {first_stats}")
+    print(f"✓ Page sizes: {[len(page) for page in pages]}")
+    
+    assert {r.node.ref_doc_id for r in first} == expected
+    assert pages and all(0 < len(page) <= len(expected) for page in pages)
+    seen = [r.node.ref_doc_id for page in [first] + pages for r in page]
+    assert sorted(seen) == sorted(p["id"] for p in profiles)
+    
+    assert is_more_request("Show me more") and is_more_request("next page")
+    assert not is_more_request("more Python people")
+
+
+def test_7_gap_cut_through_hybrid_retriever():
+    """Test Case 7: The gap cut uses vector similarities, not the smoothly falling fused scores"""
+    print("\n" + "=" * 70)
+    print("TEST 7: Similarity Gap Behind Rank Fusion")
+    print("=" * 70)
+    
+    Settings.embed_model = KeywordEmbedding(keyword="hyderabad")
+    profiles = load_profiles_from_json(DATA_PATH)
+    documents = convert_profiles_to_documents(profiles)
+    index, _ = build_vector_index(documents)
+    base = HybridRetriever(index, LexicalIndex.from_profiles(profiles), similarity_top_k=len(profiles))
+    retriever = AdaptiveRetriever(base, token_counter=lambda node: 100, token_budget=100 * len(profiles), min_top_k=1)
+    
+    # Locations are not in the lexical index, so the vector ranking is all there is to fuse
+    candidates = base.retrieve("Who is based in Hyderabad?")
+    page = retriever.retrieve("Who is based in Hyderabad?")
+    expected = {document.id_ for document in documents if "hyderabad" in document.text.lower()}
+    print(f"✓ Candidates: {len(candidates)}, kept: {retriever.last_stats}")
+    
+    assert 0 < len(expected) < len(profiles) // 2
+    # Fused scores alone show no gap, so they would keep every candidate
+    assert choose_top_k([c.score for c in candidates], min_k=1) == len(candidates)
+    assert {r.node.ref_doc_id for r in page} == expected
+    assert retriever.pending == len(candidates) - len(page)
+
+
+def run_all_tests():
+    """Run all hybrid retrieval tests"""
+    test_1_tokenize_tech_names()
+    test_2_exact_terms_from_lexical_index()
+    test_3_hybrid_retriever_fuses_and_filters()
+    test_4_reciprocal_rank_fusion()
+    test_5_choose_top_k()
+    test_6_adaptive_retriever_pages_within_budget()
+    test_7_gap_cut_through_hybrid_retriever()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,121 @@
+"""
+Session Registry Tests
+Checks reuse, memory carry-over and eviction of per-session chat engines.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time
+
+from llama_index.core.llms import ChatMessage
+from llama_index.core.vector_stores import FilterOperator, MetadataFilter, MetadataFilters
+
+from session_registry import ChatEngineRegistry, filter_key, filters_widen
+
+
+def make_filters(**fields):
+    """MetadataFilters with one EQ/IN filter per field"""
+    filters = []
+    for key, values in fields.items():
+        if isinstance(values, list):
+            filters.append(MetadataFilter(key=key, value=values, operator=FilterOperator.IN))
+        else:
+            filters.append(MetadataFilter(key=key, value=values))
+    return MetadataFilters(filters=filters) if filters else None
+
+
+def make_registry(**kwargs):
+    """Registry whose 'engines' just record the filters and memory they were built with"""
+    return ChatEngineRegistry(lambda filters, memory: {"filters": filters, "memory": memory}, **kwargs)
+
+
+def test_1_engines_reused_across_reruns():
+    """Test Case 1: Reruns with the same filters reuse the engine; sessions are isolated"""
+    print("=" * 70)
+    print("TEST 1: Engine Reuse Across Reruns")
+    print("=" * 70)
+    
+    registry = make_registry()
+    first = registry.get("alice", make_filters(location="Chennai"))
+    again = registry.get("alice", make_filters(location="Chennai"))
+    other = registry.get("bob", make_filters(location="Chennai"))
+    
+    print(f"✓ Stats: {registry.stats()}")
+    
+    assert first is again
+    assert other is not first and other["memory"] is not first["memory"]
+    assert registry.stats()["engines_created"] == 2
+
+
+def test_2_memory_follows_widening_filters_only():
+    """Test Case 2: Memory carries over when filters widen and resets when they narrow"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Memory Carry-Over Across Filter Changes")
+    print("=" * 70)
+    
+    registry = make_registry()
+    chennai = registry.get("alice", make_filters(location="Chennai"))
+    chennai["memory"].put(ChatMessage(role="user", content="Who knows Kafka?"))
+    first_memory = registry.memory_id("alice")
+    
+    widened = registry.get("alice", make_filters(location=["Chennai", "Pune"]))
+    unfiltered = registry.get("alice", None)
+    carried_memory = registry.memory_id("alice")
+    narrowed = registry.get("alice", make_filters(location="Pune", team="Platform"))
+    
+    print(f"✓ Stats: {registry.stats()}")
+    
+    assert widened["memory"] is chennai["memory"]
+    assert unfiltered["memory"] is chennai["memory"]
+    assert narrowed["memory"] is not chennai["memory"]
+    assert narrowed["memory"].get_all() == []
+    assert registry.stats()["memory_resets"] == 1
+    assert carried_memory == first_memory != registry.memory_id("alice")
+    assert registry.memory_id("bob") is None
+    
+    assert filters_widen(filter_key(make_filters(team="ML")), filter_key(None))
+    assert not filters_widen(filter_key(None), filter_key(make_filters(team="ML")))
+
+
+def test_3_lru_and_ttl_eviction():
+    """Test Case 3: Sessions beyond capacity or idle past the TTL are evicted"""
+    print("\n" + "=" * 70)
+    print("TEST 3: LRU and TTL Eviction")
+    print("=" * 70)
+    
+    registry = make_registry(max_sessions=2, ttl_seconds=0.2)
+    registry.get("a")
+    first_a = registry.memory_id("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")  # "b" is least recently used
+    after_lru = list(registry.sessions)
+    
+    time.sleep(0.3)
+    registry.get("d")
+    after_ttl = list(registry.sessions)
+    registry.get("a")  # back after going idle: a new session with a new memory
+    
+    print(f"✓ After LRU: {after_lru}, after TTL: {after_ttl}")
+    
+    assert after_lru == ["a", "c"]
+    assert after_ttl == ["d"]
+    assert registry.stats()["evictions"] == 3
+    assert registry.memory_id("a") not in (None, first_a)
+
+
+def run_all_tests():
+    """Run all session registry tests"""
+    test_1_engines_reused_across_reruns()
+    test_2_memory_follows_widening_filters_only()
+    test_3_lru_and_ttl_eviction()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
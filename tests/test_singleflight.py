@@ -0,0 +1,203 @@
+"""
+Singleflight Tests
+Checks that identical in-flight requests share one computation.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import asyncio
+import threading
+import time
+
+from llama_index.core.vector_stores import MetadataFilter, MetadataFilters
+
+from singleflight import SingleFlight, query_key
+
+
+def test_1_threads_share_one_call():
+    """Test Case 1: Concurrent threads with the same key run the computation once"""
+    print("=" * 70)
+    print("TEST 1: Thread Coalescing")
+    print("=" * 70)
+    
+    flights = SingleFlight()
+    calls = []
+    results = []
+    start = threading.Barrier(10)
+    
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return "Asha and Ravi."
+        
+    def ask():
+        start.wait()
+        results.append(flights.do(query_key("Who knows Kafka?", None, "v1"), compute))
+        
+    threads = [threading.Thread(target=ask) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+        
+    print(f"✓ Computations: {len(calls)}, stats: {flights.stats()}")
+    
+    assert len(calls) == 1
+    assert {answer for answer, _ in results} == {"Asha and Ravi."}
+    assert sorted(shared for _, shared in results) == [False] + [True] * 9
+    assert flights.stats()["shared"] == 9 and flights.stats()["in_flight"] == 0
+
+
+def test_2_async_keys_and_errors():
+    """Test Case 2: Normalized keys coalesce, filters separate, errors reach every waiter"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Async Coalescing")
+    print("=" * 70)
+    
+    pune = MetadataFilters(filters=[MetadataFilter(key="location", value="Pune")])
+    assert query_key("Who knows Kafka?", None, "v1") == query_key("  who knows  KAFKA ", None, "v1")
+    assert query_key("Who knows Kafka?", None, "v1") != query_key("Who knows Kafka?", pune, "v1")
+    assert query_key("Who knows Kafka?", None, "v1") != query_key("Who knows Kafka?", None, "v2")
+    
+    async def main():
+        flights = SingleFlight()
+        calls = []
+        
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return len(calls)
+            
+        async def fail():
+            await asyncio.sleep(0.1)
+            raise RuntimeError("Ollama unavailable")
+            
+        answers = await asyncio.gather(*(flights.ado("kafka", compute) for _ in range(8)))
+        again, _ = await flights.ado("kafka", compute)
+        errors = await asyncio.gather(*(flights.ado("down", fail) for _ in range(3)), return_exceptions=True)
+        return calls, answers, again, errors, flights.stats()
+        
+    calls, answers, again, errors, stats = asyncio.run(main())
+    print(f"✓ Stats: {stats}")
+    
+    assert {answer for answer, _ in answers} == {1}
+    assert again == 2 and len(calls) == 2
+    assert all(isinstance(e, RuntimeError) for e in errors)
+    assert stats["executions"] == 3 and stats["shared"] == 9
+
+
+def test_3_streams_replay_to_late_followers():
+    """Test Case 3: Followers joining a stream late still receive every item"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Stream Coalescing")
+    print("=" * 70)
+    
+    async def main():
+        flights = SingleFlight()
+        
+        async def tokens():
+            for token in ["Asha ", "and ", "Ravi."]:
+                await asyncio.sleep(0.05)
+                yield token
+                
+        async def follow(delay):
+            await asyncio.sleep(delay)
+            items, shared = flights.stream("kafka", tokens)
+            return [item async for item in items], shared
+            
+        return await asyncio.gather(follow(0), follow(0.01), follow(0.12)), flights.stats()
+        
+    followers, stats = asyncio.run(main())
+    print(f"✓ Followers: {followers}")
+    
+    assert all(items == ["Asha ", "and ", "Ravi."] for items, _ in followers)
+    assert [shared for _, shared in followers] == [False, True, True]
+    assert stats["executions"] == 1
+
+
+class Rerun(BaseException):
+    """Stands in for Streamlit's RerunException, which is not an Exception"""
+
+
+def test_4_interrupted_leader_hands_over():
+    """Test Case 4: A leader stopped by its own session does not pass that on; a follower computes instead"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Interrupted Leader")
+    print("=" * 70)
+    
+    flights = SingleFlight()
+    leader_started = threading.Event()
+    calls = []
+    results = {}
+    
+    def interrupted():
+        calls.append("leader")
+        leader_started.set()
+        time.sleep(0.1)
+        raise Rerun()
+        
+    def compute():
+        calls.append("follower")
+        time.sleep(0.05)
+        return "Asha and Ravi."
+        
+    def lead():
+        try:
+            flights.do("kafka", interrupted)
+        except Rerun:
+            results["leader"] = "rerun"
+            
+    def follow(name):
+        leader_started.wait()
+        results[name] = flights.do("kafka", compute)
+        
+    threads = [threading.Thread(target=lead)] + [threading.Thread(target=follow, args=(f"f{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+        
+    print(f"✓ Calls: {calls}, results: {results}")
+    
+    assert results.pop("leader") == "rerun"
+    assert calls == ["leader", "follower"]
+    assert {answer for answer, _ in results.values()} == {"Asha and Ravi."}
+    assert sorted(shared for _, shared in results.values()) == [False, True, True, True]
+    
+    # Ordinary exceptions still reach every waiter
+    def fail():
+        time.sleep(0.1)
+        raise RuntimeError("Ollama unavailable")
+        
+    errors = []
+    
+    def ask():
+        try:
+            flights.do("down", fail)
+        except RuntimeError as e:
+            errors.append(e)
+            
+    threads = [threading.Thread(target=ask) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3 and flights.stats()["in_flight"] == 0
+
+
+def run_all_tests():
+    """Run all singleflight tests"""
+    test_1_threads_share_one_call()
+    test_2_async_keys_and_errors()
+    test_3_streams_replay_to_late_followers()
+    test_4_interrupted_leader_hands_over()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
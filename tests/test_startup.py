@@ -0,0 +1,85 @@
+"""
+Startup Tests
+Checks that pure-data modules import without the LLM and UI frameworks, which load on first use.
+"""
+
+import sys
+import os
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+import json
+import subprocess
+
+from lazy import cache_resource
+
+# Modules the API server, CLI tools and benchmarks can import without llama_index or streamlit
+LIGHT_MODULES = (
+    "config", "data_processing", "profile_store", "facets", "lexical_index", "synthetic_profiles",
+    "metrics", "query_router", "session_registry", "singleflight", "answer_cache", "filters",
+    "chat_engine", "models", "indexing", "warmup"
+)
+FRAMEWORK_PACKAGES = ("llama_index", "streamlit", "ollama", "httpx")
+
+
+def loaded_frameworks(statement: str) -> list:
+    """Framework packages loaded by running a statement in a fresh interpreter"""
+    code = f"{statement}; import json, sys; print(json.dumps(sorted({{m.split('.')[0] for m in sys.modules}})))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = json.loads(result.stdout.splitlines()[-1])
+    return [package for package in FRAMEWORK_PACKAGES if package in loaded]
+
+
+def test_1_light_modules_skip_frameworks():
+    """Test Case 1: Importing pure-data modules and framework glue loads no framework"""
+    print("=" * 70)
+    print("TEST 1: Light Imports")
+    print("=" * 70)
+    
+    frameworks = loaded_frameworks("import " + ", ".join(LIGHT_MODULES))
+    print(f"✓ {len(LIGHT_MODULES)} modules imported, frameworks loaded: {frameworks or 'none'}")
+    assert frameworks == []
+    
+    # Using them pulls in only what the call needs
+    frameworks = loaded_frameworks("import filters; filters.build_metadata_filters(['Pune'], 'All')")
+    print(f"✓ Building filters loads: {frameworks}")
+    assert frameworks == ["llama_index"]
+
+
+def test_2_lazy_cache_resource():
+    """Test Case 2: Lazily cached factories build once and can be cleared"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Lazy cache_resource")
+    print("=" * 70)
+    
+    calls = []
+    
+    @cache_resource
+    def build(size: int, _unhashed=None):
+        calls.append(size)
+        return [size]
+        
+    first = build(3, _unhashed=object())
+    assert build(3, _unhashed=object()) is first
+    assert build(4) is not first
+    assert build.__name__ == "build"
+    print(f"✓ {len(calls)} builds for 3 calls")
+    assert calls == [3, 4]
+    
+    build.clear()
+    assert build(3) is not first
+    print("✓ clear() drops cached resources")
+
+
+def run_all_tests():
+    """Run all startup tests"""
+    test_1_light_modules_skip_frameworks()
+    test_2_lazy_cache_resource()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
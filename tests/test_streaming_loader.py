@@ -0,0 +1,192 @@
+"""
+Streaming Loader Tests
+Checks the bounded-memory profile reader, parallel document building and streamed index syncs over sharded data.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import gzip
+import io
+import json
+import tempfile
+import tracemalloc
+
+from llama_index.core import Settings
+
+from data_processing import _iter_json_values, iter_documents, iter_profiles, load_profiles_from_json
+from facets import compute_facets, load_facets
+from fake_ollama import FakeOllamaServer, fake_models
+from indexing import sync_vector_index
+from synthetic_profiles import ProfileDistribution, generate_profiles, write_profiles
+from config import DATA_PATH
+
+
+def write_shards(directory, profiles):
+    """Split profiles over a JSON array, a JSONL file and a gzipped JSONL file"""
+    third = len(profiles) // 3
+    with open(os.path.join(directory, "part-0.json"), "w") as f:
+        json.dump(profiles[:third], f, indent=2)
+    with open(os.path.join(directory, "part-1.jsonl"), "w") as f:
+        f.writelines(json.dumps(p) + "\n" for p in profiles[third:2 * third])
+    with gzip.open(os.path.join(directory, "part-2.jsonl.gz"), "wt", encoding="utf-8") as f:
+        f.writelines(json.dumps(p) + "\n" for p in profiles[2 * third:])
+
+
+def test_1_formats_match_json_load():
+    """Test Case 1: Arrays, JSONL, gzip and shard directories all yield the same profiles"""
+    print("=" * 70)
+    print("TEST 1: Formats and Shards")
+    print("=" * 70)
+    
+    with open(DATA_PATH) as f:
+        expected = json.load(f)
+        
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl = os.path.join(tmp, "profiles.jsonl")
+        with open(jsonl, "w") as f:
+            f.writelines(json.dumps(p) + "\n\n" for p in expected)
+        compact = os.path.join(tmp, "profiles.json.gz")
+        with gzip.open(compact, "wt", encoding="utf-8") as f:
+            json.dump(expected, f, separators=(",", ":"))
+        shards = os.path.join(tmp, "shards")
+        os.mkdir(shards)
+        write_shards(shards, expected)
+        open(os.path.join(shards, "README.txt"), "w").close()  # ignored
+        
+        for path in (DATA_PATH, jsonl, compact, shards):
+            assert list(iter_profiles(path)) == expected, path
+            print(f"✓ {os.path.basename(path)}: {len(expected)} profiles")
+        assert load_profiles_from_json(shards) == expected
+        
+        broken = os.path.join(tmp, "broken.jsonl")
+        with open(broken, "w") as f:
+            f.write('{"id": "a"}\n[1, 2]\n')
+        try:
+            list(iter_profiles(broken))
+            assert False, "non-object values should be rejected"
+        except ValueError as e:
+            print(f"✓ Rejected: {e}")
+            
+    try:
+        iter_profiles("missing/profiles.json")
+        assert False, "missing files should fail before iteration starts"
+    except FileNotFoundError:
+        print("✓ Missing file raises FileNotFoundError")
+
+
+def test_2_bounded_memory():
+    """Test Case 2: Iterating a large file keeps only one profile alive at a time"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Bounded Memory")
+    print("=" * 70)
+    
+    distribution = ProfileDistribution(load_profiles_from_json(DATA_PATH))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.jsonl")
+        write_profiles(path, generate_profiles(5000, seed=3, distribution=distribution))
+        
+        tracemalloc.start()
+        count = sum(1 for _ in iter_profiles(path))
+        _, streamed_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+        tracemalloc.start()
+        profiles = load_profiles_from_json(path)
+        _, loaded_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        
+    print(f"✓ Streamed {count} profiles, peak {streamed_peak / 1e6:.1f} MB")
+    print(f"✓ Loaded {len(profiles)} profiles, peak {loaded_peak / 1e6:.1f} MB")
+    
+    assert count == len(profiles) == 5000
+    assert streamed_peak < loaded_peak / 4
+
+    # A malformed record early in a large export fails without the rest being buffered
+    export = io.StringIO('{"id": "a", oops}\n' + '{"id": "b", "name": "Asha"}\n' * 200_000)
+    try:
+        list(_iter_json_values(export, max_record_chars=64_000))
+        assert False, "malformed records should be rejected"
+    except ValueError as e:
+        print(f"✓ Rejected after reading {export.tell() / 1e6:.1f} of {len(export.getvalue()) / 1e6:.1f} MB: {e}")
+    assert export.tell() < len(export.getvalue()) / 2
+
+
+def test_3_parallel_documents_match_serial():
+    """Test Case 3: A process pool yields the serial documents, in the same order"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Parallel Document Building")
+    print("=" * 70)
+    
+    distribution = ProfileDistribution(load_profiles_from_json(DATA_PATH))
+    profiles = list(generate_profiles(1000, seed=5, distribution=distribution))
+    
+    def fingerprint(documents):
+        return [(doc.id_, doc.text, doc.metadata, doc.hash) for doc in documents]
+        
+    serial = fingerprint(iter_documents(profiles, workers=1))
+    parallel = fingerprint(iter_documents(iter(profiles), workers=3, chunk_size=64))
+    print(f"✓ {len(parallel)} documents from 3 workers match the serial path")
+    
+    assert parallel == serial and len(serial) == 1000
+    assert list(iter_documents([], workers=2)) == []
+    
+    # Stopping early shuts the pool down without building the rest
+    documents = iter_documents(iter(profiles), workers=2, chunk_size=10)
+    assert next(documents).id_ == profiles[0]["id"]
+    documents.close()
+    print("✓ Closing the generator early stops the workers")
+
+
+def test_4_sync_sharded_directory():
+    """Test Case 4: A shard directory is built, reloaded and incrementally updated"""
+    print("\n" + "=" * 70)
+    print("TEST 4: Syncing a Shard Directory")
+    print("=" * 70)
+    
+    profiles = load_profiles_from_json(DATA_PATH)
+    with tempfile.TemporaryDirectory() as tmp, FakeOllamaServer(dim=16) as server:
+        _, Settings.embed_model = fake_models(server.url)
+        shards, persist_dir = os.path.join(tmp, "shards"), os.path.join(tmp, "storage")
+        os.mkdir(shards)
+        write_shards(shards, profiles)
+        
+        _, full = sync_vector_index(shards, persist_dir, document_workers=2)
+        _, snapshot = sync_vector_index(shards, persist_dir)
+        
+        changed = [dict(profiles[-1], title="Principal Engineer")] + profiles[:-1]
+        write_shards(shards, changed[:-1])  # and one profile removed
+        requests_before = server.embed_requests
+        index, incremental = sync_vector_index(shards, persist_dir)
+        facets = load_facets(persist_dir)
+        
+    print(f"✓ Full: {full}")
+    print(f"✓ Snapshot: {snapshot}")
+    print(f"✓ Incremental: {incremental}")
+    
+    assert full["mode"] == "full" and full["added"] == len(profiles)
+    assert snapshot["mode"] == "snapshot"
+    assert incremental["mode"] == "incremental"
+    assert (incremental["added"], incremental["changed"], incremental["removed"]) == (0, 1, 1)
+    assert incremental["unchanged"] == len(profiles) - 2
+    assert server.embed_requests - requests_before == 1
+    assert len(index.docstore.get_all_ref_doc_info()) == len(profiles) - 1
+    assert facets == compute_facets(changed[:-1])
+
+
+def run_all_tests():
+    """Run all streaming loader tests"""
+    test_1_formats_match_json_load()
+    test_2_bounded_memory()
+    test_3_parallel_documents_match_serial()
+    test_4_sync_sharded_directory()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,104 @@
+"""
+Synthetic Profile Tests
+Checks determinism, schema and distributions of generated profiles.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import gzip
+import json
+import tempfile
+from collections import Counter
+
+from data_processing import load_profiles_from_json, convert_profiles_to_documents
+from synthetic_profiles import ProfileDistribution, generate_profiles, write_profiles
+from config import DATA_PATH
+
+
+def test_1_deterministic_and_schema():
+    """Test Case 1: Same seed, same profiles; generated profiles match the sample schema"""
+    print("=" * 70)
+    print("TEST 1: Determinism and Schema")
+    print("=" * 70)
+    
+    sample = load_profiles_from_json(DATA_PATH)
+    distribution = ProfileDistribution(sample)
+    first = list(generate_profiles(200, seed=7, distribution=distribution))
+    again = list(generate_profiles(50, seed=7, distribution=distribution))
+    other = list(generate_profiles(50, seed=8, distribution=distribution))
+    
+    print(f"✓ First profile: {first[0]['id']} {first[0]['name']} ({first[0]['title']}, {first[0]['location']})")
+    
+    assert again == first[:50]
+    assert other != again
+    assert len({p["id"] for p in first}) == len({p["email"] for p in first}) == 200
+    for profile in first:
+        assert set(profile) == set(sample[0])
+        assert profile["skills"] == sorted(profile["skills"])
+        assert all(set(proj) == {"name", "desc", "stack"} and " Focus: " in proj["desc"] for proj in profile["projects"])
+    assert len(convert_profiles_to_documents(first)) == 200
+
+
+def test_2_distributions_follow_sample():
+    """Test Case 2: Location, team and repeated-project shares follow the sample"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Distributions")
+    print("=" * 70)
+    
+    sample = load_profiles_from_json(DATA_PATH)
+    distribution = ProfileDistribution(sample)
+    profiles = list(generate_profiles(5000, seed=1, distribution=distribution))
+    
+    for field in ("location", "team"):
+        expected = Counter(p[field] for p in sample)
+        actual = Counter(p[field] for p in profiles)
+        for value, count in expected.items():
+            assert abs(actual[value] / len(profiles) - count / len(sample)) < 0.03, (field, value)
+        assert set(actual) == set(expected)
+        
+    def repeated_share(people):
+        repeats = sum(len(p["projects"]) - len({proj["name"] for proj in p["projects"]}) for p in people)
+        return repeats / sum(len(p["projects"]) - 1 for p in people if p["projects"])
+        
+    print(f"✓ Repeated project entries: sample {repeated_share(sample):.2f}, generated {repeated_share(profiles):.2f}")
+    assert abs(repeated_share(profiles) - repeated_share(sample)) < 0.05
+    assert {s for p in profiles for s in p["skills"]} <= {s for p in sample for s in p["skills"]}
+
+
+def test_3_write_json_jsonl_gzip():
+    """Test Case 3: Profiles are written as a JSON array, JSONL or gzip'd JSONL"""
+    print("\n" + "=" * 70)
+    print("TEST 3: Output Formats")
+    print("=" * 70)
+    
+    distribution = ProfileDistribution.from_file()
+    expected = list(generate_profiles(30, seed=3, distribution=distribution))
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "profiles.json")
+        jsonl_path = os.path.join(tmp, "profiles.jsonl.gz")
+        assert write_profiles(json_path, iter(expected)) == 30
+        assert write_profiles(jsonl_path, iter(expected)) == 30
+        
+        from_json = load_profiles_from_json(json_path)
+        with gzip.open(jsonl_path, "rt") as f:
+            from_jsonl = [json.loads(line) for line in f]
+            
+    print(f"✓ Round-tripped {len(from_json)} (JSON) and {len(from_jsonl)} (JSONL.gz) profiles")
+    assert from_json == from_jsonl == expected
+
+
+def run_all_tests():
+    """Run all synthetic profile tests"""
+    test_1_deterministic_and_schema()
+    test_2_distributions_follow_sample()
+    test_3_write_json_jsonl_gzip()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
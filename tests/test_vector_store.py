@@ -0,0 +1,160 @@
+"""
+Vector Store Tests
+Checks NumpyVectorStore against LlamaIndex's SimpleVectorStore, with and without the inverted index.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tempfile
+
+import numpy as np
+from llama_index.core import Settings
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import TextNode
+from llama_index.core.vector_stores import SimpleVectorStore
+from llama_index.core.vector_stores.types import (
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery
+)
+
+from config import DATA_PATH
+from data_processing import convert_profiles_to_documents, load_profiles_from_json
+from indexing import build_vector_index, update_vector_index
+from vector_store import NumpyVectorStore
+
+LOCATIONS = ["Bangalore", "Chennai", "Pune"]
+TEAMS = ["Platform", "ML", "Data", "Search"]
+
+FILTERS = {
+    "location": MetadataFilters(filters=[MetadataFilter(key="location", value="Chennai")]),
+    "2 locations": MetadataFilters(filters=[
+        MetadataFilter(key="location", value=["Chennai", "Pune"], operator=FilterOperator.IN)
+    ]),
+    "location+team": MetadataFilters(filters=[
+        MetadataFilter(key="location", value="Pune"),
+        MetadataFilter(key="team", value="ML")
+    ]),
+    "location or team": MetadataFilters(
+        filters=[MetadataFilter(key="location", value="Pune"), MetadataFilter(key="team", value="ML")],
+        condition=FilterCondition.OR
+    ),
+    "not location": MetadataFilters(filters=[
+        MetadataFilter(key="location", value="Pune", operator=FilterOperator.NE)
+    ])
+}
+
+
+def make_nodes(count: int = 300, dim: int = 16):
+    """Random embeddings with location/team metadata"""
+    rng = np.random.default_rng(0)
+    return [
+        TextNode(
+            id_=f"n{i}",
+            text="",
+            embedding=rng.standard_normal(dim).tolist(),
+            metadata={"location": LOCATIONS[i % 3], "team": TEAMS[i % 4]}
+        )
+        for i in range(count)
+    ]
+
+
+def top_ids(store, filters, seed: int = 1, dim: int = 16):
+    """Ids of the top 10 results for a random query"""
+    embedding = np.random.default_rng(seed).standard_normal(dim).tolist()
+    return store.query(VectorStoreQuery(query_embedding=embedding, similarity_top_k=10, filters=filters)).ids
+
+
+def test_1_matches_simple_store():
+    """Test Case 1: Same top-k as SimpleVectorStore for every filter shape"""
+    print("=" * 70)
+    print("TEST 1: Parity With SimpleVectorStore")
+    print("=" * 70)
+    
+    nodes = make_nodes()
+    simple = SimpleVectorStore()
+    simple.add(nodes)
+    plain = NumpyVectorStore()
+    plain.add(nodes)
+    indexed = NumpyVectorStore(indexed_keys=["location", "team"])
+    indexed.add(nodes)
+    
+    for name, filters in FILTERS.items():
+        expected = top_ids(simple, filters)
+        print(f"✓ {name}: {expected[:3]}...")
+        assert top_ids(plain, filters) == expected
+        assert top_ids(indexed, filters) == expected
+
+
+def test_2_postings_follow_deletes_and_persistence():
+    """Test Case 2: Postings stay correct after deletes and a persist/load round trip"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Postings After Delete and Reload")
+    print("=" * 70)
+    
+    nodes = make_nodes()
+    simple = SimpleVectorStore()
+    simple.add(nodes)
+    store = NumpyVectorStore(indexed_keys=["location", "team"])
+    store.add(nodes)
+    
+    for node_id in ["n0", "n4", "n8"]:
+        simple.delete_nodes([node_id])
+    store.delete_nodes(["n0", "n4", "n8"])
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        store.persist(os.path.join(tmp, "default__vector_store.json"))
+        loaded = NumpyVectorStore.from_persist_dir(tmp, mmap=True)
+        
+        print(f"✓ Rows after delete: {store.count}, after reload: {loaded.count}")
+        
+        assert loaded.count == store.count == len(nodes) - 3
+        for name, filters in FILTERS.items():
+            assert top_ids(loaded, filters) == top_ids(simple, filters), name
+
+
+def test_3_update_compacts_once():
+    """Test Case 3: An update with several changed and removed profiles compacts the matrix once"""
+    print("\n" + "=" * 70)
+    print("TEST 3: One Compaction per Update")
+    print("=" * 70)
+    
+    Settings.embed_model = MockEmbedding(embed_dim=8)
+    profiles = load_profiles_from_json(DATA_PATH)
+    index, _ = build_vector_index(convert_profiles_to_documents(profiles))
+    store = index.vector_store
+    
+    changed = [dict(profile, title="Principal Engineer") for profile in profiles[:3]]
+    current = convert_profiles_to_documents(changed + profiles[3:-2])
+    compactions = []
+    keep_rows = store._keep_rows
+    object.__setattr__(store, "_keep_rows", lambda keep: (compactions.append(int((~keep).sum())), keep_rows(keep)))
+    report = update_vector_index(index, current)
+    
+    print(f"✓ Report: {report}")
+    print(f"✓ Rows dropped per compaction: {compactions}")
+    
+    node_ids = [node_id for info in index.docstore.get_all_ref_doc_info().values() for node_id in info.node_ids]
+    assert (report["changed"], report["removed"]) == (3, 2)
+    assert len(compactions) == 1
+    assert store.count == len(node_ids) and sorted(store._ids) == sorted(node_ids)
+    assert all(index.docstore.get_document_hash(doc.id_) == doc.hash for doc in current)
+
+
+def run_all_tests():
+    """Run all vector store tests"""
+    test_1_matches_simple_store()
+    test_2_postings_follow_deletes_and_persistence()
+    test_3_update_compacts_once()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,149 @@
+"""
+Warm-up Tests
+Checks the background warm-up, its keep-alive pings and the API readiness check against the fake Ollama server.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import asyncio
+import shutil
+import tempfile
+import time
+
+import httpx
+
+from api import create_app
+from config import DATA_PATH, WARMUP_ENABLED
+from embedding_cache import CachedEmbedding, EmbeddingCache
+from fake_ollama import FakeOllamaServer, fake_models
+from warmup import Warmup
+
+
+def test_1_warmup_loads_then_keeps_models_alive():
+    """Test Case 1: Load runs first, pings reach Ollama past the embedding cache and repeat"""
+    print("=" * 70)
+    print("TEST 1: Warm-up and Keep-alive")
+    print("=" * 70)
+    
+    with tempfile.TemporaryDirectory() as tmp, FakeOllamaServer(dim=16) as server:
+        llm, embed_model = fake_models(server.url, request_timeout=5)
+        cached = CachedEmbedding(embed_model, EmbeddingCache(os.path.join(tmp, "embeddings.sqlite")))
+        order = []
+        
+        def load():
+            order.append(("load", server.generation_requests))
+            time.sleep(0.1)
+            return "index"
+            
+        warmup = Warmup(
+            llm, cached, load=load, on_ready=lambda w: order.append(("ready", w.result)), keep_alive_interval=0.05
+        )
+        assert not warmup.ready and warmup.stats()["state"] == "pending"
+        warmup.start()
+        assert warmup.wait(10)
+        print(f"✓ Ready after {warmup.seconds}s: {warmup.stats()}")
+        
+        assert order == [("load", 0), ("ready", "index")]
+        assert warmup.result == "index" and warmup.state == "ready"
+        
+        deadline = time.time() + 10
+        while warmup.pings < 3 and time.time() < deadline:
+            time.sleep(0.01)
+        warmup.stop()
+        
+    print(f"✓ {warmup.pings} pings: {server.generation_requests} generate, {server.embed_requests} embed requests")
+    assert warmup.pings >= 3
+    assert server.generation_requests == server.embed_requests == warmup.pings
+
+
+def test_2_failures():
+    """Test Case 2: A failing load is final; an unreachable Ollama is retried without becoming ready"""
+    print("\n" + "=" * 70)
+    print("TEST 2: Failures")
+    print("=" * 70)
+    
+    def broken():
+        raise OSError("profiles.json missing")
+        
+    with FakeOllamaServer(dim=16) as server:
+        warmup = Warmup(*fake_models(server.url, request_timeout=5), load=broken).start()
+        warmup._thread.join(10)
+    print(f"✓ Failed load: {warmup.stats()}")
+    assert (warmup.state, warmup.error, warmup.ready) == ("failed", "profiles.json missing", False)
+    assert server.request_count == 0
+    
+    # Nothing listens on port 9
+    warmup = Warmup(*fake_models("http://127.0.0.1:9", request_timeout=5), retry_interval=0.02).start()
+    deadline = time.time() + 10
+    while warmup.ping_failures < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    warmup.stop()
+    print(f"✓ Unreachable Ollama: {warmup.stats()}")
+    assert warmup.ping_failures >= 2 and warmup.state == "warming" and not warmup.ready
+    assert warmup.error.startswith("Ollama ping failed")
+
+
+def test_3_api_health_while_warming():
+    """Test Case 3: Started through its lifespan, the API answers 503 until the warm-up attached the service"""
+    print("\n" + "=" * 70)
+    print("TEST 3: API Readiness")
+    print("=" * 70)
+    
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp, FakeOllamaServer(dim=16) as server:
+        # The lifespan loads the default data path and writes storage/ and cache/ under the working directory
+        os.makedirs(os.path.join(tmp, os.path.dirname(DATA_PATH)))
+        shutil.copy(os.path.join(cwd, DATA_PATH), os.path.join(tmp, DATA_PATH))
+        app = create_app(base_url=server.url)
+        
+        async def requests(client):
+            before = [await client.get("/health"), await client.get("/facets")]
+            statuses = [before[0].status_code]
+            deadline = time.time() + 30
+            while statuses[-1] != 200 and time.time() < deadline:
+                await asyncio.sleep(0.05)
+                statuses.append((await client.get("/health")).status_code)
+            return before, statuses, [await client.get("/health"), await client.get("/facets")]
+            
+        async def run():
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://api", timeout=30) as client:
+                    return await requests(client)
+                
+        os.chdir(tmp)
+        try:
+            (health, facets), statuses, (health_after, facets_after) = asyncio.run(run())
+        finally:
+            os.chdir(cwd)
+        warmup_requests = server.generation_requests
+        
+    print(f"✓ While warming: {health.status_code} {health.json()}")
+    print(f"✓ /health statuses until ready: {sorted(set(statuses))}, {len(statuses)} checks")
+    print(f"✓ Ready: {health_after.status_code} {health_after.json()}")
+    
+    assert WARMUP_ENABLED and app.state.warmup is not None
+    assert health.status_code == 503 and not health.json()["ready"]
+    assert facets.status_code == 503 and facets.headers["Retry-After"] == "5"
+    assert statuses[0] == 503 and statuses[-1] == 200 and set(statuses) == {503, 200}
+    assert health_after.status_code == 200 and health_after.json()["ready"]
+    assert facets_after.status_code == 200 and "location" in facets_after.json()
+    assert warmup_requests >= 1
+
+
+def run_all_tests():
+    """Run all warm-up tests"""
+    test_1_warmup_loads_then_keeps_models_alive()
+    test_2_failures()
+    test_3_api_health_while_warming()
+    
+    print("\n" + "=" * 70)
+    print("✅ ALL TESTS COMPLETED SUCCESSFULLY")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -3,9 +3,22 @@ UI module.
 Handles Streamlit UI components and chat interface.
 """
 
+import logging
+import time
+from contextlib import nullcontext
+
 import streamlit as st
 
-from config import MODEL_NAME, EMBED_MODEL_NAME
+from answer_cache import is_self_contained
+from chat_engine import context_packing_stats, pending_results, record_exchange, source_names, timed_token_stream
+from chat_memory import foreground_generation
+from config import MODEL_NAME, EMBED_MODEL_NAME, STREAMING_ENABLED
+from embedding_cache import CachedEmbedding
+from indexing import current_data_version
+from metrics import registry as metrics_registry, span
+from singleflight import query_key
+
+logger = logging.getLogger(__name__)
 
 
 def setup_page_config():
@@ -37,6 +50,29 @@ def initialize_chat_session():
     return st.session_state.messages
 
 
+def sync_chat_history(memory_id: str | None):
+    """
+    Start the visible conversation over when the chat memory behind it was replaced.
+    
+    The registry replaces a session's memory when its filters narrow or when
+    the session was evicted (idle past the TTL, or least recently used), so
+    the model no longer knows the earlier turns and the page must not show them.
+    
+    Args:
+        memory_id: ChatEngineRegistry.memory_id of this session
+    """
+    shown = st.session_state.get("memory_id")
+    if shown is not None and memory_id != shown:
+        st.session_state.messages = [
+            {
+                "role": "assistant",
+                "content": "🔄 The conversation starts over: the filters were narrowed or the session was idle "
+                           "for too long, so earlier turns are no longer remembered."
+            }
+        ]
+    st.session_state.memory_id = memory_id
+
+
 def display_chat_history(messages: list):
     """
     Display chat message history.
@@ -49,26 +85,245 @@ def display_chat_history(messages: list):
             st.markdown(msg["content"])
 
 
-def display_debug_context(response):
+def display_debug_context(response, packing: dict | None = None):
     """
     Display debug information showing retrieved context.
     
     Args:
         response: Chat engine response object
+        packing: Optional ContextPacker stats of the turn
     """
     with st.expander("🔍 Debug: See Retrieved Context"):
+        if packing:
+            st.caption(
+                f"Context: {packing['tokens_packed']} tokens from {packing['nodes_packed']} of "
+                f"{packing['nodes_retrieved']} retrieved profiles ({packing['tokens_saved']} tokens saved)"
+            )
         for node in response.source_nodes:
             st.text(f"--- From Profile: {node.metadata.get('name')} ---")
             # Show first 300 chars to verify project presence
             st.text(node.node.get_content()[:300] + "...")
 
 
-def handle_chat_interaction(chat_engine):
+def display_sources(names: list):
+    """
+    Display the profiles retrieved for a response, before the answer arrives.
+    
+    Args:
+        names: Profile names from source_names
+    """
+    if names:
+        st.caption("📇 Sources: " + ", ".join(names))
+
+
+def display_latency(timings: dict):
+    """
+    Display time-to-first-token and total latency of a turn.
+    
+    Args:
+        timings: Dict with "ttft" and "total" in seconds
+    """
+    st.caption(f"⏱️ First token {timings['ttft']:.2f}s · total {timings['total']:.2f}s")
+
+
+def record_turn_latency(timings: dict):
+    """
+    Keep per-turn latencies in the session for later inspection.
+    
+    Args:
+        timings: Dict with "retrieval", "ttft" and "total" in seconds
+    """
+    st.session_state.setdefault("turn_latencies", []).append(timings)
+    logger.info("Chat turn latency: %s", timings)
+
+
+def stream_response(chat_engine, prompt: str) -> tuple:
+    """
+    Stream an answer token by token, showing sources as soon as retrieval finishes.
+    
+    Args:
+        chat_engine: Configured chat engine instance
+        prompt: User query
+        
+    Returns:
+        tuple: (answer, sources) - The full response text and source profile names
+    """
+    start = time.perf_counter()
+    with st.spinner("Searching..."):
+        response = chat_engine.stream_chat(prompt)
+    timings = {"retrieval": round(time.perf_counter() - start, 4)}
+    
+    sources = source_names(response)
+    display_sources(sources)
+    answer = st.write_stream(timed_token_stream(response, start, timings))
+    with span("render"):
+        display_latency(timings)
+        record_turn_latency(timings)
+    
+        # Show debug information
+        display_debug_context(response, context_packing_stats(chat_engine))
+    return answer, sources
+
+
+def display_more_hint(chat_engine):
+    """
+    Tell the user when more matching profiles can be paged in.
+    
+    Args:
+        chat_engine: Chat engine that answered the turn
+    """
+    pending = pending_results(chat_engine)
+    if pending:
+        st.caption(f"➕ {pending} more candidate profiles - ask \"show more\" to see them")
+
+
+def display_router_stats(router):
+    """
+    Display the share of queries answered without the LLM.
+    
+    Args:
+        router: QueryRouter instance, or None if routing is disabled
+    """
+    if router is None:
+        return
+    stats = router.stats()
+    if stats["total"]:
+        st.sidebar.caption(f"⚡ Fast path answered {stats['handled_share']:.0%} of {stats['total']} queries")
+
+
+def display_answer_cache_stats(answer_cache):
+    """
+    Display the answer cache hit rate.
+    
+    Args:
+        answer_cache: SemanticAnswerCache instance, or None if caching is disabled
+    """
+    if answer_cache is None:
+        return
+    stats = answer_cache.stats()
+    if stats["hits"] + stats["misses"]:
+        st.sidebar.caption(
+            f"♻️ Answer cache hit rate {stats['hit_rate']:.0%} "
+            f"({stats['hits']}/{stats['hits'] + stats['misses']}, {stats['entries']} cached)"
+        )
+
+
+def generate_answer(chat_engine, prompt: str) -> tuple:
+    """
+    Answer a prompt with the chat engine, streaming it if enabled.
+    
+    Args:
+        chat_engine: Configured chat engine instance
+        prompt: User query
+        
+    Returns:
+        tuple: (answer, sources) - The response text and source profile names
+    """
+    with foreground_generation():
+        if STREAMING_ENABLED:
+            return stream_response(chat_engine, prompt)
+        
+        with st.spinner("Searching..."):
+            response = chat_engine.chat(prompt)
+            with span("render"):
+                st.markdown(response.response)
+        
+                # Show debug information
+                display_debug_context(response, context_packing_stats(chat_engine))
+        return response.response, source_names(response)
+
+
+def display_coalescing_stats(coalescer):
+    """
+    Display how many answers were shared between identical concurrent questions.
+    
+    Args:
+        coalescer: SingleFlight instance, or None if coalescing is disabled
+    """
+    if coalescer is None:
+        return
+    stats = coalescer.stats()
+    if stats["shared"]:
+        st.sidebar.caption(f"🤝 {stats['shared']} of {stats['requests']} questions shared an in-flight answer")
+
+
+def display_warmup_status(warmup):
+    """
+    Display whether the models are loaded and kept warm.
+    
+    Args:
+        warmup: Warmup instance, or None if warm-up is disabled
+    """
+    if warmup is None:
+        return
+    stats = warmup.stats()
+    if stats["ready"]:
+        st.sidebar.caption(f"🟢 Models warm (ready after {stats['seconds']:.1f}s, {stats['pings']} keep-alive pings)")
+    elif stats["state"] == "failed":
+        st.sidebar.caption(f"🔴 Warm-up failed: {stats['error']}")
+    else:
+        st.sidebar.caption(f"🟡 Warming up ({stats['state']})" + (f": {stats['error']}" if stats["error"] else ""))
+
+
+def display_metrics_panel(router=None, answer_cache=None, coalescer=None, embed_model=None):
+    """
+    Display per-stage latencies and counters, with a Prometheus text download.
+    
+    Args:
+        router: Optional QueryRouter whose counters are included
+        answer_cache: Optional SemanticAnswerCache whose counters are included
+        coalescer: Optional SingleFlight whose counters are included
+        embed_model: Optional embedding model; its cache counters are included
+    """
+    if not metrics_registry.enabled:
+        return
+    components = {
+        "router": router.stats() if router is not None else None,
+        "answer_cache": answer_cache.stats() if answer_cache is not None else None,
+        "coalescing": coalescer.stats() if coalescer is not None else None,
+        "embedding_cache": embed_model.cache.stats() if isinstance(embed_model, CachedEmbedding) else None
+    }
+    snapshot = metrics_registry.snapshot()
+    
+    with st.sidebar.expander("📈 Metrics"):
+        if snapshot["stages"]:
+            st.table([{"stage": stage, **values} for stage, values in snapshot["stages"].items()])
+        else:
+            st.caption("No stages timed yet")
+        for name, value in snapshot["counters"].items():
+            st.caption(f"{name}: {value:g}")
+        st.download_button(
+            "Prometheus metrics",
+            metrics_registry.render_prometheus(components),
+            file_name="metrics.prom",
+            mime="text/plain"
+        )
+
+
+def handle_chat_interaction(
+    chat_engine, memory, router=None, filters=None, answer_cache=None, coalescer=None, new_engine=None
+):
     """
     Handle user chat input and display response.
     
+    Plain lookups are answered by the query router when one is given.
+    Questions that do not depend on earlier turns are then looked up in the
+    answer cache, and share the answer of an identical question another
+    user is asking at the same moment; everything else goes to the chat engine.
+    Answers other sessions may receive are generated without this session's
+    history: on its own engine while the conversation is empty, otherwise on
+    a new engine from new_engine.
+    
     Args:
         chat_engine: Configured chat engine instance
+        memory: Chat memory of the session, which receives turns answered without the chat engine
+        router: Optional QueryRouter for LLM-free lookups
+        filters: Metadata filters applied to routed and cached answers
+        answer_cache: Optional SemanticAnswerCache for repeated questions
+        coalescer: Optional SingleFlight for identical in-flight questions
+        new_engine: Optional callable returning a chat engine without history
+            (see ChatEngineRegistry.engine_without_history); without it only
+            first questions are cached or shared
     """
     if prompt := st.chat_input("Query employee database..."):
         # Add user message
@@ -77,14 +332,60 @@ def handle_chat_interaction(chat_engine):
         with st.chat_message("user"):
             st.markdown(prompt)
         
+        routed = router.route(prompt, filters) if router is not None else None
+        
+        # Follow-ups like "which of them are in Pune?" depend on the history
+        independent = routed is None and (not chat_engine.chat_history or is_self_contained(prompt))
+        engine = chat_engine
+        if independent and chat_engine.chat_history and (answer_cache is not None or coalescer is not None):
+            # Cached or shared answers reach other sessions, so this session's history must not shape them
+            if new_engine is not None:
+                engine = new_engine()
+            else:
+                independent = False
+        data_version = current_data_version() if independent else None
+        cached, query_embedding = None, None
+        if independent and answer_cache is not None:
+            cached, query_embedding = answer_cache.lookup(prompt, filters, data_version)
+            
         # Generate and display response
         with st.chat_message("assistant"):
-            with st.spinner("Searching..."):
-                response = chat_engine.chat(prompt)
-                st.markdown(response.response)
-                
-                # Show debug information
-                display_debug_context(response)
+            if routed is not None:
+                answer = routed["response"]
+                st.markdown(answer)
+                st.caption("⚡ Answered from the profile index")
+                record_exchange(memory, prompt, answer)
+            elif cached is not None:
+                answer = cached["response"]
+                display_sources(cached["sources"])
+                st.markdown(answer)
+                st.caption(f"♻️ Answered from cache (similarity {cached['similarity']:.2f})")
+                record_exchange(memory, prompt, answer)
+            elif independent and coalescer is not None:
+                key = query_key(prompt, filters, data_version, "chat")
+                waiting = coalescer.in_flight(key)
+                with st.spinner("Same question in progress for another user...") if waiting else nullcontext():
+                    (answer, sources), shared = coalescer.do(key, lambda: generate_answer(engine, prompt))
+                if shared:
+                    # Computed and rendered in another session; render it here too
+                    display_sources(sources)
+                    st.markdown(answer)
+                    st.caption("🤝 Shared with an identical question asked at the same time")
+                else:
+                    if engine is chat_engine:
+                        display_more_hint(chat_engine)
+                    if answer_cache is not None:
+                        answer_cache.store(query_embedding, filters, data_version, answer, sources)
+                if shared or engine is not chat_engine:
+                    record_exchange(memory, prompt, answer)
+            else:
+                answer, sources = generate_answer(engine, prompt)
+                if engine is chat_engine:
+                    display_more_hint(chat_engine)
+                else:
+                    record_exchange(memory, prompt, answer)
+                if independent and answer_cache is not None:
+                    answer_cache.store(query_embedding, filters, data_version, answer, sources)
         
         # Add assistant message to history
-        st.session_state.messages.append({"role": "assistant", "content": response.response})
+        st.session_state.messages.append({"role": "assistant", "content": answer})
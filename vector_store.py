@@ -0,0 +1,364 @@
+"""
+Vector store module.
+NumPy-backed vector store with vectorized top-k and optional memory mapping.
+"""
+
+import json
+import os
+from functools import reduce
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    FilterCondition,
+    FilterOperator,
+    MetadataFilter,
+    MetadataFilters,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+from llama_index.core.vector_stores.utils import build_metadata_filter_fn, node_to_metadata_dict
+
+from metrics import span
+
+DEFAULT_NAMESPACE = "default"
+VECTOR_STORE_FNAME = "vector_store.json"
+
+# Above this fraction of surviving rows, one contiguous product beats gathering rows
+DENSE_SCORING_FRACTION = 0.25
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so a dot product equals cosine similarity."""
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """
+    Vector store keeping all embeddings in one contiguous float32 matrix.
+    
+    Rows are L2-normalized on insert, so a query is scored with a single
+    matrix-vector product and the top-k is selected with argpartition.
+    Metadata filters use the same semantics as LlamaIndex's SimpleVectorStore.
+    A persisted store can be memory-mapped instead of read into RAM.
+    
+    For indexed_keys, an inverted index maps each metadata value to the
+    sorted row ids holding it. Exact-match filters on those keys intersect
+    the row id lists first, so only surviving rows are scored and tighter
+    filters make queries cheaper instead of costing a full scan.
+    """
+    
+    stores_text: bool = False
+    indexed_keys: List[str] = Field(default_factory=list)
+    
+    _matrix: np.ndarray = PrivateAttr()
+    _size: int = PrivateAttr(default=0)
+    _ids: List[str] = PrivateAttr(default_factory=list)
+    _ref_doc_ids: List[str] = PrivateAttr(default_factory=list)
+    _metadata: List[Dict[str, Any]] = PrivateAttr(default_factory=list)
+    _columns: Dict[str, np.ndarray] = PrivateAttr(default_factory=dict)
+    _postings: Dict[str, Dict[str, List[int]]] = PrivateAttr(default_factory=dict)
+    _posting_arrays: Dict[tuple, np.ndarray] = PrivateAttr(default_factory=dict)
+    
+    def __init__(self, matrix: Optional[np.ndarray] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._matrix = matrix if matrix is not None else np.empty((0, 0), dtype=np.float32)
+        self._size = len(self._matrix)
+        
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+        
+    @property
+    def client(self) -> None:
+        return None
+        
+    @property
+    def embeddings(self) -> np.ndarray:
+        """The (n, dim) matrix of normalized embeddings currently stored."""
+        return self._matrix[:self._size]
+        
+    @property
+    def count(self) -> int:
+        """Number of stored rows."""
+        return self._size
+        
+    def _ensure_capacity(self, extra: int, dim: int):
+        """Grow the matrix geometrically; copies a read-only memmap into RAM."""
+        needed = self._size + extra
+        if self._matrix.shape[1:] != (dim,) and self._size == 0:
+            self._matrix = np.empty((0, dim), dtype=np.float32)
+        if needed <= len(self._matrix) and self._matrix.flags.writeable:
+            return
+        capacity = max(needed, 2 * len(self._matrix), 64)
+        grown = np.empty((capacity, dim), dtype=np.float32)
+        grown[:self._size] = self._matrix[:self._size]
+        self._matrix = grown
+        
+    def add(self, nodes: Sequence[BaseNode], **add_kwargs: Any) -> List[str]:
+        """Append node embeddings and metadata as new rows."""
+        if not nodes:
+            return []
+            
+        vectors = _normalize(np.asarray([node.get_embedding() for node in nodes], dtype=np.float32))
+        self._ensure_capacity(len(nodes), vectors.shape[1])
+        self._matrix[self._size:self._size + len(nodes)] = vectors
+        self._size += len(nodes)
+        
+        first_row = len(self._ids)
+        for node in nodes:
+            metadata = node_to_metadata_dict(node, remove_text=True, flat_metadata=False)
+            metadata.pop("_node_content", None)
+            self._ids.append(node.node_id)
+            self._ref_doc_ids.append(node.ref_doc_id or "None")
+            self._metadata.append(metadata)
+        self._index_rows(first_row)
+        
+        return [node.node_id for node in nodes]
+        
+    def _keep_rows(self, keep: np.ndarray):
+        """Compact the store down to the rows where keep is True."""
+        self._matrix = np.ascontiguousarray(self._matrix[:self._size][keep])
+        self._size = len(self._matrix)
+        self._ids = [v for v, k in zip(self._ids, keep) if k]
+        self._ref_doc_ids = [v for v, k in zip(self._ref_doc_ids, keep) if k]
+        self._metadata = [v for v, k in zip(self._metadata, keep) if k]
+        
+        # Row ids shift after compaction, so the inverted index is rebuilt
+        self._postings = {}
+        self._index_rows(0)
+        
+    def _index_rows(self, first_row: int):
+        """Add rows from first_row onwards to the inverted index and drop derived caches."""
+        for key in self.indexed_keys:
+            postings = self._postings.setdefault(key, {})
+            for row in range(first_row, len(self._metadata)):
+                value = self._metadata[row].get(key)
+                if isinstance(value, str):
+                    postings.setdefault(value, []).append(row)
+        self._columns.clear()
+        self._posting_arrays.clear()
+        
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """Delete all rows that belong to a source document."""
+        keep = np.fromiter((r != ref_doc_id for r in self._ref_doc_ids), dtype=bool, count=self._size)
+        if not keep.all():
+            self._keep_rows(keep)
+            
+    def delete_nodes(
+        self,
+        node_ids: Optional[List[str]] = None,
+        filters: Optional[MetadataFilters] = None,
+        **delete_kwargs: Any
+    ) -> None:
+        """Delete rows by node id and/or metadata filters."""
+        match = self._filter_mask(filters)
+        if node_ids is not None:
+            wanted = set(node_ids)
+            match &= np.fromiter((i in wanted for i in self._ids), dtype=bool, count=self._size)
+        if match.any():
+            self._keep_rows(~match)
+            
+    def clear(self) -> None:
+        """Remove every row."""
+        self._keep_rows(np.zeros(self._size, dtype=bool))
+        
+    def _column(self, key: str) -> np.ndarray:
+        """Metadata values for one key as an object array, built lazily and cached."""
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(self._size, dtype=object)
+            column[:] = [metadata.get(key) for metadata in self._metadata]
+            self._columns[key] = column
+        return column
+        
+    def _exact_match_values(self, metadata_filter: MetadataFilter) -> Optional[List[Any]]:
+        """Values accepted by an EQ/IN filter on scalars; None for any other filter."""
+        values = metadata_filter.value
+        if metadata_filter.operator == FilterOperator.EQ and isinstance(values, (str, int, float)):
+            return [values]
+        if metadata_filter.operator == FilterOperator.IN and isinstance(values, list):
+            return values
+        return None
+        
+    def _posting_rows(self, metadata_filter: MetadataFilter) -> Optional[np.ndarray]:
+        """Sorted row ids matching a filter via the inverted index; None if not indexable."""
+        values = self._exact_match_values(metadata_filter)
+        key = metadata_filter.key
+        if values is None or key not in self.indexed_keys or not all(isinstance(v, str) for v in values):
+            return None
+            
+        arrays = []
+        for value in values:
+            array = self._posting_arrays.get((key, value))
+            if array is None:
+                array = np.asarray(self._postings.get(key, {}).get(value, []), dtype=np.int64)
+                self._posting_arrays[(key, value)] = array
+            arrays.append(array)
+            
+        # OR within a field: merge the row id lists of every accepted value
+        if len(arrays) == 1:
+            return arrays[0]
+        mask = np.zeros(self._size, dtype=bool)
+        for array in arrays:
+            mask[array] = True
+        return np.flatnonzero(mask)
+        
+    def _candidate_rows(self, filters: Optional[MetadataFilters]) -> Optional[np.ndarray]:
+        """Sorted row ids passing the filters, or None when every row passes."""
+        if not filters or not filters.filters:
+            return None
+            
+        if filters.condition in (None, FilterCondition.AND, FilterCondition.OR) and all(
+            isinstance(f, MetadataFilter) for f in filters.filters
+        ):
+            row_sets = [self._posting_rows(f) for f in filters.filters]
+            indexed = [rows for rows in row_sets if rows is not None]
+            
+            if filters.condition == FilterCondition.OR:
+                if len(indexed) == len(row_sets):
+                    return reduce(np.union1d, indexed)
+            elif indexed:
+                # AND across fields: intersect the smallest lists first
+                rows = reduce(
+                    lambda a, b: np.intersect1d(a, b, assume_unique=True),
+                    sorted(indexed, key=len)
+                )
+                rest = [f for f, r in zip(filters.filters, row_sets) if r is None]
+                if rest and len(rows):
+                    rows = rows[self._filter_mask(MetadataFilters(filters=rest), rows)]
+                return rows
+                
+        return np.flatnonzero(self._filter_mask(filters))
+        
+    def _filter_mask(self, filters: Optional[MetadataFilters], rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Boolean mask for metadata filters, over the given rows or over all rows.
+        
+        Flat AND/OR combinations of exact-match filters are evaluated
+        column-wise; anything else uses LlamaIndex's per-row filter semantics.
+        """
+        count = self._size if rows is None else len(rows)
+        if not filters or not filters.filters:
+            return np.ones(count, dtype=bool)
+            
+        if filters.condition in (None, FilterCondition.AND, FilterCondition.OR) and all(
+            isinstance(f, MetadataFilter) for f in filters.filters
+        ):
+            value_lists = [self._exact_match_values(f) for f in filters.filters]
+            if all(values is not None for values in value_lists):
+                masks = []
+                for metadata_filter, values in zip(filters.filters, value_lists):
+                    column = self._column(metadata_filter.key)
+                    column = column if rows is None else column[rows]
+                    mask = np.zeros(count, dtype=bool)
+                    for value in values:
+                        mask |= column == value
+                    masks.append(mask)
+                combine = np.logical_or if filters.condition == FilterCondition.OR else np.logical_and
+                return combine.reduce(masks)
+                
+        filter_fn = build_metadata_filter_fn(lambda row: self._metadata[row], filters)
+        candidates = range(self._size) if rows is None else rows.tolist()
+        return np.fromiter((filter_fn(row) for row in candidates), dtype=bool, count=count)
+        
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Score candidate rows with one matrix-vector product and return the top-k."""
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise ValueError(f"Invalid query mode: {query.mode}")
+        if self._size == 0 or query.query_embedding is None:
+            return VectorStoreQueryResult(similarities=[], ids=[])
+            
+        with span("filter"):
+            rows = self._candidate_rows(query.filters)
+        if query.node_ids is not None:
+            wanted = set(query.node_ids)
+            candidates = range(self._size) if rows is None else rows.tolist()
+            rows = np.asarray([row for row in candidates if self._ids[row] in wanted], dtype=np.int64)
+            
+        # Only the surviving rows are scored, unless most rows survive anyway
+        query_vector = _normalize(np.asarray(query.query_embedding, dtype=np.float32))
+        if rows is None:
+            scores = self.embeddings @ query_vector
+        elif len(rows) > DENSE_SCORING_FRACTION * self._size:
+            scores = (self.embeddings @ query_vector)[rows]
+        else:
+            scores = self.embeddings[rows] @ query_vector
+            
+        top_k = min(query.similarity_top_k, len(scores))
+        if top_k == 0:
+            return VectorStoreQueryResult(similarities=[], ids=[])
+            
+        # argpartition finds the top-k in O(n); only those k are sorted
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        top_rows = top if rows is None else rows[top]
+        
+        return VectorStoreQueryResult(
+            similarities=scores[top].tolist(),
+            ids=[self._ids[row] for row in top_rows]
+        )
+        
+    def persist(self, persist_path: str, fs: Any = None) -> None:
+        """
+        Write the store next to the other snapshot files.
+        
+        The matrix goes to a .npy file (so it can be memory-mapped on load);
+        ids and metadata go to the JSON file at persist_path.
+        """
+        directory = os.path.dirname(persist_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        np.save(_matrix_path(persist_path), np.ascontiguousarray(self.embeddings))
+        with open(persist_path, "w") as f:
+            json.dump({
+                "ids": self._ids,
+                "ref_doc_ids": self._ref_doc_ids,
+                "metadata": self._metadata,
+                "indexed_keys": self.indexed_keys,
+                "postings": self._postings
+            }, f)
+            
+    @classmethod
+    def from_persist_path(cls, persist_path: str, mmap: bool = True) -> "NumpyVectorStore":
+        """
+        Load a store written by persist().
+        
+        Args:
+            persist_path: Path of the JSON file written by persist()
+            mmap: Memory-map the embedding matrix instead of reading it into RAM
+            
+        Returns:
+            NumpyVectorStore instance
+        """
+        with open(persist_path, "r") as f:
+            data = json.load(f)
+            
+        matrix = np.load(_matrix_path(persist_path), mmap_mode="r" if mmap else None)
+        store = cls(matrix=matrix, indexed_keys=data.get("indexed_keys", []))
+        store._ids = data["ids"]
+        store._ref_doc_ids = data["ref_doc_ids"]
+        store._metadata = data["metadata"]
+        if "postings" in data:
+            store._postings = data["postings"]
+        else:
+            store._index_rows(0)
+        return store
+        
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str, namespace: str = DEFAULT_NAMESPACE,
+                         mmap: bool = True) -> "NumpyVectorStore":
+        """Load the store persisted under a namespace by StorageContext.persist()."""
+        return cls.from_persist_path(os.path.join(persist_dir, f"{namespace}__{VECTOR_STORE_FNAME}"), mmap=mmap)
+
+
+def _matrix_path(persist_path: str) -> str:
+    """Path of the .npy matrix that accompanies a persisted JSON file."""
+    return os.path.splitext(persist_path)[0] + ".npy"
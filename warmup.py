@@ -0,0 +1,214 @@
+"""
+Warm-up module.
+Loads the index and keeps both Ollama models resident from a background thread.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from config import WARMUP_ENABLED, WARMUP_KEEP_ALIVE_INTERVAL, WARMUP_RETRY_INTERVAL
+from lazy import cache_resource
+from metrics import span
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """
+    Background warm-up with a readiness flag.
+    
+    state goes from "pending" through "loading" and "warming" to "ready",
+    or ends in "failed".
+    
+    The thread first runs load (typically building or loading the index),
+    then sends an empty generate request and a one-word embedding request,
+    which makes Ollama load both models into memory. The same pings repeat
+    every keep_alive_interval seconds so idle periods don't unload them;
+    while Ollama is unreachable they are retried every retry_interval.
+    
+    ready turns true once load returned and the models answered a ping. A
+    failing load is final (state "failed"); ping errors are only recorded.
+    
+    Args:
+        llm: Ollama LLM
+        embed_model: Embedding model; a CachedEmbedding is unwrapped, so pings always reach Ollama
+        load: Optional callable run before the pings; its result is kept in .result
+        on_ready: Optional callback receiving the Warmup once it is ready
+        keep_alive_interval: Seconds between keep-alive pings; None pings only once
+        retry_interval: Seconds between pings while they fail
+    """
+    
+    def __init__(
+        self,
+        llm: Any,
+        embed_model: Any,
+        load: Optional[Callable[[], Any]] = None,
+        on_ready: Optional[Callable[["Warmup"], None]] = None,
+        keep_alive_interval: Optional[float] = WARMUP_KEEP_ALIVE_INTERVAL,
+        retry_interval: float = WARMUP_RETRY_INTERVAL
+    ):
+        from embedding_cache import CachedEmbedding
+        
+        self.llm = llm
+        self.embed_model = embed_model.embed_model if isinstance(embed_model, CachedEmbedding) else embed_model
+        self.load = load
+        self.on_ready = on_ready
+        self.keep_alive_interval = keep_alive_interval
+        self.retry_interval = retry_interval
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.result: Any = None
+        self.pings = 0
+        self.ping_failures = 0
+        self.last_ping: Optional[float] = None
+        self.seconds: Optional[float] = None
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+        
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until the warm-up is ready.
+        
+        Args:
+            timeout: Seconds to wait at most; None waits indefinitely
+            
+        Returns:
+            True if ready, False on timeout
+        """
+        return self._ready.wait(timeout)
+        
+    def start(self) -> "Warmup":
+        """Start the warm-up thread (once)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+            self._thread.start()
+        return self
+        
+    def stop(self, timeout: Optional[float] = 5.0):
+        """Stop the keep-alive pings; a load still running is left to finish in the background."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            
+    def ping(self):
+        """Send one generate and one embedding request, loading or keeping both models in Ollama's memory."""
+        with span("keep_alive"):
+            # An empty prompt makes Ollama load the model without generating anything
+            self.llm.client.generate(model=self.llm.model, prompt="", keep_alive=self.llm.keep_alive)
+            self.embed_model.get_text_embedding("warm-up")
+        self.pings += 1
+        self.last_ping = time.time()
+        
+    def _run(self):
+        start = time.perf_counter()
+        if self.load is not None:
+            self.state = "loading"
+            try:
+                with span("warmup_load"):
+                    self.result = self.load()
+            except Exception as e:
+                self.state, self.error = "failed", str(e)
+                logger.exception("Warm-up failed while loading")
+                return
+                
+        self.state = "warming"
+        while True:
+            try:
+                self.ping()
+                self.error = None
+                if not self.ready:
+                    self._mark_ready(start)
+            except Exception as e:
+                self.ping_failures += 1
+                self.error = f"Ollama ping failed: {e}"
+                logger.warning("Warm-up ping failed: %s", e)
+                
+            interval = self.keep_alive_interval if self.ready else self.retry_interval
+            if (self.ready and not interval) or self._stop.wait(interval):
+                return
+                
+    def _mark_ready(self, start: float):
+        self.seconds = round(time.perf_counter() - start, 3)
+        self.state = "ready"
+        self._ready.set()
+        logger.info("Warm-up ready after %.1fs", self.seconds)
+        if self.on_ready is not None:
+            try:
+                self.on_ready(self)
+            except Exception:
+                logger.exception("Warm-up on_ready callback failed")
+                
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the warm-up state for the UI and health checks.
+        
+        Returns:
+            Dict with ready, state, error, seconds (until ready), pings,
+            ping_failures and last_ping (Unix time)
+        """
+        return {
+            "ready": self.ready,
+            "state": self.state,
+            "error": self.error,
+            "seconds": self.seconds,
+            "pings": self.pings,
+            "ping_failures": self.ping_failures,
+            "last_ping": self.last_ping
+        }
+
+
+@cache_resource
+def start_app_warmup() -> Warmup | None:
+    """
+    Start the process-wide warm-up of the Streamlit app.
+    
+    Builds the index and the lexical index, facets and query router that
+    come with it, through the same cached factories the app calls, so the
+    app finds them ready (or waits for the build already underway). Call
+    setup_global_settings first; the index is embedded with Settings.embed_model.
+    
+    Returns:
+        Started Warmup, or None if WARMUP_ENABLED is off
+    """
+    if not WARMUP_ENABLED:
+        return None
+    from indexing import create_vector_index, load_facet_catalog, load_lexical_index
+    from models import initialize_models
+    from query_router import create_query_router
+    
+    def load():
+        index = create_vector_index()
+        if index is None:
+            raise RuntimeError("The index could not be built")
+        load_lexical_index()
+        load_facet_catalog()
+        create_query_router()
+        return index
+        
+    llm, embed_model = initialize_models()
+    return Warmup(llm, embed_model, load=load).start()
+
+
+if __name__ == "__main__":
+    # Deploy step: sync the index and load both models before the first visitor, e.g.
+    #   python warmup.py && streamlit run app.py
+    from indexing import sync_vector_index
+    from models import setup_global_settings
+    
+    logging.basicConfig(level=logging.INFO)
+    warmup = Warmup(*setup_global_settings(), load=lambda: sync_vector_index()[1], keep_alive_interval=None)
+    warmup.start()
+    while not warmup.wait(1.0) and warmup.state != "failed":
+        pass
+    print(json.dumps({**warmup.stats(), "index": warmup.result}, indent=2))
+    raise SystemExit(0 if warmup.ready else 1)